@@ -0,0 +1,17 @@
+"""Import clphk modules that do not depend on Home Assistant, without running the integration's __init__."""
+from __future__ import annotations
+
+import importlib
+import pathlib
+import sys
+import types
+
+PACKAGE_DIR = pathlib.Path(__file__).resolve().parent.parent / "custom_components" / "clphk"
+
+
+def load(module: str):
+    if "clphk" not in sys.modules:
+        package = types.ModuleType("clphk")
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules["clphk"] = package
+    return importlib.import_module(f"clphk.{module}")
@@ -0,0 +1,20 @@
+"""Parsers the integration used before it switched to epoch seconds, kept as baselines for the benchmarks."""
+from __future__ import annotations
+
+import datetime
+
+from _loader import load
+
+timestamps = load("timestamps")
+
+
+def parse_datetime(value: str) -> datetime.datetime:
+    """Parse `YYYYMMDDHHMMSS` into an Asia/Hong_Kong aware datetime."""
+    if len(value) != 14 or not value[8:].isdigit():
+        raise ValueError(f"Invalid CLP timestamp: {value!r}")
+    year, month, day = timestamps._parse_date_prefix(value[:8])
+    return datetime.datetime(
+        year, month, day,
+        int(value[8:10]), int(value[10:12]), int(value[12:14]),
+        tzinfo=timestamps.HK_TZ,
+    )
@@ -0,0 +1,121 @@
+"""Compare decoding CLP payloads into typed records against the previous dict walk.
+
+Usage: python benchmarks/bench_decode.py [--repeat N] [--days N]
+
+Each path starts from the raw response body, as it comes off the wire. Reports time
+per row and the peak memory allocated while decoding one payload.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import timeit
+import tracemalloc
+
+from _loader import load
+from _reference import parse_datetime
+
+models = load("models")
+series = load("series")
+
+
+def _ts(value: datetime.datetime) -> str:
+    return value.strftime("%Y%m%d%H%M%S")
+
+
+def hourly_body(days: int) -> bytes:
+    start = datetime.datetime(2025, 6, 1)
+    rows = []
+    for i in range(days * 24):
+        row_start = start + datetime.timedelta(hours=i)
+        rows.append({
+            "startDate": _ts(row_start),
+            "expireDate": _ts(row_start + datetime.timedelta(hours=1)),
+            "kwhTotal": f"{0.2 + (i % 24) * 0.05:.3f}",
+        })
+    return json.dumps({"data": {"results": rows}}).encode()
+
+
+def billing_body(accounts: int) -> bytes:
+    to_date = datetime.datetime(2025, 6, 1)
+    rows = []
+    for account in range(accounts):
+        for i in range(12):
+            end = to_date - datetime.timedelta(days=60 * i)
+            rows.append({
+                "ca": f"{account:010d}", "type": "bill", "total": "812.40",
+                "tranDate": _ts(end), "fromDate": _ts(end - datetime.timedelta(days=60)), "toDate": _ts(end),
+            })
+            rows.append({"ca": f"{account:010d}", "type": "payment", "total": "812.40", "tranDate": _ts(end)})
+    return json.dumps({"data": {"transactions": rows}}).encode()
+
+
+def dict_hourly(body: bytes) -> list:
+    response = json.loads(body)
+    return [
+        (series.to_epoch(parse_datetime(row['startDate'])), float(row['kwhTotal']))
+        for row in response['data']['results']
+        if row['startDate']
+    ]
+
+
+def typed_hourly(body: bytes) -> list:
+    return [
+        (reading.start, reading.kwh)
+        for reading in models.iter_readings(models.loads(body), "Hourly")
+        if reading.start is not None
+    ]
+
+
+def dict_billing(body: bytes) -> list:
+    response = json.loads(body)
+    records = []
+    for row in response['data']['transactions']:
+        if row['type'] != 'bill' and row['type'] != 'payment':
+            continue
+        record = {'total': float(row['total']), 'transaction_date': parse_datetime(row['tranDate'])}
+        if row['type'] == 'bill':
+            record['from_date'] = parse_datetime(row['fromDate'])
+            record['to_date'] = parse_datetime(row['toDate'])
+        records.append(record)
+    return records
+
+
+def typed_billing(body: bytes) -> list:
+    return models.decode_transactions(models.loads(body))
+
+
+def peak_kib(func, body: bytes) -> float:
+    tracemalloc.start()
+    func(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90, help="days of hourly rows in the history payload")
+    args = parser.parse_args()
+
+    print(f"JSON backend: {models.JSON_BACKEND}")
+    hourly = hourly_body(args.days)
+    assert dict_hourly(hourly) == typed_hourly(hourly)
+
+    for label, body, rows, paths in (
+            (f"hourly history ({args.days} days)", hourly, args.days * 24, (dict_hourly, typed_hourly)),
+            ("historyBilling (10 accounts)", billing_body(10), 240, (dict_billing, typed_billing)),
+    ):
+        print(f"{label}: {rows} rows, {len(body) / 1024:.0f} KiB x {args.repeat}")
+        baseline = None
+        for name, func in zip(("json + dict walk", "models decoders"), paths):
+            elapsed = min(timeit.repeat(lambda: func(body), number=args.repeat, repeat=3))
+            per_row = elapsed / (args.repeat * rows) * 1e9
+            baseline = baseline or elapsed
+            print(f"  {name:<18} {per_row:8.1f} ns/row  {baseline / elapsed:5.2f}x  peak {peak_kib(func, body):8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
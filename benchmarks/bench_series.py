@@ -0,0 +1,81 @@
+"""Compare TimeSeries with the previous list-of-dicts storage for hourly data.
+
+Also times window totals, as template sensors computed them by scanning the
+`hourly` attribute, against TimeSeries.sum.
+
+Usage: python benchmarks/bench_series.py [--days N]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import time
+import timeit
+import tracemalloc
+from zoneinfo import ZoneInfo
+
+from _loader import load
+
+series = load("series")
+
+HK_TZ = ZoneInfo("Asia/Hong_Kong")
+
+
+def build_dicts(points):
+    rows = [{'start': datetime.datetime.fromtimestamp(ts, HK_TZ), 'kwh': kwh} for ts, kwh in points]
+    return sorted(rows, key=lambda x: x['start'], reverse=True)
+
+
+def build_series(points):
+    result = series.TimeSeries()
+    for ts, kwh in points:
+        result.upsert(ts, kwh)
+    return result
+
+
+def measure(func, points):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(points)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    start = int(datetime.datetime(2025, 1, 1, tzinfo=HK_TZ).timestamp())
+    points = [(start + 3600 * i, (i % 24) * 0.05) for i in range(args.days * 24)]
+
+    _, dict_bytes, dict_time = measure(build_dicts, points)
+    _, series_bytes, series_time = measure(build_series, points)
+
+    print(f"{len(points)} hourly points")
+    print(f"  list of dicts  {dict_bytes / len(points):7.1f} bytes/point  {dict_time * 1000:8.1f} ms")
+    print(f"  TimeSeries     {series_bytes / len(points):7.1f} bytes/point  {series_time * 1000:8.1f} ms")
+
+    # The prefix sums are built by the first sum(), not by upsert
+    hourly = build_series(points)
+    _, sums_bytes, sums_time = measure(lambda series: series.sum(), hourly)
+    print(f"  + prefix sums  {sums_bytes / len(points):7.1f} bytes/point  {sums_time * 1000:8.1f} ms")
+    print(f"  memory ratio   {dict_bytes / (series_bytes + sums_bytes):7.1f}x")
+
+    rows = build_dicts(points)
+    end = points[-1][0] + 3600
+    for label, hours in (("last 24 hours", 24), ("last 7 days", 24 * 7), ("last 30 days", 24 * 30)):
+        start = end - hours * 3600
+        start_dt = datetime.datetime.fromtimestamp(start, HK_TZ)
+        scan = lambda: sum(row['kwh'] for row in rows if row['start'] >= start_dt)
+        indexed = lambda: hourly.sum(start, end)
+        assert abs(scan() - indexed()) < 1e-6
+        scan_time = min(timeit.repeat(scan, number=20, repeat=3)) / 20
+        indexed_time = min(timeit.repeat(indexed, number=2000, repeat=3)) / 2000
+        print(f"  {label:<14} scan {scan_time * 1e6:9.1f} us  TimeSeries.sum {indexed_time * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare the CLP timestamp parsers against the previous strptime path.
+
+Usage: python benchmarks/bench_timestamps.py [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import timeit
+from zoneinfo import ZoneInfo
+
+from _loader import load
+from _reference import parse_datetime
+
+timestamps = load("timestamps")
+
+HK_TZ = ZoneInfo("Asia/Hong_Kong")
+
+# Rows per response: one day of hourly data, a month of daily data, and a 90 day hourly history pull
+PAYLOAD_SIZES = {
+    "hourly (1 day)": 24,
+    "hourly (2 days)": 48,
+    "daily (1 month)": 31,
+    "hourly history (90 days)": 90 * 24,
+}
+
+
+def make_rows(count: int, step: datetime.timedelta) -> list[str]:
+    start = datetime.datetime(2025, 6, 1)
+    return [(start + step * i).strftime("%Y%m%d%H%M%S") for i in range(count)]
+
+
+def strptime_naive(rows):
+    return [datetime.datetime.strptime(row, "%Y%m%d%H%M%S") for row in rows]
+
+
+def strptime_aware(rows):
+    return [datetime.datetime.strptime(row, "%Y%m%d%H%M%S").replace(tzinfo=HK_TZ) for row in rows]
+
+
+def datetime_parser(rows):
+    return [parse_datetime(row) for row in rows]
+
+
+def epoch_parser(rows):
+    parse_epoch = timestamps.parse_epoch
+    return [parse_epoch(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for label, count in PAYLOAD_SIZES.items():
+        step = datetime.timedelta(days=1) if label.startswith("daily") else datetime.timedelta(hours=1)
+        rows = make_rows(count, step)
+        assert datetime_parser(rows) == strptime_aware(rows)
+        assert epoch_parser(rows) == [int(value.timestamp()) for value in strptime_aware(rows)]
+
+        print(f"{label}: {count} rows x {args.repeat}")
+        baseline = None
+        for name, func in (
+                ("strptime", strptime_naive),
+                ("strptime + tz", strptime_aware),
+                ("fixed-width datetime", datetime_parser),
+                ("timestamps.parse_epoch", epoch_parser),
+        ):
+            elapsed = min(timeit.repeat(lambda: func(rows), number=args.repeat, repeat=3))
+            per_row = elapsed / (args.repeat * count) * 1e9
+            baseline = baseline or elapsed
+            print(f"  {name:<28} {per_row:8.1f} ns/row  {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
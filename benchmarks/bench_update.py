@@ -0,0 +1,204 @@
+"""Time an update cycle, cold start and token refresh of the coordinator against the local mock CLP API.
+
+Usage: python benchmarks/bench_update.py [--runs N] [--concurrency N] [--hourly-days N] [--trace] [--decode-all]
+                                         [--latency S] [--jitter S] [--error-rate F]
+                                         [--payload-scale N] [--accounts N]
+
+Each cycle is CLPDataUpdateCoordinator._async_update_data with every series
+enabled, on a Home Assistant instance with a temporary config directory and the
+coordinator's client pointed at the mock server. Statistics are not imported,
+as that needs the recorder, and the rate limit shared by all entries is lifted
+so that it does not set the pace. Requires Home Assistant, aiohttp and
+cryptography.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+
+from mock_server import MockCLPServer, add_server_arguments
+
+# The integration itself is imported, not just its Home Assistant-free modules
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from custom_components.clphk import api, const, ratelimit  # noqa: E402
+from custom_components.clphk.coordinator import (  # noqa: E402
+    CLIENT_KEY_YAML,
+    DOMAIN,
+    CLPDataUpdateCoordinator,
+)
+
+UNLIMITED = 10 ** 9
+
+
+def coordinator_config(args) -> dict:
+    return {
+        CONF_NAME: "CLP",
+        const.CONF_MAX_CONCURRENT_REQUESTS: args.concurrency,
+        const.CONF_TRACE_REQUESTS: args.trace,
+        const.CONF_IMPORT_STATISTICS: False,
+        const.CONF_GET_ACCT: True,
+        const.CONF_GET_BILL: True,
+        const.CONF_GET_ESTIMATION: True,
+        const.CONF_GET_BIMONTHLY: True,
+        const.CONF_GET_DAILY: True,
+        const.CONF_GET_HOURLY: True,
+        const.CONF_GET_HOURLY_DAYS: args.hourly_days,
+        const.CONF_GET_COST: True,
+        const.CONF_RES_ENABLE: True,
+        const.CONF_RES_GET_BILL: True,
+        const.CONF_RES_GET_DAILY: True,
+        const.CONF_RES_GET_HOURLY: True,
+        const.CONF_RES_GET_HOURLY_DAYS: args.hourly_days,
+    }
+
+
+@contextlib.asynccontextmanager
+async def running_hass():
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        ratelimit.get_host_limits(hass).bucket = ratelimit.TokenBucket(UNLIMITED, UNLIMITED)
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
+
+
+async def start_coordinator(hass: HomeAssistant, server: MockCLPServer, base_url: str, args) -> CLPDataUpdateCoordinator:
+    """A coordinator with stored tokens, as after a restart, whose client talks to the mock server."""
+    tokens = server.issue_tokens()
+    hass.data.setdefault(DOMAIN, {})[CLIENT_KEY_YAML] = {
+        "access_token": tokens["accessToken"],
+        "refresh_token": tokens["refreshToken"],
+        "access_token_expiry_time": tokens["accessTokenExpiredAt"],
+        "token_lock": asyncio.Lock(),
+    }
+    coordinator = CLPDataUpdateCoordinator(hass, coordinator_config(args))
+    tracer = coordinator._client.tracer
+    await coordinator._client.close()
+    coordinator._client = api.CLPApiClient(base_url=base_url, limit_per_host=args.concurrency, tracer=tracer)
+    return coordinator
+
+
+def make_all_due(coordinator: CLPDataUpdateCoordinator, decode_all: bool) -> None:
+    """Empty the response cache and reset every schedule, so the next cycle sends every request."""
+    coordinator._cache.clear()
+    for sensor_type in coordinator.series:
+        coordinator._register_polls(sensor_type)
+    if decode_all:
+        coordinator._fingerprints.clear()
+
+
+def totals(coordinator: CLPDataUpdateCoordinator) -> tuple[int, int]:
+    """Rows parsed and failed requests so far."""
+    endpoints = coordinator.metrics.endpoints.values()
+    return sum(endpoint.rows for endpoint in endpoints), sum(endpoint.errors for endpoint in endpoints)
+
+
+async def update_cycle(coordinator: CLPDataUpdateCoordinator) -> tuple[int, int]:
+    """One update; return rows parsed and failed requests."""
+    rows, errors = totals(coordinator)
+    await coordinator._async_update_data()
+    rows_after, errors_after = totals(coordinator)
+    return rows_after - rows, errors_after - errors
+
+
+def summarize(label: str, timings: list[float], extra: str = "") -> None:
+    p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+    print(f"  {label:<16} median {statistics.median(timings) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms  {extra}")
+
+
+async def bench(args) -> None:
+    server = MockCLPServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        payload_scale=args.payload_scale,
+        accounts=args.accounts,
+    )
+    base_url = await server.start()
+    print(f"{args.runs} runs against {base_url}, latency {args.latency}s +{args.jitter}s, "
+          f"error rate {args.error_rate}, concurrency {args.concurrency}")
+
+    try:
+        # Cold start: a new instance and coordinator for each run, as after a restart with stored tokens
+        cold, rows, errors = [], 0, 0
+        for _ in range(args.runs):
+            async with running_hass() as hass:
+                coordinator = await start_coordinator(hass, server, base_url, args)
+                try:
+                    started = time.perf_counter()
+                    rows, run_errors = await update_cycle(coordinator)
+                    cold.append(time.perf_counter() - started)
+                    errors += run_errors
+                finally:
+                    await coordinator.async_shutdown()
+        summarize("cold start", cold, f"{rows} rows, {errors} failed requests")
+
+        # Steady state: one coordinator, so connections and fingerprints are kept across cycles
+        async with running_hass() as hass:
+            coordinator = await start_coordinator(hass, server, base_url, args)
+            try:
+                await update_cycle(coordinator)
+                skipped = coordinator.skipped_updates
+                warm, errors = [], 0
+                for _ in range(args.runs):
+                    make_all_due(coordinator, args.decode_all)
+                    started = time.perf_counter()
+                    rows, run_errors = await update_cycle(coordinator)
+                    warm.append(time.perf_counter() - started)
+                    errors += run_errors
+                summarize(
+                    "update cycle", warm,
+                    f"{rows} rows, {errors} failed requests, {coordinator.skipped_updates - skipped} unchanged updates",
+                )
+
+                refresh, errors = [], 0
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    try:
+                        await coordinator._async_refresh_access_token()
+                    except Exception:
+                        errors += 1
+                    refresh.append(time.perf_counter() - started)
+                summarize("token refresh", refresh, f"{errors} failed requests")
+
+                tracer = coordinator._client.tracer
+                if tracer is not None:
+                    summary = tracer.summary()
+                    print(f"  traced {summary['requests']} requests, {summary['reused']} on a reused connection")
+                    for phase, value in summary["average"].items():
+                        print(f"    {phase:<12} {value if value is not None else '-':>6}")
+            finally:
+                await coordinator.async_shutdown()
+
+        print(f"  {sum(server.requests.values())} requests served, {sum(server.errors.values())} answered with an error")
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1, help="like max_concurrent_requests")
+    parser.add_argument("--hourly-days", type=int, default=2)
+    parser.add_argument("--trace", action="store_true", help="print average request phases")
+    parser.add_argument("--decode-all", action="store_true", help="forget fingerprints before each cycle, so every payload is decoded")
+    add_server_arguments(parser)
+    # Failed requests are counted, not logged with a traceback each
+    logging.getLogger("custom_components.clphk").setLevel(logging.CRITICAL)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Local stand-in for api.clp.com.hk, serving the endpoints the integration uses.
+
+Usage: python benchmarks/mock_server.py [--port N] [--latency S] [--jitter S] [--error-rate F]
+                                        [--payload-scale N] [--accounts N]
+
+Point a CLPApiClient at it with `base_url`. Rows are generated for the requested
+window, so payload sizes follow the request; `--payload-scale` repeats every row.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import random
+import secrets
+from collections import Counter
+
+from aiohttp import web
+
+PATHS = {
+    "eligibility": "/ts2/ms/profile/register/eligibilityCheckAndLogin",
+    "otpverify": "/ts2/ms/profile/accountManagement/passwordlesslogin/otpverify",
+    "refresh_token": "/ts2/ms/profile/identity/manage/account/refresh_token",
+    "myServicesCA": "/ts1/ms/profile/accountdetails/myServicesCA",
+    "historyBilling": "/ts1/ms/billing/transaction/historyBilling",
+    "consumption/info": "/ts1/ms/consumption/info",
+    "consumption/history": "/ts1/ms/consumption/history",
+    "renew/fit/dashboard": "/ts1/ms/renew/fit/dashboard",
+}
+
+ACCESS_TOKEN_LIFETIME = datetime.timedelta(hours=1)
+
+
+def _ts(value: datetime.datetime) -> str:
+    return value.strftime("%Y%m%d%H%M%S")
+
+
+def _kwh(value: datetime.datetime) -> str:
+    return f"{0.2 + (value.hour % 24) * 0.05:.3f}"
+
+
+class MockCLPServer:
+    """Serves generated CLP payloads, with injected latency and errors."""
+
+    def __init__(
+            self,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            payload_scale: int = 1,
+            accounts: int = 1,
+            seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.payload_scale = payload_scale
+        self.accounts = [f"{9000000000 + i}" for i in range(accounts)]
+        self.requests = Counter()
+        self.errors = Counter()
+        self._random = random.Random(seed)
+        self._access_tokens = set()
+        self._refresh_tokens = set()
+        self._runner = None
+        self.base_url = None
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_post(PATHS["eligibility"], self._eligibility)
+        self.app.router.add_post(PATHS["otpverify"], self._otpverify)
+        self.app.router.add_post(PATHS["refresh_token"], self._refresh_token)
+        self.app.router.add_get(PATHS["myServicesCA"], self._my_services)
+        self.app.router.add_post(PATHS["historyBilling"], self._history_billing)
+        self.app.router.add_get(PATHS["consumption/info"], self._consumption_info)
+        self.app.router.add_post(PATHS["consumption/history"], self._consumption_history)
+        self.app.router.add_post(PATHS["renew/fit/dashboard"], self._renew_dashboard)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def issue_tokens(self) -> dict:
+        access_token = secrets.token_hex(16)
+        refresh_token = secrets.token_hex(16)
+        self._access_tokens.add(access_token)
+        self._refresh_tokens.add(refresh_token)
+        return {
+            "accessToken": access_token,
+            "refreshToken": refresh_token,
+            "accessTokenExpiredAt": (datetime.datetime.now(datetime.timezone.utc) + ACCESS_TOKEN_LIFETIME).isoformat(),
+        }
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests[request.path] += 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors[request.path] += 1
+            return web.json_response({"message": "Service Unavailable"}, status=503)
+
+        authorized = request.path not in (PATHS["eligibility"], PATHS["otpverify"], PATHS["refresh_token"])
+        if authorized and request.headers.get("Authorization") not in self._access_tokens:
+            self.errors[request.path] += 1
+            return web.json_response({"message": "Unauthorized"}, status=401)
+
+        return await handler(request)
+
+    def _rows(self, rows: list) -> list:
+        return rows * self.payload_scale
+
+    async def _eligibility(self, request: web.Request) -> web.Response:
+        return web.json_response({"data": {"isEligible": True}})
+
+    async def _otpverify(self, request: web.Request) -> web.Response:
+        return web.json_response({"data": self.issue_tokens()})
+
+    async def _refresh_token(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        if payload.get("refreshToken") not in self._refresh_tokens:
+            return web.json_response({"message": "Invalid refresh token"}, status=401)
+        self._refresh_tokens.discard(payload["refreshToken"])
+        return web.json_response({"data": self.issue_tokens()})
+
+    async def _my_services(self, request: web.Request) -> web.Response:
+        due_date = _ts(datetime.datetime.now() + datetime.timedelta(days=14))
+        return web.json_response({
+            "data": [
+                {"caNo": account, "status": "Active", "outstandingAmount": "512.30", "dueDate": due_date}
+                for account in self.accounts
+            ],
+        })
+
+    async def _history_billing(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        today = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        transactions = []
+        for item in payload.get("caList", []):
+            for i in range(12):
+                to_date = today - datetime.timedelta(days=60 * i)
+                from_date = to_date - datetime.timedelta(days=60)
+                transactions.append({
+                    "ca": item["ca"], "type": "bill", "total": "812.40",
+                    "tranDate": _ts(to_date), "fromDate": _ts(from_date), "toDate": _ts(to_date),
+                })
+                transactions.append({
+                    "ca": item["ca"], "type": "payment", "total": "812.40",
+                    "tranDate": _ts(to_date + datetime.timedelta(days=10)),
+                })
+        return web.json_response({"data": {"transactions": self._rows(transactions)}})
+
+    async def _consumption_info(self, request: web.Request) -> web.Response:
+        today = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return web.json_response({
+            "data": {
+                "currentConsumption": "321.5",
+                "currentCost": "402.1",
+                "currentStartDate": _ts(today - datetime.timedelta(days=30)),
+                "currentEndDate": _ts(today),
+                "deviationPercent": "3.2",
+                "projectedConsumption": "640.0",
+                "projectedCost": "801.9",
+                "projectedStartDate": _ts(today - datetime.timedelta(days=30)),
+                "projectedEndDate": _ts(today + datetime.timedelta(days=30)),
+            },
+        })
+
+    async def _consumption_history(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        from_date = datetime.datetime.strptime(payload["fromDate"], "%Y%m%d%H%M%S")
+        to_date = min(datetime.datetime.strptime(payload["toDate"], "%Y%m%d%H%M%S"), datetime.datetime.now())
+        mode = payload["mode"]
+
+        results = []
+        if mode == "Hourly":
+            step = datetime.timedelta(hours=1)
+        elif mode == "Daily":
+            step = datetime.timedelta(days=1)
+        else:
+            step = datetime.timedelta(days=60)
+
+        start = from_date
+        while start < to_date:
+            end = start + step
+            if mode == "Bill":
+                results.append({"totKwh": "640.0", "endabrpe": end.strftime("%Y%m%d")})
+            else:
+                results.append({"startDate": _ts(start), "expireDate": _ts(end), "kwhTotal": _kwh(start)})
+            start = end
+
+        if mode == "Bill":
+            results.reverse()
+        return web.json_response({"data": {"results": self._rows(results)}})
+
+    async def _renew_dashboard(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        start_date = datetime.datetime.strptime(payload["startDate"], "%m/%d/%Y")
+        mode = payload["mode"]
+
+        if mode == "H":
+            starts = [start_date + datetime.timedelta(hours=i) for i in range(24)]
+            step = datetime.timedelta(hours=1)
+        elif mode == "D":
+            starts = [start_date - datetime.timedelta(days=i) for i in range(30, 0, -1)]
+            step = datetime.timedelta(days=1)
+        else:
+            starts = [start_date - datetime.timedelta(days=60 * i) for i in range(6, 0, -1)]
+            step = datetime.timedelta(days=60)
+
+        rows = [
+            {"startdate": _ts(start), "enddate": _ts(start + step), "kwhtotal": _kwh(start), "validateStatus": "Y"}
+            for start in starts
+        ]
+        return web.json_response({"data": {"consumptionData": self._rows(rows)}})
+
+
+async def serve(args) -> None:
+    server = MockCLPServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        payload_scale=args.payload_scale,
+        accounts=args.accounts,
+    )
+    base_url = await server.start(port=args.port)
+    print(f"Mock CLP API on {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="up to this many extra seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--payload-scale", type=int, default=1, help="repeat every row this many times")
+    parser.add_argument("--accounts", type=int, default=1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8080)
+    add_server_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,46 @@
 import asyncio
 import logging
 
-import aiohttp
-import async_timeout
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.ulid import ulid_now
 
+from .api import CLPApiClient
 from .const import (
     CONF_DOMAIN,
+    CONF_INSTANCE_SUFFIX,
 )
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 async def verify_otp(session, email, otp, timeout=30):
     """Verify OTP and return token data or raise exception."""
-    url = "https://api.clp.com.hk/ts2/ms/profile/accountManagement/passwordlesslogin/otpverify"
-    json_payload = {
-        "type": "email",
-        "email": email,
-        "otp": otp,
-    }
     try:
-        async with async_timeout.timeout(timeout):
-            async with session.post(url, json=json_payload) as response:
-                response.raise_for_status()
-                data = await response.json()
-                if not data or 'data' not in data:
-                    raise ValueError('Invalid response data')
-                _LOGGER.debug(f"OTP verification response: {data}")
-                resp = data["data"]
-                return {
-                    "access_token": resp.get("accessToken") or resp.get("access_token"),
-                    "refresh_token": resp.get("refreshToken") or resp.get("refresh_token"),
-                    "access_token_expiry_time": resp.get("accessTokenExpiredAt")
-                    or resp.get("access_token_expiry_time")
-                    or resp.get("expires_in"),
-                }
+        # A one-off call, so it borrows the given session instead of opening a pool
+        token_data = await CLPApiClient(session=session, timeout=timeout).verify_otp(email, otp)
+        _LOGGER.debug("OTP verification succeeded")
+        return token_data
     except Exception as ex:
-        _LOGGER.error(f"OTP verification failed: {ex}")
+        _LOGGER.error("OTP verification failed: %s", ex)
         raise
 
+def new_instance_suffix(entries) -> str:
+    """Suffix for a new login: none while no other entry uses the unsuffixed ids."""
+    if all(entry.data.get(CONF_INSTANCE_SUFFIX) for entry in entries):
+        return ""
+    return f"_{ulid_now().lower()}"
+
 async def async_setup(hass: HomeAssistant, config: dict):
-    session = async_get_clientsession(hass)
-    hass.data[CONF_DOMAIN] = {
-        "session": session
-    }
+    hass.data.setdefault(CONF_DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry):
-    if CONF_DOMAIN not in hass.data:
-        session = async_get_clientsession(hass)
-        hass.data[CONF_DOMAIN] = {
-            "session": session,
+    domain_data = hass.data.setdefault(CONF_DOMAIN, {})
+    # Each login has its own tokens and lock, so entries never overwrite each other
+    if entry.entry_id not in domain_data:
+        domain_data[entry.entry_id] = {
             "access_token": entry.data.get("access_token"),
             "refresh_token": entry.data.get("refresh_token"),
             "access_token_expiry_time": entry.data.get("access_token_expiry_time"),
@@ -61,11 +49,28 @@ async def async_setup_entry(hass: HomeAssistant, entry):
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
     return True
 
+async def async_migrate_entry(hass: HomeAssistant, entry):
+    """Version 2 stores the instance suffix, so ids no longer depend on the order of entries."""
+    if entry.version == 1:
+        # The suffix version 1 derived: none for the first entry, the entry ID for later ones
+        entries = hass.config_entries.async_entries(CONF_DOMAIN)
+        suffix = "" if entries and entries[0].entry_id == entry.entry_id else f"_{entry.entry_id.lower()}"
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_INSTANCE_SUFFIX: suffix}, version=2
+        )
+        _LOGGER.debug("Migrated config entry %s to version 2", entry.entry_id)
+    return True
+
 async def async_unload_entry(hass: HomeAssistant, entry):
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
     if unload_ok and CONF_DOMAIN in hass.data:
-        hass.data.pop(CONF_DOMAIN)
+        client_state = hass.data[CONF_DOMAIN].get(entry.entry_id) or {}
+        coordinator = client_state.get("coordinator")
+        # The coordinator's tasks read the token state, so they stop before it is dropped
+        if coordinator is not None:
+            await coordinator.async_shutdown()
+        hass.data[CONF_DOMAIN].pop(entry.entry_id, None)
     return unload_ok
 
 async def async_reload_entry(hass: HomeAssistant, entry):
@@ -0,0 +1,291 @@
+"""Client for api.clp.com.hk. Depends only on aiohttp and cryptography, not on Home Assistant."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import datetime
+import hashlib
+import logging
+import ssl
+from typing import NamedTuple
+
+import aiohttp
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+from .capture import ResponseCapture, redact_body
+from .const import CONF_CLP_PUBLIC_KEY
+from .models import loads
+from .tracing import RequestTracer
+
+_LOGGER = logging.getLogger(__name__)
+
+BASE_URL = "https://api.clp.com.hk"
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+}
+# Keep idle connections long enough to span one update cycle's back-to-back calls
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+# Error messages quote at most this much of the body; the capture buffer keeps the rest
+ERROR_BODY_CHARS = 500
+
+
+class CLPApiError(Exception):
+    """A request failed; `status` is the HTTP status, if one was received."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def transient(self) -> bool:
+        """A server error or no response at all, as opposed to a rejected request."""
+        return self.status is None or self.status >= 500
+
+
+class CLPResponse(NamedTuple):
+    data: dict
+    # Hash of the raw body, so callers can tell an unchanged payload without comparing parsed data
+    fingerprint: str
+    size: int
+
+
+def _excerpt(body: bytes) -> str:
+    # Error messages end up in logs and diagnostics, so they are redacted like captured responses
+    return redact_body(body, ERROR_BODY_CHARS)
+
+
+def _tokens(data: dict) -> dict:
+    return {
+        "access_token": data.get("accessToken") or data.get("access_token"),
+        "refresh_token": data.get("refreshToken") or data.get("refresh_token"),
+        "access_token_expiry_time": data.get("accessTokenExpiredAt")
+        or data.get("access_token_expiry_time")
+        or data.get("expires_in"),
+    }
+
+
+class CLPApiClient:
+    """Typed calls to the CLP endpoints over one keep-alive connection pool.
+
+    Without a `session`, the client opens its own, with DNS caching and a
+    per-host connection limit, and must be closed with `close()`. A `tracer`
+    records the phase timings of every request on that session; a `capture`
+    keeps the last raw responses, redacted.
+    """
+
+    def __init__(
+            self,
+            session: aiohttp.ClientSession | None = None,
+            base_url: str = BASE_URL,
+            timeout: int = 30,
+            limit_per_host: int = 4,
+            ssl_context: ssl.SSLContext | None = None,
+            tracer: RequestTracer | None = None,
+            capture: ResponseCapture | None = None,
+    ) -> None:
+        self._session = session
+        self._owns_session = session is None
+        self._base_url = base_url.rstrip("/")
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._limit_per_host = limit_per_host
+        self._ssl_context = ssl_context
+        self.tracer = tracer
+        self.capture = capture
+        self._headers = dict(DEFAULT_HEADERS)
+        self._access_token = None
+
+    @property
+    def access_token(self) -> str | None:
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, value: str | None) -> None:
+        # Headers are rebuilt only when the token changes, not on every call
+        if value == self._access_token:
+            return
+        self._access_token = value
+        self._headers = dict(DEFAULT_HEADERS)
+        if value:
+            self._headers["Authorization"] = value
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self._limit_per_host,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ssl=self._ssl_context if self._ssl_context is not None else True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                trace_configs=[self.tracer.trace_config()] if self.tracer is not None else None,
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(
+            self,
+            method: str,
+            path: str,
+            payload: dict | None = None,
+            params: dict | None = None,
+            authorized: bool = True,
+            name: str | None = None,
+    ) -> CLPResponse:
+        """`name` identifies the endpoint in traces; it defaults to the path."""
+        url = f"{self._base_url}{path}"
+        headers = self._headers if authorized else DEFAULT_HEADERS
+        try:
+            async with self._get_session().request(
+                    method,
+                    url,
+                    headers=headers,
+                    json=payload,
+                    params=params,
+                    timeout=self._timeout,
+                    trace_request_ctx={"endpoint": name or path},
+            ) as response:
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise CLPApiError(f"{url} : {e!r}") from e
+
+        if self.capture is not None:
+            self.capture.add(name or path, response.status, body)
+
+        if response.status >= 400:
+            raise CLPApiError(f"{response.status} {url} : {_excerpt(body)}", response.status)
+
+        try:
+            data = loads(body)
+        except ValueError as e:
+            raise CLPApiError(f"{response.status} {url} : {_excerpt(body)}", response.status) from e
+
+        if not data or 'data' not in data:
+            raise CLPApiError(f"{response.status} {url} : Invalid response data {_excerpt(body)}", response.status)
+
+        return CLPResponse(data, hashlib.blake2b(body, digest_size=16).hexdigest(), len(body))
+
+    @staticmethod
+    def _encrypt(value: str) -> str:
+        public_key = serialization.load_pem_public_key(CONF_CLP_PUBLIC_KEY.encode())
+        return base64.b64encode(public_key.encrypt(
+            value.encode('utf-8'),
+            padding.OAEP(
+                mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                algorithm=hashes.SHA256(),
+                label=None,
+            )
+        )).decode()
+
+    async def request_otp(self, email: str) -> CLPResponse:
+        """Ask CLP to e-mail a one-time password."""
+        return await self.request(
+            "POST",
+            "/ts2/ms/profile/register/eligibilityCheckAndLogin",
+            payload={
+                "email": self._encrypt(email),
+                "phone": "",
+                "type": self._encrypt("email"),
+            },
+            authorized=False,
+            name="request_otp",
+        )
+
+    async def verify_otp(self, email: str, otp: str) -> dict:
+        """Exchange a one-time password for tokens."""
+        response = await self.request(
+            "POST",
+            "/ts2/ms/profile/accountManagement/passwordlesslogin/otpverify",
+            payload={
+                "type": "email",
+                "email": email,
+                "otp": otp,
+            },
+            authorized=False,
+            name="verify_otp",
+        )
+        return _tokens(response.data["data"])
+
+    async def refresh_token(self, refresh_token: str) -> dict:
+        response = await self.request(
+            "POST",
+            "/ts2/ms/profile/identity/manage/account/refresh_token",
+            payload={
+                "refreshToken": refresh_token,
+            },
+            authorized=False,
+            name="refresh_token",
+        )
+        return _tokens(response.data["data"])
+
+    async def account_details(self) -> CLPResponse:
+        return await self.request("GET", "/ts1/ms/profile/accountdetails/myServicesCA", name="myServicesCA")
+
+    async def billing_history(self, accounts: list[str]) -> CLPResponse:
+        """Bills and payments of every account in one request."""
+        return await self.request(
+            "POST",
+            "/ts1/ms/billing/transaction/historyBilling",
+            payload={
+                "caList": [
+                    {
+                        "ca": account,
+                    }
+                    for account in accounts
+                ],
+            },
+            name="historyBilling",
+        )
+
+    async def consumption_info(self, account: str) -> CLPResponse:
+        return await self.request(
+            "GET",
+            "/ts1/ms/consumption/info",
+            params={
+                "ca": account,
+            },
+            name="consumption/info",
+        )
+
+    async def consumption_history(
+            self,
+            account: str,
+            mode: str,
+            from_date: datetime.date,
+            to_date: datetime.date,
+    ) -> CLPResponse:
+        """`mode` is one of Bill, Daily or Hourly."""
+        return await self.request(
+            "POST",
+            "/ts1/ms/consumption/history",
+            payload={
+                "ca": account,
+                "fromDate": from_date.strftime("%Y%m%d000000"),
+                "mode": mode,
+                "toDate": to_date.strftime("%Y%m%d000000"),
+                "type": "Unit",
+            },
+            name=f"consumption/history/{mode}",
+        )
+
+    async def renewable_dashboard(self, account: str, mode: str, start_date: datetime.date) -> CLPResponse:
+        """`mode` is one of B (billing periods), D (daily) or H (hourly)."""
+        return await self.request(
+            "POST",
+            "/ts1/ms/renew/fit/dashboard",
+            payload={
+                "caNo": account,
+                "mode": mode,
+                "startDate": start_date.strftime("%m/%d/%Y"),
+            },
+            name=f"renew/fit/dashboard/{mode}",
+        )
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CONF_DOMAIN
+from .timestamps import HK_TZ
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Pause between day requests, so a long backfill never competes with regular polling
+CHUNK_DELAY = 10
+ERROR_RETRY_DELAY = 600
+# CLP has no hourly data before a smart meter was installed; stop after this many empty days
+MAX_EMPTY_DAYS = 7
+
+STATUS_IDLE = 'idle'
+STATUS_RUNNING = 'running'
+STATUS_WAITING = 'waiting'
+STATUS_DONE = 'done'
+
+
+class HourlyBackfill:
+    """Walks hourly history backwards one day per request, with a persisted checkpoint.
+
+    Each day is written straight into a per-month Store shard, so only one month
+    of rows is ever held in memory, however long the backfill is. Once the walk
+    ends, the shards are handed to `import_hours` oldest first, so statistics
+    sums are carried forward in one pass instead of rebased for every month.
+    """
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            series_key: str,
+            days: int,
+            fetch_day: Callable[[datetime.date], Awaitable[list[tuple[int, float]]]],
+            import_hours: Callable[[AsyncIterator[dict[int, float]]], Awaitable[int]],
+    ) -> None:
+        self._hass = hass
+        self._series_key = series_key
+        self._days = days
+        self._fetch_day = fetch_day
+        self._import_hours = import_hours
+        self._checkpoint_store = Store(hass, STORAGE_VERSION, f"{CONF_DOMAIN}.backfill.{series_key}")
+        self._task = None
+        self._listeners = []
+
+        self.status = STATUS_IDLE
+        self.next_day = None
+        self.stop_day = None
+        # Days on or after this one are already in statistics
+        self.imported_day = None
+        self.days_done = 0
+        self.rows = 0
+        self.empty_days = 0
+        self.last_error = None
+        self._run_started = None
+        self._run_rows = 0
+
+    @property
+    def days(self) -> int:
+        return self._days
+
+    @property
+    def progress(self) -> float:
+        if self.status == STATUS_DONE:
+            return 100.0
+        if not self._days:
+            return 0.0
+        return round(min(100.0, self.days_done * 100 / self._days), 1)
+
+    @property
+    def rows_per_minute(self) -> float | None:
+        if not self._run_started:
+            return None
+        elapsed = time.monotonic() - self._run_started
+        if elapsed <= 0:
+            return None
+        return round(self._run_rows * 60 / elapsed, 1)
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _month_store(self, day: datetime.date) -> Store:
+        return Store(self._hass, STORAGE_VERSION, f"{CONF_DOMAIN}.backfill.{self._series_key}.{day:%Y%m}")
+
+    async def _async_load_checkpoint(self, start_day: datetime.date) -> None:
+        checkpoint = await self._checkpoint_store.async_load()
+        if checkpoint and checkpoint.get("days") == self._days:
+            self.next_day = datetime.date.fromisoformat(checkpoint["next_day"])
+            self.stop_day = datetime.date.fromisoformat(checkpoint["stop_day"])
+            self.days_done = checkpoint.get("days_done", 0)
+            self.rows = checkpoint.get("rows", 0)
+            self.empty_days = checkpoint.get("empty_days", 0)
+            # Checkpoints written before the import have every day still to import
+            imported_day = checkpoint.get("imported_day")
+            self.imported_day = (
+                datetime.date.fromisoformat(imported_day) if imported_day
+                else self.stop_day + datetime.timedelta(days=self._days + 1)
+            )
+            return
+
+        self.next_day = start_day
+        self.stop_day = start_day - datetime.timedelta(days=self._days)
+        self.imported_day = start_day + datetime.timedelta(days=1)
+
+    async def _async_save_checkpoint(self) -> None:
+        await self._checkpoint_store.async_save({
+            "days": self._days,
+            "next_day": self.next_day.isoformat(),
+            "stop_day": self.stop_day.isoformat(),
+            "days_done": self.days_done,
+            "rows": self.rows,
+            "empty_days": self.empty_days,
+            "imported_day": self.imported_day.isoformat(),
+        })
+
+    async def _async_write_day(self, day: datetime.date, rows: list[tuple[int, float]]) -> None:
+        store = self._month_store(day)
+        shard = await store.async_load() or {"hours": {}}
+        for start, kwh in rows:
+            shard["hours"][str(start)] = kwh
+        await store.async_save(shard)
+
+    async def _async_fetched_months(self, first_day: datetime.date) -> AsyncIterator[dict[int, float]]:
+        """Hours from `first_day` up to the imported ones, one month at a time, oldest first."""
+        start = int(datetime.datetime.combine(first_day, datetime.time(), HK_TZ).timestamp())
+        end = int(datetime.datetime.combine(self.imported_day, datetime.time(), HK_TZ).timestamp())
+        month = first_day.replace(day=1)
+        while month < self.imported_day:
+            shard = await self._month_store(month).async_load() or {"hours": {}}
+            yield {int(key): kwh for key, kwh in shard["hours"].items() if start <= int(key) < end}
+            month = (month + datetime.timedelta(days=32)).replace(day=1)
+
+    async def _async_import_fetched(self) -> None:
+        """Import the days fetched since the last import, then move the checkpoint past them."""
+        first_day = self.next_day + datetime.timedelta(days=1)
+        if first_day >= self.imported_day:
+            return
+
+        try:
+            await self._import_hours(self._async_fetched_months(first_day))
+        except Exception as e:
+            # Left for the next start
+            _LOGGER.warning("[BACKFILL] %s: failed to import %s into statistics: %s", self._series_key, first_day, e)
+            return
+        self.imported_day = first_day
+        await self._async_save_checkpoint()
+
+    @callback
+    def async_start(self, start_day: datetime.date) -> None:
+        """Start (or resume) walking back from `start_day`; a no-op while running or once finished."""
+        if self.status == STATUS_DONE or (self._task is not None and not self._task.done()):
+            return
+        self._task = self._hass.async_create_background_task(
+            self._async_run(start_day),
+            name=f"{CONF_DOMAIN} backfill {self._series_key}",
+        )
+
+    async def async_stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _async_run(self, start_day: datetime.date) -> None:
+        await self._async_load_checkpoint(start_day)
+        self._run_started = time.monotonic()
+        self._run_rows = 0
+
+        while self.next_day > self.stop_day and self.empty_days < MAX_EMPTY_DAYS:
+            self.status = STATUS_RUNNING
+            self._async_notify()
+            day = self.next_day
+            try:
+                rows = await self._fetch_day(day)
+            except Exception as e:
+                self.last_error = str(e)
+                self.status = STATUS_WAITING
+                _LOGGER.warning("[BACKFILL] %s %s: %s, retrying in %s seconds", self._series_key, day, e, ERROR_RETRY_DELAY)
+                self._async_notify()
+                await asyncio.sleep(ERROR_RETRY_DELAY)
+                continue
+
+            self.last_error = None
+            if rows:
+                await self._async_write_day(day, rows)
+                self.empty_days = 0
+            else:
+                self.empty_days += 1
+
+            self.days_done += 1
+            self.rows += len(rows)
+            self._run_rows += len(rows)
+            self.next_day = day - datetime.timedelta(days=1)
+            await self._async_save_checkpoint()
+            _LOGGER.debug("[BACKFILL] %s %s: %s rows, %s%% done", self._series_key, day, len(rows), self.progress)
+
+            await asyncio.sleep(CHUNK_DELAY)
+
+        await self._async_import_fetched()
+        self.status = STATUS_DONE
+        if self._run_rows:
+            _LOGGER.info("[BACKFILL] %s finished after %s days and %s rows", self._series_key, self.days_done, self.rows)
+        else:
+            _LOGGER.debug("[BACKFILL] %s already finished", self._series_key)
+        self._async_notify()
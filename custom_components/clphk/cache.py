@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CONF_DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{CONF_DOMAIN}.response_cache"
+SAVE_DELAY = 10
+
+
+class CLPResponseCache:
+    """Keeps raw CLP responses on disk so a restart only refetches expired ones."""
+
+    def __init__(self, hass: HomeAssistant, key: str = STORAGE_KEY) -> None:
+        self._store = Store(hass, STORAGE_VERSION, key)
+        self._entries = {}
+        self.loaded = False
+
+    @staticmethod
+    def make_key(endpoint: str, account: str | None, window: dict | None = None) -> str:
+        return f"{endpoint}|{account}|{json.dumps(window or {}, sort_keys=True, default=str)}"
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        now = time.time()
+        self._entries = {
+            key: entry
+            for key, entry in data.get("entries", {}).items()
+            if entry.get("expires", 0) > now
+        }
+        self.loaded = True
+        _LOGGER.debug("[CACHE] Loaded %s unexpired responses from disk", len(self._entries))
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires"] <= time.time():
+            self._entries.pop(key, None)
+            return None
+        return entry["data"]
+
+    def fingerprint(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        return entry.get("fingerprint") if entry is not None else None
+
+    def set(self, key: str, data, ttl: datetime.timedelta, fingerprint: str | None = None) -> None:
+        now = time.time()
+        # Drop anything expired so old date windows do not pile up in the file
+        self._entries = {k: v for k, v in self._entries.items() if v["expires"] > now}
+        self._entries[key] = {
+            "expires": now + ttl.total_seconds(),
+            "data": data,
+            "fingerprint": fingerprint,
+        }
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {"entries": self._entries}
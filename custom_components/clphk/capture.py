@@ -0,0 +1,103 @@
+"""Size-capped ring buffer of raw CLP responses, with secrets redacted. Independent of Home Assistant."""
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import deque
+
+# Responses kept per endpoint
+CAPTURE_PER_ENDPOINT = 5
+# Longer bodies are cut off; history responses can run to hundreds of kilobytes
+MAX_BODY_CHARS = 64 * 1024
+# Oldest responses of any endpoint are dropped once all bodies together exceed this
+MAX_TOTAL_CHARS = 1024 * 1024
+
+REDACTED = "**REDACTED**"
+REDACT_KEYS = frozenset({
+    "accessToken",
+    "refreshToken",
+    "access_token",
+    "refresh_token",
+    "authorization",
+    "Authorization",
+    "email",
+    "otp",
+    # Contract account numbers
+    "caNo",
+    "ca",
+})
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+def redact(value):
+    """Copy of a decoded JSON value with secret fields and e-mail addresses replaced."""
+    if isinstance(value, dict):
+        return {key: REDACTED if key in REDACT_KEYS else redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return EMAIL_PATTERN.sub(REDACTED, value)
+    return value
+
+
+def redact_body(body: bytes, limit: int | None = None) -> str:
+    """Body as text, with token, e-mail and account number fields and any e-mail address replaced.
+
+    With `limit`, only that many characters are kept, after redacting the whole body.
+    """
+    text = body.decode(errors="replace")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return EMAIL_PATTERN.sub(REDACTED, text)[:limit]
+    return json.dumps(redact(data), ensure_ascii=False)[:limit]
+
+
+class ResponseCapture:
+    """Keeps the last few raw responses of each endpoint, for diagnostics."""
+
+    def __init__(
+            self,
+            per_endpoint: int = CAPTURE_PER_ENDPOINT,
+            max_body_chars: int = MAX_BODY_CHARS,
+            max_total_chars: int = MAX_TOTAL_CHARS,
+    ) -> None:
+        self._per_endpoint = per_endpoint
+        self._max_body_chars = max_body_chars
+        self._max_total_chars = max_total_chars
+        self._responses = {}
+        # Insertion order across endpoints, so the oldest response overall can be dropped
+        self._order = deque()
+        self._total_chars = 0
+
+    def add(self, endpoint: str, status: int, body: bytes) -> None:
+        text = redact_body(body)
+        record = {
+            "time": time.time(),
+            "status": status,
+            "size": len(body),
+            "truncated": len(text) > self._max_body_chars,
+            "body": text[:self._max_body_chars],
+        }
+
+        responses = self._responses.setdefault(endpoint, deque())
+        responses.append(record)
+        self._order.append((endpoint, record))
+        self._total_chars += len(record["body"])
+
+        if len(responses) > self._per_endpoint:
+            self._drop(endpoint, responses.popleft())
+        while self._total_chars > self._max_total_chars and len(self._order) > 1:
+            oldest_endpoint, oldest = self._order[0]
+            self._responses[oldest_endpoint].remove(oldest)
+            self._drop(oldest_endpoint, oldest)
+
+    def _drop(self, endpoint: str, record: dict) -> None:
+        self._order.remove((endpoint, record))
+        self._total_chars -= len(record["body"])
+        if not self._responses[endpoint]:
+            del self._responses[endpoint]
+
+    def as_dict(self) -> dict:
+        return {endpoint: list(responses) for endpoint, responses in self._responses.items()}
@@ -24,15 +24,25 @@ from homeassistant.helpers.selector import (
     BooleanSelector,
 )
 
-from . import verify_otp
+from . import new_instance_suffix, verify_otp
 from .const import (
+    CONF_BACKFILL_DAYS,
+    CONF_BACKGROUND_STARTUP,
+    CONF_CAPTURE_RESPONSES,
+    CONF_DATASET_SENSORS,
     CONF_GET_ACCT,
     CONF_GET_BILL,
     CONF_GET_BIMONTHLY,
+    CONF_GET_COST,
     CONF_GET_DAILY,
     CONF_GET_ESTIMATION,
     CONF_GET_HOURLY,
     CONF_GET_HOURLY_DAYS,
+    CONF_IMPORT_STATISTICS,
+    CONF_INCREMENTAL_FETCH,
+    CONF_INSTANCE_SUFFIX,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_METRICS_SENSORS,
     CONF_RETRY_DELAY,
     CONF_RES_ENABLE,
     CONF_RES_GET_BILL,
@@ -41,6 +51,11 @@ from .const import (
     CONF_RES_GET_HOURLY_DAYS,
     CONF_RES_NAME,
     CONF_RES_TYPE,
+    CONF_ROLLING_SENSORS,
+    CONF_TARIFF_FILE,
+    CONF_TOKEN_REFRESH_JITTER,
+    CONF_TOKEN_REFRESH_LEAD,
+    CONF_TRACE_REQUESTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -52,7 +67,7 @@ class CLPHKOptionsFlowHandler(config_entries.OptionsFlow):
         self._user_input = dict(config_entry.options)
 
     async def async_step_init(self, user_input=None):
-        _LOGGER.debug(f"[CFG] async_step_init called with user_input={user_input}")
+        _LOGGER.debug("[CFG] async_step_init called, submitted=%s", user_input is not None)
         errors = {}
         data = {**self.config_entry.data, **self._user_input}
         if user_input is not None:
@@ -61,9 +76,9 @@ class CLPHKOptionsFlowHandler(config_entries.OptionsFlow):
             timeout = user_input.get("timeout", 30)
             session = aiohttp_client.async_get_clientsession(self.hass)
             try:
-                _LOGGER.debug(f"[CFG] Verifying OTP for email={email}, otp={otp}, timeout={timeout}")
+                _LOGGER.debug("[CFG] Verifying OTP, timeout=%s", timeout)
                 token_data = await verify_otp(session, email, otp, timeout)
-                _LOGGER.debug(f"[CFG] OTP verification returned token_data={token_data}")
+                _LOGGER.debug("[CFG] OTP verification returned tokens expiring at %s", token_data.get("access_token_expiry_time"))
                 user_input["access_token"] = token_data["access_token"]
                 user_input["refresh_token"] = token_data["refresh_token"]
                 user_input["access_token_expiry_time"] = token_data.get("access_token_expiry_time")
@@ -71,13 +86,13 @@ class CLPHKOptionsFlowHandler(config_entries.OptionsFlow):
                     self.config_entry,
                     data={**self.config_entry.data, **user_input},
                 )
-                _LOGGER.debug(f"[CFG] Updated config entry with new tokens, triggering reload.")
+                _LOGGER.debug("[CFG] Updated config entry with new tokens, triggering reload.")
                 await self.hass.config_entries.async_reload(self.config_entry.entry_id)
                 return self.async_create_entry(title=self.config_entry.title, data=user_input)
             except Exception as ex:
-                _LOGGER.exception(f"[CFG] OTP verification or config update failed: {ex}")
+                _LOGGER.exception("[CFG] OTP verification or config update failed: %s", ex)
                 errors["base"] = "auth_failed"
-        _LOGGER.debug(f"[CFG] Showing config form with data={data} errors={errors}")
+        _LOGGER.debug("[CFG] Showing config form with errors=%s", errors)
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
@@ -95,6 +110,19 @@ class CLPHKOptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_RETRY_DELAY,
                     default=data.get(CONF_RETRY_DELAY, 300),
                 ): NumberSelector(NumberSelectorConfig(min=60, max=3600, mode=NumberSelectorMode.BOX)),
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=data.get(CONF_MAX_CONCURRENT_REQUESTS, 1),
+                ): NumberSelector(NumberSelectorConfig(min=1, max=8, mode=NumberSelectorMode.BOX)),
+                vol.Optional(CONF_BACKGROUND_STARTUP, default=data.get(CONF_BACKGROUND_STARTUP, True)): BooleanSelector(),
+                vol.Optional(
+                    CONF_TOKEN_REFRESH_LEAD,
+                    default=data.get(CONF_TOKEN_REFRESH_LEAD, 300),
+                ): NumberSelector(NumberSelectorConfig(min=60, max=3600, mode=NumberSelectorMode.BOX)),
+                vol.Optional(
+                    CONF_TOKEN_REFRESH_JITTER,
+                    default=data.get(CONF_TOKEN_REFRESH_JITTER, 60),
+                ): NumberSelector(NumberSelectorConfig(min=0, max=600, mode=NumberSelectorMode.BOX)),
                 vol.Optional(CONF_TYPE, default=data.get(CONF_TYPE, "")): TextSelector(TextSelectorConfig()),
                 vol.Optional(CONF_GET_ACCT, default=data.get(CONF_GET_ACCT, False)): BooleanSelector(),
                 vol.Optional(CONF_GET_BILL, default=data.get(CONF_GET_BILL, False)): BooleanSelector(),
@@ -106,6 +134,19 @@ class CLPHKOptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_GET_HOURLY_DAYS,
                     default=data.get(CONF_GET_HOURLY_DAYS, 1),
                 ): NumberSelector(NumberSelectorConfig(min=1, max=2, mode=NumberSelectorMode.BOX)),
+                vol.Optional(CONF_GET_COST, default=data.get(CONF_GET_COST, False)): BooleanSelector(),
+                vol.Optional(CONF_TARIFF_FILE, default=data.get(CONF_TARIFF_FILE, "")): TextSelector(TextSelectorConfig()),
+                vol.Optional(CONF_IMPORT_STATISTICS, default=data.get(CONF_IMPORT_STATISTICS, True)): BooleanSelector(),
+                vol.Optional(CONF_INCREMENTAL_FETCH, default=data.get(CONF_INCREMENTAL_FETCH, True)): BooleanSelector(),
+                vol.Optional(
+                    CONF_BACKFILL_DAYS,
+                    default=data.get(CONF_BACKFILL_DAYS, 0),
+                ): NumberSelector(NumberSelectorConfig(min=0, max=730, mode=NumberSelectorMode.BOX)),
+                vol.Optional(CONF_METRICS_SENSORS, default=data.get(CONF_METRICS_SENSORS, False)): BooleanSelector(),
+                vol.Optional(CONF_TRACE_REQUESTS, default=data.get(CONF_TRACE_REQUESTS, False)): BooleanSelector(),
+                vol.Optional(CONF_CAPTURE_RESPONSES, default=data.get(CONF_CAPTURE_RESPONSES, False)): BooleanSelector(),
+                vol.Optional(CONF_DATASET_SENSORS, default=data.get(CONF_DATASET_SENSORS, False)): BooleanSelector(),
+                vol.Optional(CONF_ROLLING_SENSORS, default=data.get(CONF_ROLLING_SENSORS, False)): BooleanSelector(),
                 vol.Optional(CONF_RES_ENABLE, default=data.get(CONF_RES_ENABLE, False)): BooleanSelector(),
                 vol.Optional(
                     CONF_RES_NAME,
@@ -126,7 +167,7 @@ class CLPHKOptionsFlowHandler(config_entries.OptionsFlow):
 class ConfigFlow(config_entries.ConfigFlow, domain="clphk"):
     """Handle a config flow for CLP."""
 
-    VERSION = 1
+    VERSION = 2
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -141,11 +182,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain="clphk"):
             session = aiohttp_client.async_get_clientsession(self.hass)
             try:
                 token_data = await verify_otp(session, email, otp, timeout)
-                _LOGGER.debug(token_data)
+                _LOGGER.debug("OTP verified, creating config entry")
 
                 user_input["access_token"] = token_data["access_token"]
                 user_input["refresh_token"] = token_data["refresh_token"]
                 user_input["access_token_expiry_time"] = token_data.get("access_token_expiry_time")
+                user_input[CONF_INSTANCE_SUFFIX] = new_instance_suffix(self._async_current_entries())
                 return self.async_create_entry(title=user_input[CONF_NAME], data=user_input)
             except Exception as ex:
                 _LOGGER.exception(ex)
@@ -169,6 +211,19 @@ class ConfigFlow(config_entries.ConfigFlow, domain="clphk"):
                         CONF_RETRY_DELAY,
                         default=300,
                     ): NumberSelector(NumberSelectorConfig(min=60, max=3600, mode=NumberSelectorMode.BOX)),
+                    vol.Optional(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=1,
+                    ): NumberSelector(NumberSelectorConfig(min=1, max=8, mode=NumberSelectorMode.BOX)),
+                    vol.Optional(CONF_BACKGROUND_STARTUP, default=True): BooleanSelector(),
+                    vol.Optional(
+                        CONF_TOKEN_REFRESH_LEAD,
+                        default=300,
+                    ): NumberSelector(NumberSelectorConfig(min=60, max=3600, mode=NumberSelectorMode.BOX)),
+                    vol.Optional(
+                        CONF_TOKEN_REFRESH_JITTER,
+                        default=60,
+                    ): NumberSelector(NumberSelectorConfig(min=0, max=600, mode=NumberSelectorMode.BOX)),
                     vol.Optional(CONF_TYPE, default=""): TextSelector(TextSelectorConfig()),
                     vol.Optional(CONF_GET_ACCT, default=False): BooleanSelector(),
                     vol.Optional(CONF_GET_BILL, default=False): BooleanSelector(),
@@ -180,6 +235,19 @@ class ConfigFlow(config_entries.ConfigFlow, domain="clphk"):
                         CONF_GET_HOURLY_DAYS,
                         default=1,
                     ): NumberSelector(NumberSelectorConfig(min=1, max=2, mode=NumberSelectorMode.BOX)),
+                    vol.Optional(CONF_GET_COST, default=False): BooleanSelector(),
+                    vol.Optional(CONF_TARIFF_FILE, default=""): TextSelector(TextSelectorConfig()),
+                    vol.Optional(CONF_IMPORT_STATISTICS, default=True): BooleanSelector(),
+                    vol.Optional(CONF_INCREMENTAL_FETCH, default=True): BooleanSelector(),
+                    vol.Optional(
+                        CONF_BACKFILL_DAYS,
+                        default=0,
+                    ): NumberSelector(NumberSelectorConfig(min=0, max=730, mode=NumberSelectorMode.BOX)),
+                    vol.Optional(CONF_METRICS_SENSORS, default=False): BooleanSelector(),
+                    vol.Optional(CONF_TRACE_REQUESTS, default=False): BooleanSelector(),
+                    vol.Optional(CONF_CAPTURE_RESPONSES, default=False): BooleanSelector(),
+                    vol.Optional(CONF_DATASET_SENSORS, default=False): BooleanSelector(),
+                    vol.Optional(CONF_ROLLING_SENSORS, default=False): BooleanSelector(),
                     vol.Optional(CONF_RES_ENABLE, default=False): BooleanSelector(),
                     vol.Optional(
                         CONF_RES_NAME,
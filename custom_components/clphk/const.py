@@ -1,6 +1,21 @@
 CONF_DOMAIN = 'clphk'
 
 CONF_RETRY_DELAY = 'retry_delay'
+CONF_MAX_CONCURRENT_REQUESTS = 'max_concurrent_requests'
+CONF_BACKGROUND_STARTUP = 'background_startup'
+CONF_TOKEN_REFRESH_LEAD = 'token_refresh_lead'
+CONF_TOKEN_REFRESH_JITTER = 'token_refresh_jitter'
+CONF_IMPORT_STATISTICS = 'import_statistics'
+CONF_INCREMENTAL_FETCH = 'incremental_fetch'
+CONF_BACKFILL_DAYS = 'backfill_days'
+CONF_METRICS_SENSORS = 'metrics_sensors'
+CONF_TRACE_REQUESTS = 'trace_requests'
+CONF_CAPTURE_RESPONSES = 'capture_responses'
+CONF_DATASET_SENSORS = 'dataset_sensors'
+CONF_TARIFF_FILE = 'tariff_file'
+CONF_ROLLING_SENSORS = 'rolling_sensors'
+# Written into each config entry's data once, never shown in a form
+CONF_INSTANCE_SUFFIX = 'instance_suffix'
 
 CONF_GET_ACCT = 'get_account'
 CONF_GET_BILL = 'get_bill'
@@ -9,6 +24,7 @@ CONF_GET_BIMONTHLY = 'get_bimonthly'
 CONF_GET_DAILY = 'get_daily'
 CONF_GET_HOURLY = 'get_hourly'
 CONF_GET_HOURLY_DAYS = 'get_hourly_days'
+CONF_GET_COST = 'get_cost'
 
 CONF_RES_ENABLE = 'renewable_energy_sensor_enable'
 CONF_RES_NAME = 'renewable_energy_sensor_name'
@@ -0,0 +1,1436 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import datetime
+import functools
+import logging
+import time
+
+import async_timeout
+from dateutil import relativedelta
+from homeassistant.const import (
+    CONF_NAME,
+    CONF_TIMEOUT,
+    CONF_TYPE,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util.ssl import get_default_context
+
+from .api import CLPApiClient, CLPApiError
+from .backfill import HourlyBackfill
+from .cache import STORAGE_KEY as CACHE_STORAGE_KEY, CLPResponseCache
+from .capture import ResponseCapture
+from .const import (
+    CONF_DOMAIN,
+    CONF_RETRY_DELAY,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_TOKEN_REFRESH_LEAD,
+    CONF_TOKEN_REFRESH_JITTER,
+    CONF_IMPORT_STATISTICS,
+    CONF_INCREMENTAL_FETCH,
+    CONF_INSTANCE_SUFFIX,
+    CONF_BACKFILL_DAYS,
+    CONF_TRACE_REQUESTS,
+    CONF_CAPTURE_RESPONSES,
+    CONF_TARIFF_FILE,
+
+    CONF_GET_ACCT,
+    CONF_GET_BILL,
+    CONF_GET_ESTIMATION,
+    CONF_GET_BIMONTHLY,
+    CONF_GET_DAILY,
+    CONF_GET_HOURLY,
+    CONF_GET_HOURLY_DAYS,
+    CONF_GET_COST,
+
+    CONF_RES_ENABLE,
+    CONF_RES_NAME,
+    CONF_RES_TYPE,
+    CONF_RES_GET_BILL,
+    CONF_RES_GET_DAILY,
+    CONF_RES_GET_HOURLY,
+    CONF_RES_GET_HOURLY_DAYS,
+)
+from .metrics import RequestMetrics, count_rows
+from .models import (
+    RenewableReading,
+    decode_accounts,
+    decode_bill_periods,
+    decode_estimation,
+    decode_readings,
+    decode_renewable,
+    decode_transactions,
+    iter_readings,
+)
+from .ratelimit import CircuitOpenError, CoalescedRetry, get_host_limits
+from .scheduler import STORAGE_KEY as SCHEDULE_STORAGE_KEY, PublishLagScheduler
+from .series import (
+    TimeSeries,
+    from_epoch,
+    from_optional_epoch,
+    hourly_from,
+    to_epoch,
+    window_covered,
+    window_sum,
+)
+from .statistics import HourlyStatisticsImporter
+from .tariff import TariffError, load_tariff
+from .timestamps import HK_TZ
+from .token_refresh import TokenRefreshScheduler
+from .tracing import RequestTracer
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_TIME_BETWEEN_UPDATES = datetime.timedelta(seconds=300)
+# The update interval shrinks to this when a series is expected sooner than the next regular update
+MIN_UPDATE_INTERVAL = datetime.timedelta(seconds=30)
+# Fallback poll intervals until the publish lag of a series has been learned
+DAILY_TASK_INTERVAL = datetime.timedelta(hours=12)
+HOURLY_TASK_INTERVAL = datetime.timedelta(minutes=30)
+# Assumed publish lag before one is learned; 3 hours plus the hour itself keeps yesterday until 04:00
+HOURLY_PUBLISH_LAG = datetime.timedelta(hours=3)
+DAILY_PUBLISH_LAG = datetime.timedelta(hours=12)
+HTTP_4xx_ERROR_RETRY_LIMIT = 3
+# Request windows whose last payload hash is remembered
+FINGERPRINT_LIMIT = 64
+DAILY_SERIES_RETENTION = datetime.timedelta(days=400)
+HOURLY_SERIES_RETENTION = datetime.timedelta(days=31)
+# Trailing rows CLP may still revise, re-requested on every incremental fetch
+BIMONTHLY_REVISION_WINDOW = datetime.timedelta(days=70)
+DAILY_REVISION_WINDOW = datetime.timedelta(days=2)
+HOURLY_REVISION_WINDOW = datetime.timedelta(hours=3)
+
+# Template sensor fed by the IMAP integration, see README "Automatic re-login"
+OTP_SENSOR_ENTITY_ID = 'sensor.clp_email_otp'
+OTP_WAIT_TIMEOUT = 90
+
+DOMAIN = CONF_DOMAIN
+# hass.data[DOMAIN] key of the client state of a YAML set-up, which has no config entry
+CLIENT_KEY_YAML = 'yaml'
+
+SENSOR_TYPE_MAIN = 'main'
+SENSOR_TYPE_RENEWABLE = 'renewable_energy'
+
+# Order in which an unspecified `type` picks its state, most accurate first
+STATE_DATA_TYPES = ('HOURLY', 'DAILY', 'BIMONTHLY')
+
+
+def start_of_day(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_dates(timezone):
+    return {
+        "yesterday": datetime.datetime.now(timezone) + datetime.timedelta(days=-1),
+        "today": datetime.datetime.now(timezone),
+        "tomorrow": datetime.datetime.now(timezone) + datetime.timedelta(days=1),
+        "one_year_two_months_ago": (datetime.datetime.now(timezone) - relativedelta.relativedelta(years=1, months=2)).replace(day=datetime.datetime.now(timezone).day),
+        "last_month": (datetime.datetime.now(timezone).replace(day=1) + relativedelta.relativedelta(months=-1)),
+        "this_month": datetime.datetime.now(timezone).replace(day=1),
+        "next_month": (datetime.datetime.now(timezone).replace(day=1) + relativedelta.relativedelta(months=1)),
+    }
+
+
+def handle_errors(func):
+    async def wrapper(self, *args, **kwargs):
+        try:
+            result = await func(self, *args, **kwargs)
+            self._error = None
+            return result
+
+        except Exception as e:
+            error_msg = str(e)
+            self._error = error_msg
+            self._cycle_errors += 1
+            if isinstance(e, CircuitOpenError):
+                _LOGGER.warning("%s: %s", self.name, error_msg)
+            else:
+                _LOGGER.error("%s ERROR: %s", self.name, error_msg, exc_info=True)
+
+            # However many fetches fail in one cycle, only one retry is ever pending
+            next_retry_delay = self._retry.schedule(min_delay=getattr(e, 'retry_after', 0))
+            if next_retry_delay is not None:
+                _LOGGER.info("%s: Scheduling retry in %d seconds", self.name, next_retry_delay)
+
+            return None
+
+    return wrapper
+
+
+class SeriesConfig:
+    """What one sensor wants fetched, and which data type drives its state."""
+
+    def __init__(
+            self,
+            type: str = '',
+            get_acct: bool = False,
+            get_bill: bool = False,
+            get_estimation: bool = False,
+            get_bimonthly: bool = False,
+            get_daily: bool = False,
+            get_hourly: bool = False,
+            get_hourly_days: int = 1,
+            get_cost: bool = False,
+    ) -> None:
+        self.type = type or ''
+        self.get_acct = get_acct
+        self.get_bill = get_bill
+        self.get_estimation = get_estimation
+        self.get_bimonthly = get_bimonthly
+        self.get_daily = get_daily
+        self.get_hourly = get_hourly
+        self.get_hourly_days = get_hourly_days
+        self.get_cost = get_cost
+
+    def wants(self, data_type: str) -> bool:
+        return self.type == '' or self.type.upper() == data_type
+
+
+class CLPDataUpdateCoordinator(DataUpdateCoordinator):
+    """Owns the CLP session for one config entry and fans results out to every sensor."""
+
+    _timezone = HK_TZ
+
+    def __init__(self, hass: HomeAssistant, config: dict, entry_id: str | None = None) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=config.get(CONF_NAME, "CLP"),
+            update_interval=MIN_TIME_BETWEEN_UPDATES,
+            # Updates are only pushed to entities when the returned revision changes
+            always_update=False,
+        )
+        self._email = config.get("email", None)
+        # Tokens, token lock and stored data are kept apart per config entry
+        self._entry_id = entry_id
+        self._client_key = entry_id or CLIENT_KEY_YAML
+        # Appended to entity, statistic and Store ids; empty for the first login, see __init__.py
+        self.instance_suffix = config.get(CONF_INSTANCE_SUFFIX, "")
+        self._timeout = int(config.get(CONF_TIMEOUT, 30))
+        self._retry_delay = int(config.get(CONF_RETRY_DELAY, 300))
+        # Caps in-flight requests to api.clp.com.hk; 1 keeps the old one-at-a-time behaviour
+        self._incremental_fetch = config.get(CONF_INCREMENTAL_FETCH, True)
+        max_concurrent_requests = max(1, int(config.get(CONF_MAX_CONCURRENT_REQUESTS, 1)))
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        # Its own connection pool, so the calls of one update reuse warm connections to CLP
+        self._client = CLPApiClient(
+            timeout=self._timeout,
+            limit_per_host=max_concurrent_requests,
+            ssl_context=get_default_context(),
+            # Opt-in, as it adds a few callbacks to every request
+            tracer=RequestTracer() if config.get(CONF_TRACE_REQUESTS, False) else None,
+            capture=ResponseCapture() if config.get(CONF_CAPTURE_RESPONSES, False) else None,
+        )
+        # Per-endpoint counts and latencies, for diagnostics and the optional metric sensors
+        self.metrics = RequestMetrics()
+
+        self.series = {
+            SENSOR_TYPE_MAIN: SeriesConfig(
+                type=config.get(CONF_TYPE, ""),
+                get_acct=config.get(CONF_GET_ACCT, False),
+                get_bill=config.get(CONF_GET_BILL, False),
+                get_estimation=config.get(CONF_GET_ESTIMATION, False),
+                get_bimonthly=config.get(CONF_GET_BIMONTHLY, False),
+                get_daily=config.get(CONF_GET_DAILY, False),
+                get_hourly=config.get(CONF_GET_HOURLY, False),
+                get_hourly_days=int(config.get(CONF_GET_HOURLY_DAYS, 1)),
+                get_cost=config.get(CONF_GET_COST, False),
+            ),
+        }
+        if config.get(CONF_RES_ENABLE, False):
+            self.series[SENSOR_TYPE_RENEWABLE] = SeriesConfig(
+                type=config.get(CONF_RES_TYPE, ""),
+                get_bill=config.get(CONF_RES_GET_BILL, False),
+                get_daily=config.get(CONF_RES_GET_DAILY, False),
+                get_hourly=config.get(CONF_RES_GET_HOURLY, False),
+                get_hourly_days=int(config.get(CONF_RES_GET_HOURLY_DAYS, 1)),
+            )
+
+        self._account_number = None
+        # Contract account number per main sensor type, filled in by main_get_account_detail
+        self._accounts = {}
+        self._error = None
+        self._results = {sensor_type: self._new_results(sensor_type) for sensor_type in self.series}
+
+        self._cache = CLPResponseCache(hass, key=f"{CACHE_STORAGE_KEY}{self.instance_suffix}")
+
+        # Prices readings locally for the cost sensors; read from disk on the first update
+        self._tariff_file = config.get(CONF_TARIFF_FILE, "")
+        self._tariff = None
+        self._tariff_loaded = False
+
+        # Hourly history goes to long-term statistics, so the Energy dashboard gets real per-hour data
+        self._statistics = {}
+        if config.get(CONF_IMPORT_STATISTICS, True):
+            if self.series[SENSOR_TYPE_MAIN].get_hourly:
+                self._statistics[SENSOR_TYPE_MAIN] = HourlyStatisticsImporter(
+                    hass,
+                    f"{SENSOR_TYPE_MAIN}{self.instance_suffix}_hourly_energy",
+                    f"{config.get(CONF_NAME, 'CLP')} hourly consumption",
+                    revision=int(HOURLY_REVISION_WINDOW.total_seconds()),
+                )
+            if SENSOR_TYPE_RENEWABLE in self.series and self.series[SENSOR_TYPE_RENEWABLE].get_hourly:
+                self._statistics[SENSOR_TYPE_RENEWABLE] = HourlyStatisticsImporter(
+                    hass,
+                    f"{SENSOR_TYPE_RENEWABLE}{self.instance_suffix}_hourly_energy",
+                    f"{config.get(CONF_RES_NAME, 'CLP Renewable Energy')} hourly generation",
+                    revision=int(HOURLY_REVISION_WINDOW.total_seconds()),
+                )
+
+        # Long hourly history is pulled slowly in the background into statistics, see backfill.py
+        self.backfills = {}
+        backfill_days = int(config.get(CONF_BACKFILL_DAYS, 0))
+        if backfill_days > 0:
+            if not self._statistics:
+                _LOGGER.warning(
+                    "%s: backfill_days is set, but the backfill needs import_statistics and get_hourly", self.name
+                )
+            for sensor_type, importer in self._statistics.items():
+                self.backfills[sensor_type] = HourlyBackfill(
+                    hass,
+                    f"{sensor_type}{self.instance_suffix}",
+                    backfill_days,
+                    functools.partial(self.async_fetch_hourly_day, sensor_type),
+                    importer.async_import_history,
+                )
+
+        # Learns when CLP publishes each series and decides when it is worth polling again
+        self._poll_scheduler = PublishLagScheduler(hass, key=f"{SCHEDULE_STORAGE_KEY}{self.instance_suffix}")
+        for sensor_type in self.series:
+            self._register_polls(sensor_type)
+        # Scheduler keys fetched successfully during the current update
+        self._polled = set()
+
+        # Renewable hours fetched with validateStatus N
+        self._unvalidated_hours = set()
+
+        # Raw payload hashes per request window; an unchanged payload is neither parsed nor written
+        self._fingerprints = {}
+        self._changed = False
+        self._unchanged = False
+        self._last_error = None
+        # Week and month the to-date windows were last resolved for
+        self._window_starts = None
+        self._revision = 0
+        self._first_refresh = None
+        # Updates where every payload fetched matched its fingerprint
+        self.skipped_updates = 0
+
+        self._token_scheduler = TokenRefreshScheduler(
+            hass,
+            self._async_scheduled_token_refresh,
+            lead=datetime.timedelta(seconds=int(config.get(CONF_TOKEN_REFRESH_LEAD, 300))),
+            jitter=datetime.timedelta(seconds=int(config.get(CONF_TOKEN_REFRESH_JITTER, 60))),
+        )
+
+        self._retry = CoalescedRetry(
+            hass,
+            self._async_retry,
+            min_delay=self._retry_delay,
+            max_delay=3600  # Max 1 hour between retries
+        )
+        self._cycle_errors = 0
+        self._host_limits = get_host_limits(hass)
+        self._single_task_last_fetch_time = None
+        self._4xx_error_retry = 0
+
+    @staticmethod
+    def _new_results(sensor_type: str) -> dict:
+        renewable = sensor_type == SENSOR_TYPE_RENEWABLE
+        return {
+            'states': {},
+            'state_data_type': None,
+            'native_value': None,
+            'last_reset': None,
+            'account': None,
+            # Main bills are bill/payment transactions; renewable bills are kWh per billing period
+            'bills': TimeSeries(with_end=True) if renewable else None,
+            'estimation': None,
+            'bimonthly': TimeSeries(),
+            'daily': TimeSeries(with_end=not renewable),
+            'daily_since': None,
+            'hourly': TimeSeries(),
+            'hourly_since': None,
+            'cost': None,
+            'windows': None,
+        }
+
+    def _register_polls(self, sensor_type: str) -> None:
+        self._poll_scheduler.register(
+            f"{sensor_type}.hourly",
+            period=datetime.timedelta(hours=1),
+            fallback=HOURLY_TASK_INTERVAL,
+            default_lag=HOURLY_PUBLISH_LAG,
+        )
+        self._poll_scheduler.register(
+            f"{sensor_type}.daily",
+            period=datetime.timedelta(days=1),
+            fallback=DAILY_TASK_INTERVAL,
+            default_lag=DAILY_PUBLISH_LAG,
+        )
+
+    @property
+    def error(self):
+        return self._error
+
+    def diagnostics(self) -> dict:
+        """Request metrics and scheduling state, without tokens or account numbers."""
+        breaker = self._host_limits.breaker
+        return {
+            "accounts": len(self._accounts),
+            "error": self._error,
+            "revision": self._revision,
+            "skipped_updates": self.skipped_updates,
+            "retry_pending": self._retry.pending,
+            "requests": self.metrics.as_dict(),
+            "poll_schedule": self._poll_scheduler.stats(),
+            "circuit_breaker": {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "opened": breaker.opened,
+                "retry_after": round(breaker.retry_after()),
+            },
+            "rate_limit_waits": self._host_limits.bucket.waits,
+            "tariff": self._tariff.name if self._tariff is not None else None,
+            "backfills": {
+                sensor_type: {
+                    "status": backfill.status,
+                    "progress": backfill.progress,
+                    "rows": backfill.rows,
+                    "last_error": backfill.last_error,
+                }
+                for sensor_type, backfill in self.backfills.items()
+            },
+            "traces": {
+                "summary": self._client.tracer.summary(),
+                "requests": list(self._client.tracer.traces),
+            } if self._client.tracer is not None else None,
+            "responses": self._client.capture.as_dict() if self._client.capture is not None else None,
+        }
+
+    @property
+    def _token_state(self):
+        return self.hass.data[DOMAIN][self._client_key]
+
+    @property
+    def _access_token(self):
+        return self._token_state.get("access_token")
+
+    @property
+    def _refresh_token(self):
+        return self._token_state.get("refresh_token")
+
+    @property
+    def _access_token_expiry_time(self):
+        return self._token_state.get("access_token_expiry_time")
+
+    @_access_token.setter
+    def _access_token(self, value):
+        self._token_state["access_token"] = value
+
+    @_refresh_token.setter
+    def _refresh_token(self, value):
+        self._token_state["refresh_token"] = value
+
+    @_access_token_expiry_time.setter
+    def _access_token_expiry_time(self, value):
+        self._token_state["access_token_expiry_time"] = value
+
+
+    async def _async_retry(self, _now=None):
+        await self.async_request_refresh()
+
+    def _set_state(self, sensor_type: str, data_type: str, value, last_reset):
+        self._results[sensor_type]['states'][data_type] = (value, last_reset)
+
+    def _set_latest_validated(self, sensor_type: str, data_type: str, readings: list[RenewableReading]):
+        """Set the state from the newest row CLP has validated, if any."""
+        validated = [reading for reading in readings if reading.valid and reading.start is not None]
+        if validated:
+            latest = max(validated, key=lambda reading: reading.start)
+            self._set_state(sensor_type, data_type, latest.kwh, from_epoch(latest.start))
+
+    async def async_fetch_hourly_day(self, sensor_type: str, day: datetime.date) -> list[tuple[int, float]]:
+        """Fetch one day of hourly rows for the backfill, bypassing the cache."""
+        if sensor_type == SENSOR_TYPE_MAIN:
+            endpoint = "consumption/history/Hourly (backfill)"
+            response = await self._call(
+                self._client.consumption_history,
+                endpoint=endpoint,
+                account=self._account_number,
+                mode="Hourly",
+                from_date=day,
+                to_date=day + datetime.timedelta(days=1),
+            )
+            rows = [
+                (reading.start, reading.kwh)
+                for reading in iter_readings(response.data, "Hourly")
+                if reading.start is not None and reading.kwh is not None
+            ]
+        else:
+            endpoint = "renew/fit/dashboard/H (backfill)"
+            response = await self._call(
+                self._client.renewable_dashboard,
+                endpoint=endpoint,
+                account=self._account_number,
+                mode="H",
+                start_date=day,
+            )
+            rows = [
+                (reading.start, reading.kwh)
+                for reading in decode_renewable(response.data, "H")
+                if reading.status != 'N' and reading.start is not None and reading.kwh is not None
+            ]
+
+        self.metrics.record_rows(endpoint, len(rows))
+        return rows
+
+    def _incremental_from(self, series: TimeSeries, full_from: datetime.datetime, revision: datetime.timedelta) -> datetime.datetime:
+        """Start of the request window: only rows after the newest finalized one, or the full window."""
+        newest = series.last_timestamp()
+        if not self._incremental_fetch or newest is None:
+            return full_from
+        return max(full_from, from_epoch(newest) - revision)
+
+    def _hourly_day_finalized(self, hourly: TimeSeries, day: datetime.datetime) -> bool:
+        """Whether a day already has all its hours, none of which CLP may still revise."""
+        if not self._incremental_fetch:
+            return False
+        day_start = start_of_day(day)
+        day_end = day_start + datetime.timedelta(days=1)
+        newest = hourly.last_timestamp()
+        if newest is None or to_epoch(day_end) > newest - HOURLY_REVISION_WINDOW.total_seconds():
+            return False
+        return len(hourly.slice(to_epoch(day_start), to_epoch(day_end))) >= 24
+
+    def _trim_daily(self, sensor_type: str, window_start: datetime.datetime):
+        # Attributes show the requested window; older points are kept for a while for aggregates
+        since = to_epoch(window_start)
+        self._results[sensor_type]['daily_since'] = since
+        self._results[sensor_type]['daily'].trim_before(since - int(DAILY_SERIES_RETENTION.total_seconds()))
+
+    def _trim_hourly(self, sensor_type: str, window_start: datetime.datetime):
+        since = to_epoch(window_start)
+        self._results[sensor_type]['hourly_since'] = since
+        self._results[sensor_type]['hourly'].trim_before(since - int(HOURLY_SERIES_RETENTION.total_seconds()))
+
+    def _resolve_states(self):
+        for sensor_type, series in self.series.items():
+            result = self._results[sensor_type]
+            candidates = STATE_DATA_TYPES if series.type == '' else (series.type.upper(),)
+            for data_type in candidates:
+                if data_type in result['states']:
+                    result['state_data_type'] = data_type
+                    result['native_value'], result['last_reset'] = result['states'][data_type]
+                    break
+
+            # Pin the data type once known, so later cycles only fetch what the state needs
+            if series.type == '' and result['state_data_type'] is not None:
+                series.type = result['state_data_type']
+
+    async def _async_load_tariff(self) -> None:
+        self._tariff_loaded = True
+        path = self.hass.config.path(self._tariff_file) if self._tariff_file else None
+        try:
+            self._tariff = await self.hass.async_add_executor_job(load_tariff, path)
+        except TariffError as e:
+            _LOGGER.error("%s: Cost sensors disabled, %s", self.name, e)
+
+    @staticmethod
+    def _hourly_from(result: dict, since: int) -> int:
+        return hourly_from(result['daily'], since)
+
+    @staticmethod
+    def _window_kwh(result: dict, start: int, end: int | None = None) -> float:
+        return window_sum(result['daily'], result['hourly'], start, end)
+
+    @staticmethod
+    def _to_date(result: dict, start: int) -> dict | None:
+        # Withheld until the readings reach back to the start, e.g. after a restart mid-month
+        if not window_covered(result['daily'], result['hourly'], start):
+            return None
+        return {'kwh': round(window_sum(result['daily'], result['hourly'], start), 3), 'start': from_epoch(start)}
+
+    def _resolve_windows(self) -> None:
+        """Totals over the usual rolling windows, from the prefix sums kept by each series."""
+        now = datetime.datetime.now(self._timezone)
+        today = start_of_day(now)
+        week_start = to_epoch(today - datetime.timedelta(days=today.weekday()))
+        month_start = to_epoch(today.replace(day=1))
+        # A new week or month resets the to-date windows, with or without a new reading
+        if self._window_starts is not None and self._window_starts != (week_start, month_start):
+            self._changed = True
+        self._window_starts = (week_start, month_start)
+
+        for sensor_type in self.series:
+            result = self._results[sensor_type]
+            hourly = result['hourly']
+            windows = {}
+
+            newest = hourly.last_timestamp()
+            # Ends with the newest hour CLP has published, which lags the clock
+            end = newest + 3600 if newest is not None else None
+            # Withheld while hours are missing, e.g. just after a start with get_hourly_days 1
+            if end is not None and hourly.count(end - 86400, end) == 24:
+                windows['last_24_hours'] = {
+                    'kwh': round(hourly.sum(end - 86400, end), 3),
+                    'start': from_epoch(end - 86400),
+                    'end': from_epoch(end),
+                }
+
+            if result['daily'] or hourly:
+                for key, start in (('week_to_date', week_start), ('month_to_date', month_start)):
+                    window = self._to_date(result, start)
+                    if window is not None:
+                        windows[key] = window
+
+            if sensor_type != SENSOR_TYPE_RENEWABLE:
+                period = self._period_to_date(result)
+                if period is not None:
+                    windows['period_to_date'] = period
+
+            result['windows'] = windows or None
+
+    def _period_to_date(self, result: dict) -> dict | None:
+        estimation = result['estimation']
+        if estimation and estimation['current_end_date'] is not None:
+            # CLP's own count up to its end date, then the readings after it
+            kwh = estimation['current_consumption'] + self._window_kwh(result, to_epoch(estimation['current_end_date']))
+            return {'kwh': round(kwh, 3), 'start': estimation['current_start_date']}
+        bills = result['bills']
+        if bills and bills['bill']:
+            start = bills['bill'][0]['to_date']
+            return {'kwh': round(self._window_kwh(result, to_epoch(start)), 3), 'start': start}
+        return None
+
+    def consumption_sum(self, sensor_type: str, resolution: str, start: datetime.datetime, end: datetime.datetime | None = None) -> dict:
+        """Total kWh of the `hourly` or `daily` readings with start <= reading start < end."""
+        series = self._results[sensor_type][resolution]
+        start_epoch = to_epoch(start)
+        end_epoch = to_epoch(end) if end is not None else None
+        return {
+            'kwh': round(series.sum(start_epoch, end_epoch), 3),
+            'readings': series.count(start_epoch, end_epoch),
+            'first': from_optional_epoch(series.first_timestamp()),
+            'last': from_optional_epoch(series.last_timestamp()),
+        }
+
+    def _resolve_costs(self) -> None:
+        if self._tariff is None:
+            return
+        for sensor_type in self.account_sensor_types():
+            result = self._results[sensor_type]
+            result['cost'] = self._price_period(result)
+
+    def _price_period(self, result: dict) -> dict | None:
+        """Price the current billing period from the readings already fetched, without calling CLP.
+
+        CLP's estimation counts the period up to `current_end_date`; daily and then hourly
+        readings after that are priced one by one on top of it, since the rate depends on the
+        kWh used so far in the period.
+        """
+        tariff = self._tariff
+        daily = result['daily']
+        hourly = result['hourly']
+        estimation = result['estimation']
+        bills = result['bills']
+
+        consumed = 0.0
+        days = None
+        if estimation and estimation['current_end_date'] is not None:
+            consumed = estimation['current_consumption']
+            period_start = estimation['current_start_date']
+            since = to_epoch(estimation['current_end_date'])
+            if estimation['estimation_start_date'] and estimation['estimation_end_date']:
+                days = (estimation['estimation_end_date'] - estimation['estimation_start_date']).days
+        elif bills and bills['bill']:
+            period_start = bills['bill'][0]['to_date']
+            since = to_epoch(period_start)
+        else:
+            # Without either, the period is taken to start with the readings
+            since = daily.first_timestamp() or hourly.first_timestamp()
+            period_start = from_optional_epoch(since)
+        if since is None:
+            return None
+
+        cut = self._hourly_from(result, since)
+        readings = list(daily.slice(since, cut).items())
+        hourly_readings = list(hourly.slice(cut).items())
+        priced = list(tariff.marginal_costs(readings + hourly_readings, consumed, days))
+
+        latest_day = None
+        latest_hour = None
+        if priced:
+            day_start = to_epoch(start_of_day(from_epoch(priced[-1][0])))
+            day = [row for row in priced if row[0] >= day_start]
+            latest_day = {
+                'cost': round(sum(cost for _, _, cost in day), 2),
+                'start': from_epoch(day_start),
+                'kwh': round(sum(kwh for _, kwh, _ in day), 3),
+            }
+            if hourly_readings:
+                start, kwh, cost = priced[-1]
+                latest_hour = {'cost': round(cost, 2), 'start': from_epoch(start), 'kwh': kwh}
+
+        period_kwh = consumed + sum(kwh for _, kwh, _ in priced)
+        return {
+            'period': {
+                'cost': round(tariff.cost(period_kwh, days), 2),
+                'start': period_start,
+                'kwh': round(period_kwh, 3),
+                'tariff': tariff.name,
+                'bill_check': self._check_bills(result, tariff),
+            },
+            'latest_day': latest_day,
+            'latest_hour': latest_hour,
+        }
+
+    @staticmethod
+    def _check_bills(result: dict, tariff) -> list[dict] | None:
+        """Bill totals next to what the tariff gives for the kWh of the same period."""
+        bills = result['bills']
+        bimonthly = result['bimonthly']
+        if not bills or not bimonthly:
+            return None
+
+        checks = []
+        for bill in bills['bill']:
+            # Bill periods are matched to bimonthly usage by their end date
+            kwh = bimonthly.get(to_epoch(start_of_day(bill['to_date'])))
+            if kwh is None:
+                continue
+            computed = tariff.cost(kwh, (bill['to_date'] - bill['from_date']).days)
+            checks.append({
+                'to_date': bill['to_date'],
+                'kwh': kwh,
+                'billed': bill['total'],
+                'computed': round(computed, 2),
+                'difference': round(bill['total'] - computed, 2),
+            })
+        return checks or None
+
+    async def _call(self, request, *args, authorized: bool = True, endpoint: str | None = None, **kwargs):
+        """Run one CLP client call under the request semaphore, dropping the tokens on a 4xx.
+
+        `endpoint` names the call in the request metrics; it defaults to the client method's name.
+        """
+        if authorized and not self._access_token:
+            raise Exception("Problematic authorization. Please configure again, or change your IP address.")
+
+        self._client.access_token = self._access_token
+        # Positional arguments are e-mail addresses and tokens, so only the keyword ones are logged
+        _LOGGER.debug("REQUEST %s %s", endpoint or request.__name__, kwargs)
+
+        breaker = self._host_limits.breaker
+        async with self._request_semaphore:
+            # Shared by every entry, so several logins together still stay under CLP's limits
+            await self._host_limits.bucket.acquire()
+            breaker.before_request()
+            started = time.monotonic()
+            try:
+                response = await request(*args, **kwargs)
+            except Exception as e:
+                self.metrics.record_request(endpoint or request.__name__, time.monotonic() - started, error=str(e))
+                if not isinstance(e, CLPApiError):
+                    raise
+
+                _LOGGER.error(str(e))
+                if e.transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                if e.status is not None and 400 <= e.status < 500:
+                    self._account_number = None
+                    self._access_token = None
+                    self._refresh_token = None
+                    self._access_token_expiry_time = None
+                    self._token_scheduler.cancel()
+
+                    _LOGGER.debug("[COORDINATOR UPDATE] Clearing tokens from config entry.")
+                    self._persist_tokens()
+
+                    raise Exception('HTTP 4xx error retry limit reached')
+
+                raise
+            breaker.record_success()
+            # Token calls return the parsed tokens only, so their size is not known
+            self.metrics.record_request(
+                endpoint or request.__name__,
+                time.monotonic() - started,
+                size=getattr(response, 'size', None),
+            )
+
+        _LOGGER.debug("RESPONSE %s: %s bytes", endpoint or request.__name__, getattr(response, 'size', None))
+        return response
+
+    async def cached_request(
+            self,
+            endpoint: str,
+            ttl: datetime.timedelta,
+            request,
+            poll_key: str = None,
+            **kwargs,
+    ):
+        """Serve a data endpoint from the persistent cache, calling CLP only once it has expired.
+
+        `request` is a CLPApiClient method, called with `kwargs`. Returns None when the
+        payload is byte-identical to the one parsed last time.
+        """
+        key = CLPResponseCache.make_key(endpoint, self._account_number, kwargs)
+        response = self._cache.get(key)
+        if response is not None:
+            _LOGGER.debug("[CACHE] Serving %s from cache", endpoint)
+            fingerprint = self._cache.fingerprint(key)
+            self.metrics.record_cache_hit(endpoint)
+        else:
+            result = await self._call(request, endpoint=endpoint, **kwargs)
+            response, fingerprint = result.data, result.fingerprint
+            self._cache.set(key, response, ttl, fingerprint)
+
+        if poll_key is not None:
+            self._polled.add(poll_key)
+
+        # Fingerprints are kept per request window, since each window is a different payload
+        previous = self._fingerprints.pop(key, None)
+        self._fingerprints[key] = fingerprint
+        if len(self._fingerprints) > FINGERPRINT_LIMIT:
+            del self._fingerprints[next(iter(self._fingerprints))]
+
+        if fingerprint is not None and fingerprint == previous:
+            _LOGGER.debug("[COORDINATOR UPDATE] %s is unchanged, skipping.", endpoint)
+            self._unchanged = True
+            return None
+
+        self._changed = True
+        self.metrics.record_rows(endpoint, count_rows(response))
+        return response
+
+    @handle_errors
+    async def auth(self):
+        token_lock = self._token_state["token_lock"]
+        async with token_lock:
+            if not self._access_token and self.hass.states.get(OTP_SENSOR_ENTITY_ID) is not None:
+                _LOGGER.debug("Requesting OTP")
+
+                state = self.hass.states.get(OTP_SENSOR_ENTITY_ID)
+                original_otp = state.state if state else None
+                otp_received = self.hass.loop.create_future()
+
+                @callback
+                def _async_otp_changed(event):
+                    new_state = event.data.get("new_state")
+                    if otp_received.done() or new_state is None:
+                        return
+                    if new_state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE, "", original_otp):
+                        return
+                    otp_received.set_result(new_state.state)
+
+                # Subscribe before asking for the e-mail so a fast delivery is not missed
+                unsub_otp = async_track_state_change_event(self.hass, [OTP_SENSOR_ENTITY_ID], _async_otp_changed)
+                try:
+                    await self._call(self._client.request_otp, self._email, authorized=False)
+
+                    _LOGGER.debug("Waiting up to %s seconds for OTP email...", OTP_WAIT_TIMEOUT)
+                    async with async_timeout.timeout(OTP_WAIT_TIMEOUT):
+                        otp = await otp_received
+                except asyncio.TimeoutError:
+                    _LOGGER.error("OTP was not received in time. Please check your email/IMAP integration.")
+                    raise Exception(f"OTP not received from {OTP_SENSOR_ENTITY_ID}")
+                finally:
+                    unsub_otp()
+
+                try:
+                    token_data = await self._call(self._client.verify_otp, self._email, otp, authorized=False)
+                    self._access_token = token_data.get("access_token")
+                    self._refresh_token = token_data.get("refresh_token")
+                    self._access_token_expiry_time = token_data.get("access_token_expiry_time")
+                    self._token_scheduler.arm(self._access_token_expiry_time)
+                    _LOGGER.debug("Access token obtained")
+                except Exception as ex:
+                    _LOGGER.error("Failed to verify OTP and obtain access token: %s", ex)
+                    raise
+
+            elif self._refresh_token and self._access_token_expiry_time:
+                # Tokens restored from the config entry have no timer yet
+                if self._token_scheduler.next_refresh is None:
+                    self._token_scheduler.arm(self._access_token_expiry_time)
+
+                # Normally the scheduler has refreshed well before this; it is only the fallback
+                if self._token_scheduler.expires_within(datetime.timedelta(minutes=1)):
+                    await self._async_refresh_access_token()
+
+    async def _async_refresh_access_token(self):
+        _LOGGER.debug("Refreshing access_token and refresh_token")
+
+        token_data = await self._call(self._client.refresh_token, self._refresh_token, authorized=False)
+
+        _LOGGER.debug("access_token_expiry_time: %s", token_data['access_token_expiry_time'])
+
+        self._access_token = token_data['access_token']
+        self._refresh_token = token_data['refresh_token']
+        self._access_token_expiry_time = token_data['access_token_expiry_time']
+        self._token_scheduler.arm(self._access_token_expiry_time)
+
+        _LOGGER.debug("[COORDINATOR UPDATE] Persisting refreshed tokens to config entry.")
+        self._persist_tokens()
+
+    def _persist_tokens(self) -> None:
+        """Write the current tokens back to this coordinator's own config entry, if any."""
+        entry = self.hass.config_entries.async_get_entry(self._entry_id) if self._entry_id else None
+        if entry is None:
+            return
+        data = dict(entry.data)
+        data["access_token"] = self._access_token or ""
+        data["refresh_token"] = self._refresh_token or ""
+        data["access_token_expiry_time"] = self._access_token_expiry_time or ""
+        self.hass.config_entries.async_update_entry(entry, data=data)
+
+    async def _async_scheduled_token_refresh(self):
+        async with self._token_state["token_lock"]:
+            if not self._refresh_token:
+                return
+            try:
+                await self._async_refresh_access_token()
+            except Exception as e:
+                # The next update retries inline once the token is about to lapse
+                _LOGGER.error("%s: Scheduled token refresh failed: %s", self.name, e)
+
+    @callback
+    def async_start_first_refresh(self) -> None:
+        """Refresh in the background; may wait for an OTP, so it must not hold up startup."""
+        self._first_refresh = self.hass.async_create_background_task(
+            self.async_refresh(),
+            name=f"{DOMAIN} first refresh",
+        )
+
+    async def async_shutdown(self) -> None:
+        # Stopped before anything else, since it still needs the entry's token state
+        if self._first_refresh is not None and not self._first_refresh.done():
+            self._first_refresh.cancel()
+            try:
+                await self._first_refresh
+            except asyncio.CancelledError:
+                pass
+        self._first_refresh = None
+        self._token_scheduler.cancel()
+        self._retry.cancel()
+        for backfill in self.backfills.values():
+            await backfill.async_stop()
+        await self._client.close()
+        await super().async_shutdown()
+
+    @handle_errors
+    async def main_get_account_detail(self):
+        response = await self.cached_request(
+            endpoint="myServicesCA",
+            ttl=DAILY_TASK_INTERVAL,
+            request=self._client.account_details,
+        )
+
+        if response is None:
+            self._single_task_last_fetch_time = datetime.datetime.now(self._timezone)
+            return
+
+        # The first 'Active' entry keeps the original sensors; any further ones get their own
+        active = [account for account in decode_accounts(response) if account.status == 'Active']
+        if not active:
+            self._account_number = None
+            self._accounts.pop(SENSOR_TYPE_MAIN, None)
+            self._results[SENSOR_TYPE_MAIN]['account'] = None
+        else:
+            self._account_number = active[0].number
+            for i, account in enumerate(active):
+                sensor_type = SENSOR_TYPE_MAIN if i == 0 else self._add_account(account.number)
+                self._accounts[sensor_type] = account.number
+                self._results[sensor_type]['account'] = {
+                    'number': account.number,
+                    'outstanding': account.outstanding,
+                    'due_date': from_optional_epoch(account.due_date),
+                }
+        self._single_task_last_fetch_time = datetime.datetime.now(self._timezone)
+
+    def _add_account(self, account_number: str) -> str:
+        """Set up results for an additional contract account; return its sensor type."""
+        sensor_type = f"{SENSOR_TYPE_MAIN}_{account_number}"
+        if sensor_type in self.series:
+            return sensor_type
+
+        _LOGGER.debug("[COORDINATOR UPDATE] Found additional account %s", account_number)
+        self.series[sensor_type] = copy.copy(self.series[SENSOR_TYPE_MAIN])
+        self._results[sensor_type] = self._new_results(sensor_type)
+        self._register_polls(sensor_type)
+        if SENSOR_TYPE_MAIN in self._statistics:
+            self._statistics[sensor_type] = HourlyStatisticsImporter(
+                self.hass,
+                f"{sensor_type}{self.instance_suffix}_hourly_energy",
+                f"{self.name} {account_number} hourly consumption",
+                revision=int(HOURLY_REVISION_WINDOW.total_seconds()),
+            )
+        return sensor_type
+
+    def account_number(self, sensor_type: str) -> str | None:
+        return self._accounts.get(sensor_type)
+
+    def account_sensor_types(self) -> list[str]:
+        """Main sensor types with a known account number, the primary account first."""
+        return [sensor_type for sensor_type in self.series if sensor_type in self._accounts]
+
+    @handle_errors
+    async def main_get_bill(self):
+        response = await self.cached_request(
+            endpoint="historyBilling",
+            poll_key=f"{SENSOR_TYPE_MAIN}.daily",
+            ttl=DAILY_TASK_INTERVAL,
+            request=self._client.billing_history,
+            # One request covers every account
+            accounts=list(self._accounts.values()),
+        )
+
+        if response is None:
+            return
+
+        transactions = decode_transactions(response)
+        if transactions:
+            sensor_types = {account_number: sensor_type for sensor_type, account_number in self._accounts.items()}
+            all_bills = {
+                sensor_type: {
+                    'bill': [],
+                    'payment': [],
+                }
+                for sensor_type in self.account_sensor_types() or [SENSOR_TYPE_MAIN]
+            }
+            for transaction in transactions:
+                # Transactions without an account number belong to the primary account
+                bills = all_bills.get(sensor_types.get(transaction.account), all_bills[SENSOR_TYPE_MAIN])
+
+                record = {
+                    'total': transaction.total,
+                    'transaction_date': from_epoch(transaction.date),
+                }
+
+                if transaction.type == 'bill':
+                    record['from_date'] = from_epoch(transaction.from_date)
+                    record['to_date'] = from_epoch(transaction.to_date)
+
+                bills[transaction.type].append(record)
+
+            for sensor_type, bills in all_bills.items():
+                bills['bill'] = sorted(bills['bill'], key=lambda x: x['transaction_date'], reverse=True)
+                bills['payment'] = sorted(bills['payment'], key=lambda x: x['transaction_date'], reverse=True)
+                self._results[sensor_type]['bills'] = bills
+
+    @handle_errors
+    async def main_get_estimation(self, sensor_type: str = SENSOR_TYPE_MAIN):
+        response = await self.cached_request(
+            endpoint="consumption/info",
+            poll_key=f"{sensor_type}.daily",
+            ttl=DAILY_TASK_INTERVAL,
+            request=self._client.consumption_info,
+            account=self._accounts[sensor_type],
+        )
+
+        if response is None:
+            return
+
+        estimation = decode_estimation(response)
+        if estimation is not None:
+            self._results[sensor_type]['estimation'] = {
+                "current_consumption": estimation.current_consumption,
+                "current_cost": estimation.current_cost,
+                "current_end_date": from_optional_epoch(estimation.current_end_date),
+                "current_start_date": from_optional_epoch(estimation.current_start_date),
+                "deviation_percent": estimation.deviation_percent,
+                "estimation_consumption": estimation.estimation_consumption,
+                "estimation_cost": estimation.estimation_cost,
+                "estimation_end_date": from_optional_epoch(estimation.estimation_end_date),
+                "estimation_start_date": from_optional_epoch(estimation.estimation_start_date),
+            }
+
+    @handle_errors
+    async def main_get_bimonthly(self, sensor_type: str = SENSOR_TYPE_MAIN):
+        series = self.series[sensor_type]
+        bimonthly = self._results[sensor_type]['bimonthly']
+        dates = get_dates(self._timezone)
+
+        response = await self.cached_request(
+            endpoint="consumption/history/Bill",
+            poll_key=f"{sensor_type}.daily",
+            ttl=DAILY_TASK_INTERVAL,
+            request=self._client.consumption_history,
+            account=self._accounts[sensor_type],
+            mode="Bill",
+            from_date=self._incremental_from(bimonthly, dates["one_year_two_months_ago"], BIMONTHLY_REVISION_WINDOW).date(),
+            to_date=dates["today"].date(),
+        )
+
+        if response is None:
+            return
+
+        periods = decode_bill_periods(response)
+        if periods:
+            if series.wants('BIMONTHLY'):
+                self._set_state(sensor_type, 'BIMONTHLY', periods[0].kwh, from_epoch(periods[0].end))
+
+            # Always kept, even when not exposed, so the next fetch can ask only for newer periods
+            for period in periods:
+                bimonthly.upsert(period.end, period.kwh)
+            bimonthly.trim_before(to_epoch(start_of_day(dates["one_year_two_months_ago"])))
+
+    @handle_errors
+    async def main_get_daily(self, sensor_type: str = SENSOR_TYPE_MAIN):
+        series = self.series[sensor_type]
+        daily = self._results[sensor_type]['daily']
+        dates = get_dates(self._timezone)
+
+        response = await self.cached_request(
+            endpoint="consumption/history/Daily",
+            poll_key=f"{sensor_type}.daily",
+            ttl=self._poll_scheduler.cache_ttl(f"{sensor_type}.daily"),
+            request=self._client.consumption_history,
+            account=self._accounts[sensor_type],
+            mode="Daily",
+            from_date=self._incremental_from(daily, dates["this_month"], DAILY_REVISION_WINDOW).date(),
+            to_date=dates["next_month"].date(),
+        )
+
+        if response is None:
+            return
+
+        readings = decode_readings(response, "Daily")
+        if readings:
+            if series.wants('DAILY'):
+                self._set_state(sensor_type, 'DAILY', readings[-1].kwh, from_optional_epoch(readings[-1].end))
+
+            for reading in readings:
+                if reading.start is None or reading.kwh is None:
+                    continue
+                daily.upsert(reading.start, reading.kwh, reading.end)
+            self._trim_daily(sensor_type, start_of_day(dates["this_month"]))
+
+    @handle_errors
+    async def main_get_hourly(self, sensor_type: str = SENSOR_TYPE_MAIN):
+        series = self.series[sensor_type]
+        hourly = self._results[sensor_type]['hourly']
+        window_start = None
+        # The window ends on the day of the newest row CLP should have published
+        newest = self._poll_scheduler.newest_available(f"{sensor_type}.hourly").astimezone(self._timezone)
+        for i in range(1, series.get_hourly_days + 1):
+            from_date = newest + datetime.timedelta(days=-(series.get_hourly_days - i))
+            to_date = newest + datetime.timedelta(days=-(series.get_hourly_days - i - 1))
+
+            if i == 1:
+                window_start = from_date
+
+            if self._hourly_day_finalized(hourly, from_date):
+                _LOGGER.debug("[COORDINATOR UPDATE] Hourly data for %s is complete, skipping.", from_date.date())
+                continue
+
+            response = await self.cached_request(
+                endpoint="consumption/history/Hourly",
+                poll_key=f"{sensor_type}.hourly",
+                ttl=self._poll_scheduler.cache_ttl(f"{sensor_type}.hourly"),
+                request=self._client.consumption_history,
+                account=self._accounts[sensor_type],
+                mode="Hourly",
+                from_date=from_date.date(),
+                to_date=to_date.date(),
+            )
+
+            if response is None:
+                continue
+
+            # Decoded lazily: only the last row is needed whole, for the state
+            last = None
+            for reading in iter_readings(response, "Hourly"):
+                last = reading
+                if reading.start is None or reading.kwh is None:
+                    continue
+                hourly.upsert(reading.start, reading.kwh)
+
+            if last is not None and i == series.get_hourly_days and series.wants('HOURLY'):
+                self._set_state(sensor_type, 'HOURLY', last.kwh, from_optional_epoch(last.end))
+
+        if window_start is not None:
+            self._trim_hourly(sensor_type, start_of_day(window_start))
+
+    @handle_errors
+    async def renewable_get_bimonthly(self):
+        series = self.series[SENSOR_TYPE_RENEWABLE]
+        dates = get_dates(self._timezone)
+
+        response = await self.cached_request(
+            endpoint="renew/fit/dashboard/B",
+            poll_key=f"{SENSOR_TYPE_RENEWABLE}.daily",
+            ttl=DAILY_TASK_INTERVAL,
+            request=self._client.renewable_dashboard,
+            account=self._account_number,
+            mode="B",
+            start_date=dates["today"].date(),
+        )
+
+        if response is None:
+            return
+
+        readings = decode_renewable(response, "B")
+        if readings:
+            if series.wants('BIMONTHLY'):
+                self._set_state(SENSOR_TYPE_RENEWABLE, 'BIMONTHLY', readings[-1].kwh, from_optional_epoch(readings[-1].end))
+
+            if series.get_bill:
+                bills = self._results[SENSOR_TYPE_RENEWABLE]['bills']
+                for reading in readings:
+                    if reading.start is None or reading.kwh is None:
+                        continue
+                    bills.upsert(reading.start, reading.kwh, reading.end)
+                bills.trim_before(to_epoch(start_of_day(dates["one_year_two_months_ago"])))
+
+    @handle_errors
+    async def renewable_get_daily(self):
+        series = self.series[SENSOR_TYPE_RENEWABLE]
+        dates = get_dates(self._timezone)
+
+        response = await self.cached_request(
+            endpoint="renew/fit/dashboard/D",
+            poll_key=f"{SENSOR_TYPE_RENEWABLE}.daily",
+            ttl=self._poll_scheduler.cache_ttl(f"{SENSOR_TYPE_RENEWABLE}.daily"),
+            request=self._client.renewable_dashboard,
+            account=self._account_number,
+            mode="D",
+            start_date=dates["today"].date(),
+        )
+
+        if response is None:
+            return
+
+        readings = decode_renewable(response, "D")
+        if readings:
+            if series.wants('DAILY'):
+                self._set_latest_validated(SENSOR_TYPE_RENEWABLE, 'DAILY', readings)
+
+            if series.get_daily:
+                daily = self._results[SENSOR_TYPE_RENEWABLE]['daily']
+                window_start = None
+                for reading in readings:
+                    if reading.start is None or reading.kwh is None:
+                        continue
+                    window_start = reading.start if window_start is None else min(window_start, reading.start)
+                    daily.upsert(reading.start, reading.kwh)
+
+                # CLP decides the range returned around `startDate`, so the window follows the response
+                if window_start is not None:
+                    self._trim_daily(SENSOR_TYPE_RENEWABLE, from_epoch(window_start))
+
+    @handle_errors
+    async def renewable_get_hourly(self):
+        series = self.series[SENSOR_TYPE_RENEWABLE]
+        hourly = self._results[SENSOR_TYPE_RENEWABLE]['hourly']
+        window_start = None
+        newest = self._poll_scheduler.newest_available(f"{SENSOR_TYPE_RENEWABLE}.hourly").astimezone(self._timezone)
+        for i in range(1, series.get_hourly_days + 1):
+            start_date = newest + datetime.timedelta(days=-(series.get_hourly_days - i))
+
+            if i == 1:
+                window_start = start_date
+
+            # The first day also carries the state, so it is never skipped
+            if i > 1 and self._hourly_day_finalized(hourly, start_date):
+                _LOGGER.debug("[COORDINATOR UPDATE] Renewable hourly data for %s is complete, skipping.", start_date.date())
+                continue
+
+            response = await self.cached_request(
+                endpoint="renew/fit/dashboard/H",
+                poll_key=f"{SENSOR_TYPE_RENEWABLE}.hourly",
+                ttl=self._poll_scheduler.cache_ttl(f"{SENSOR_TYPE_RENEWABLE}.hourly"),
+                request=self._client.renewable_dashboard,
+                account=self._account_number,
+                mode="H",
+                start_date=start_date.date(),
+            )
+
+            if response is None:
+                continue
+
+            readings = decode_renewable(response, "H")
+            if readings:
+                if i == 1 and series.wants('HOURLY'):
+                    self._set_latest_validated(SENSOR_TYPE_RENEWABLE, 'HOURLY', readings)
+
+                if series.get_hourly:
+                    for reading in readings:
+                        if reading.start is None:
+                            continue
+                        if reading.status == 'N':
+                            self._unvalidated_hours.add(reading.start)
+                            continue
+                        self._unvalidated_hours.discard(reading.start)
+                        if reading.kwh is not None:
+                            hourly.upsert(reading.start, reading.kwh)
+
+        if series.get_hourly and window_start is not None:
+            self._trim_hourly(SENSOR_TYPE_RENEWABLE, start_of_day(window_start))
+            # Hours before the fetched window are never requested again, so cannot be waited for
+            since = self._results[SENSOR_TYPE_RENEWABLE]['hourly_since']
+            self._unvalidated_hours = {start for start in self._unvalidated_hours if start >= since}
+
+    def _daily_task_due(self, sensor_type: str) -> bool:
+        return self._poll_scheduler.due(f"{sensor_type}.daily")
+
+    def _hourly_task_due(self, sensor_type: str) -> bool:
+        return self._poll_scheduler.due(f"{sensor_type}.hourly")
+
+    def _polls_wanted(self, sensor_type: str, data_type: str) -> bool:
+        """Whether an update fetches anything on the `hourly` or `daily` schedule of a series."""
+        series = self.series[sensor_type]
+        if data_type == 'hourly':
+            return series.get_hourly or series.wants('HOURLY')
+        if sensor_type == SENSOR_TYPE_RENEWABLE:
+            return series.get_bill or series.wants('BIMONTHLY') or series.get_daily or series.wants('DAILY')
+        return (
+            (sensor_type == SENSOR_TYPE_MAIN and series.get_bill)
+            or series.get_estimation
+            or series.get_bimonthly or series.wants('BIMONTHLY')
+            or series.get_daily or series.wants('DAILY')
+        )
+
+    def _record_polls(self) -> None:
+        for sensor_type in self.series:
+            for data_type, period in (('hourly', 3600), ('daily', 86400)):
+                key = f"{sensor_type}.{data_type}"
+                # A schedule nothing is fetched on, e.g. after the type was pinned, must not set the interval
+                self._poll_scheduler.set_active(key, self._polls_wanted(sensor_type, data_type))
+                if key not in self._polled:
+                    continue
+                newest = self._results[sensor_type][data_type].last_timestamp()
+                self._poll_scheduler.record(key, newest + period if newest is not None else None)
+        self._polled.clear()
+
+        # Wake up right after the next expected publish instead of on the regular grid
+        next_poll = self._poll_scheduler.next_poll()
+        interval = MIN_TIME_BETWEEN_UPDATES
+        if next_poll is not None:
+            until = datetime.timedelta(seconds=next_poll - datetime.datetime.now().timestamp())
+            interval = max(MIN_UPDATE_INTERVAL, min(MIN_TIME_BETWEEN_UPDATES, until))
+        self.update_interval = interval
+
+    def _snapshot(self) -> dict:
+        """Results tagged with a revision that only moves when a payload or the error changed."""
+        if self._changed or self._error != self._last_error:
+            self._revision += 1
+        elif self._unchanged:
+            # Cycles where nothing was due do not count
+            self.skipped_updates += 1
+        self._changed = False
+        self._unchanged = False
+        self._last_error = self._error
+        return {**self._results, 'revision': self._revision}
+
+    async def _async_update_data(self):
+        started = time.monotonic()
+        _LOGGER.debug("[COORDINATOR UPDATE] Starting update, access_token_expiry_time=%s", self._access_token_expiry_time)
+
+        if not self._cache.loaded:
+            await self._cache.async_load()
+
+        if not self._poll_scheduler.loaded:
+            await self._poll_scheduler.async_load()
+
+        if self.series[SENSOR_TYPE_MAIN].get_cost and not self._tariff_loaded:
+            await self._async_load_tariff()
+
+        self._cycle_errors = 0
+
+        if self._4xx_error_retry > HTTP_4xx_ERROR_RETRY_LIMIT:
+            _LOGGER.debug("[COORDINATOR UPDATE] 4xx error retry limit reached, skipping update.")
+            return self._snapshot()
+
+        await self.auth()
+
+        if not self._access_token:
+            _LOGGER.debug("[COORDINATOR UPDATE] No access token, skipping data fetch.")
+            return self._snapshot()
+
+        main = self.series[SENSOR_TYPE_MAIN]
+
+        # The account number is shared by every sensor, so it is only fetched once
+        if not self._single_task_last_fetch_time:
+            if not self._account_number or main.get_acct:
+                _LOGGER.debug("[COORDINATOR UPDATE] Fetching account detail.")
+                await self.main_get_account_detail()
+
+        # Endpoints are independent once the account number is known. Each fetch method
+        # swallows its own errors, so one failing endpoint never cancels the others.
+        jobs = []
+
+        # Bills for every account come back from a single request
+        if main.get_bill and self._daily_task_due(SENSOR_TYPE_MAIN):
+            _LOGGER.debug("[COORDINATOR UPDATE] Fetching bill.")
+            jobs.append(self.main_get_bill())
+
+        for sensor_type in self.account_sensor_types():
+            if self._daily_task_due(sensor_type):
+                if main.get_estimation:
+                    _LOGGER.debug("[COORDINATOR UPDATE] Fetching estimation for %s.", sensor_type)
+                    jobs.append(self.main_get_estimation(sensor_type))
+
+                if main.get_bimonthly or main.wants('BIMONTHLY'):
+                    _LOGGER.debug("[COORDINATOR UPDATE] Fetching bimonthly for %s.", sensor_type)
+                    jobs.append(self.main_get_bimonthly(sensor_type))
+
+                if main.get_daily or main.wants('DAILY'):
+                    _LOGGER.debug("[COORDINATOR UPDATE] Fetching daily for %s.", sensor_type)
+                    jobs.append(self.main_get_daily(sensor_type))
+
+            if self._hourly_task_due(sensor_type):
+                if main.get_hourly or main.wants('HOURLY'):
+                    _LOGGER.debug("[COORDINATOR UPDATE] Fetching hourly for %s.", sensor_type)
+                    jobs.append(self.main_get_hourly(sensor_type))
+
+        renewable = self.series.get(SENSOR_TYPE_RENEWABLE)
+        if renewable is not None:
+            if self._daily_task_due(SENSOR_TYPE_RENEWABLE):
+                if renewable.get_bill or renewable.wants('BIMONTHLY'):
+                    _LOGGER.debug("[COORDINATOR UPDATE] Fetching renewable bimonthly.")
+                    jobs.append(self.renewable_get_bimonthly())
+
+                if renewable.get_daily or renewable.wants('DAILY'):
+                    _LOGGER.debug("[COORDINATOR UPDATE] Fetching renewable daily.")
+                    jobs.append(self.renewable_get_daily())
+
+            if self._hourly_task_due(SENSOR_TYPE_RENEWABLE):
+                if renewable.get_hourly or renewable.wants('HOURLY'):
+                    _LOGGER.debug("[COORDINATOR UPDATE] Fetching renewable hourly.")
+                    jobs.append(self.renewable_get_hourly())
+
+        # The request semaphore decides how many of these actually run at once, across all accounts
+        await asyncio.gather(*jobs, return_exceptions=True)
+        self._record_polls()
+
+        for sensor_type, importer in self._statistics.items():
+            try:
+                # Statistics stop before the first renewable hour CLP has not validated yet
+                until = min(self._unvalidated_hours, default=None) if sensor_type == SENSOR_TYPE_RENEWABLE else None
+                await importer.async_import(self._results[sensor_type]['hourly'], until)
+            except Exception as e:
+                _LOGGER.error("%s: Failed to import hourly statistics into %s: %s", self.name, importer.statistic_id, e)
+
+        if self._account_number:
+            yesterday = datetime.datetime.now(self._timezone).date() - datetime.timedelta(days=1)
+            for backfill in self.backfills.values():
+                backfill.async_start(yesterday)
+
+        self._resolve_states()
+        self._resolve_costs()
+        self._resolve_windows()
+
+        if not self._cycle_errors:
+            self._retry.reset()
+
+        self.metrics.record_update(time.monotonic() - started)
+
+        return self._snapshot()
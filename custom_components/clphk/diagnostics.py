@@ -0,0 +1,31 @@
+"""Diagnostics support for CLPHK."""
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_DOMAIN
+
+TO_REDACT = {
+    "email",
+    "otp",
+    "access_token",
+    "refresh_token",
+    "access_token_expiry_time",
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    data = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+    }
+
+    coordinator = hass.data.get(CONF_DOMAIN, {}).get(entry.entry_id, {}).get("coordinator")
+    if coordinator is not None:
+        data["coordinator"] = coordinator.diagnostics()
+    return data
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from collections import deque
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+# Recent latencies kept per endpoint for percentiles
+LATENCY_SAMPLES = 200
+
+# Keys under `data` that hold the rows of a CLP payload
+ROW_KEYS = ('results', 'consumptionData', 'transactions')
+
+
+def count_rows(response: dict) -> int:
+    data = response.get('data')
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        for key in ROW_KEYS:
+            if isinstance(data.get(key), list):
+                return len(data[key])
+    return 1 if data else 0
+
+
+class EndpointMetrics:
+    __slots__ = (
+        'requests', 'errors', 'cache_hits', 'bytes', 'rows', 'total_time', 'latencies', 'last_error',
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.bytes = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.last_error = None
+
+    def percentile(self, q: float) -> float | None:
+        """Nearest-rank percentile of the recent latencies, in seconds."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> dict:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "total_ms": round(self.total_time * 1000),
+            "bytes": self.bytes,
+            "rows": self.rows,
+            "last_error": self.last_error,
+        }
+
+
+class RequestMetrics:
+    """Per-endpoint request counts, latencies, sizes and parsed rows of one coordinator."""
+
+    def __init__(self) -> None:
+        self._endpoints = {}
+        self._listeners = []
+        self.updates = 0
+        self.last_update_time = None
+
+    @property
+    def endpoints(self) -> dict[str, EndpointMetrics]:
+        return self._endpoints
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(name)
+        if metrics is None:
+            metrics = self._endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_request(self, name: str, elapsed: float, size: int | None = None, error: str | None = None) -> None:
+        metrics = self.endpoint(name)
+        metrics.requests += 1
+        metrics.total_time += elapsed
+        metrics.latencies.append(elapsed)
+        if size is not None:
+            metrics.bytes += size
+        if error is not None:
+            metrics.errors += 1
+            metrics.last_error = error
+
+    def record_cache_hit(self, name: str) -> None:
+        self.endpoint(name).cache_hits += 1
+
+    def record_rows(self, name: str, rows: int) -> None:
+        self.endpoint(name).rows += rows
+
+    @callback
+    def record_update(self, elapsed: float) -> None:
+        """Record one finished update cycle and tell listeners, even when no data changed."""
+        self.updates += 1
+        self.last_update_time = elapsed
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def as_dict(self) -> dict:
+        return {
+            "updates": self.updates,
+            "last_update_ms": round(self.last_update_time * 1000) if self.last_update_time is not None else None,
+            # Slowest first, so the call that dominates refresh time is at the top
+            "endpoints": {
+                name: metrics.as_dict()
+                for name, metrics in sorted(self._endpoints.items(), key=lambda item: -item[1].total_time)
+            },
+        }
@@ -0,0 +1,257 @@
+"""Typed records decoded from CLP payloads. Independent of Home Assistant.
+
+Timestamps are epoch seconds, parsed without building a datetime per row.
+Amounts and kWh are floats.
+"""
+from __future__ import annotations
+
+try:
+    from orjson import loads as _loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    from json import loads as _loads
+    JSON_BACKEND = "json"
+
+from typing import Iterator
+
+from .capture import redact
+from .timestamps import parse_date_epoch, parse_epoch
+
+# What a malformed row raises while being decoded
+_ROW_ERRORS = (KeyError, TypeError, ValueError, AttributeError)
+
+
+class CLPDecodeError(ValueError):
+    """A CLP payload does not have the shape its endpoint is expected to return."""
+
+
+def loads(body: bytes | str):
+    """Parse JSON with orjson when it is installed, else with the standard library."""
+    return _loads(body)
+
+
+def _optional_epoch(value: str | None) -> int | None:
+    return parse_epoch(value) if value else None
+
+
+def _optional_float(value) -> float | None:
+    return float(value) if value not in (None, '') else None
+
+
+def _data(endpoint: str, payload: dict, key: str | None = None):
+    try:
+        data = payload['data']
+        if key is not None:
+            data = data[key]
+    except (KeyError, TypeError) as e:
+        field = f"data.{key}" if key is not None else "data"
+        raise CLPDecodeError(f"{endpoint}: response has no {field}") from e
+    return data
+
+
+def _decode_rows(endpoint: str, rows, decode_row) -> list:
+    if not rows:
+        return []
+    if not isinstance(rows, list):
+        raise CLPDecodeError(f"{endpoint}: expected a list of rows, got {type(rows).__name__}")
+    try:
+        return [decode_row(row) for row in rows]
+    except _ROW_ERRORS:
+        # Decode again one by one, only to name the row at fault
+        for index, row in enumerate(rows):
+            try:
+                decode_row(row)
+            except _ROW_ERRORS as e:
+                raise CLPDecodeError(f"{endpoint}: row {index}: {e!r} in {redact(row)!r}") from e
+        raise
+
+
+class Account:
+    __slots__ = ('number', 'status', 'outstanding', 'due_date')
+
+    def __init__(self, number: str, status: str, outstanding: float, due_date: int | None) -> None:
+        self.number = number
+        self.status = status
+        self.outstanding = outstanding
+        self.due_date = due_date
+
+
+class Transaction:
+    """A bill or a payment; only bills have a billing period."""
+
+    __slots__ = ('account', 'type', 'total', 'date', 'from_date', 'to_date')
+
+    def __init__(
+            self,
+            account: str | None,
+            type: str,
+            total: float,
+            date: int,
+            from_date: int | None,
+            to_date: int | None,
+    ) -> None:
+        self.account = account
+        self.type = type
+        self.total = total
+        self.date = date
+        self.from_date = from_date
+        self.to_date = to_date
+
+
+class Estimation:
+    __slots__ = (
+        'current_consumption', 'current_cost', 'current_start_date', 'current_end_date',
+        'deviation_percent',
+        'estimation_consumption', 'estimation_cost', 'estimation_start_date', 'estimation_end_date',
+    )
+
+    def __init__(self, data: dict) -> None:
+        self.current_consumption = float(data['currentConsumption'])
+        self.current_cost = float(data['currentCost'])
+        self.current_start_date = _optional_epoch(data['currentStartDate'])
+        self.current_end_date = _optional_epoch(data['currentEndDate'])
+        self.deviation_percent = float(data['deviationPercent'])
+        self.estimation_consumption = float(data['projectedConsumption'])
+        self.estimation_cost = float(data['projectedCost'])
+        self.estimation_start_date = _optional_epoch(data['projectedStartDate'])
+        self.estimation_end_date = _optional_epoch(data['projectedEndDate'])
+
+
+class BillPeriod:
+    """kWh of one billing period, from `consumption/history` in Bill mode."""
+
+    __slots__ = ('end', 'kwh')
+
+    def __init__(self, end: int, kwh: float) -> None:
+        self.end = end
+        self.kwh = kwh
+
+
+class Reading:
+    """One daily or hourly row of `consumption/history`; CLP sends placeholder rows without a start."""
+
+    __slots__ = ('start', 'end', 'kwh')
+
+    def __init__(self, start: int | None, end: int | None, kwh: float | None) -> None:
+        self.start = start
+        self.end = end
+        self.kwh = kwh
+
+
+class RenewableReading:
+    """One row of `renew/fit/dashboard`; `status` is CLP's validateStatus, Y once validated and N if not."""
+
+    __slots__ = ('start', 'end', 'kwh', 'status')
+
+    def __init__(self, start: int | None, end: int | None, kwh: float | None, status: str | None) -> None:
+        self.start = start
+        self.end = end
+        self.kwh = kwh
+        self.status = status
+
+    @property
+    def valid(self) -> bool:
+        return self.status == 'Y'
+
+
+def _account(row: dict) -> Account:
+    return Account(row['caNo'], row['status'], float(row['outstandingAmount']), _optional_epoch(row['dueDate']))
+
+
+def _transaction(row: dict) -> Transaction | None:
+    if row['type'] == 'bill':
+        return Transaction(
+            row.get('ca') or row.get('caNo'),
+            'bill',
+            float(row['total']),
+            parse_epoch(row['tranDate']),
+            parse_epoch(row['fromDate']),
+            parse_epoch(row['toDate']),
+        )
+    if row['type'] == 'payment':
+        return Transaction(
+            row.get('ca') or row.get('caNo'),
+            'payment',
+            float(row['total']),
+            parse_epoch(row['tranDate']),
+            None,
+            None,
+        )
+    return None
+
+
+def _bill_period(row: dict) -> BillPeriod:
+    return BillPeriod(parse_date_epoch(row['endabrpe']), float(row['totKwh']))
+
+
+def _reading(row: dict) -> Reading:
+    return Reading(_optional_epoch(row['startDate']), _optional_epoch(row['expireDate']), _optional_float(row['kwhTotal']))
+
+
+def _renewable_reading(row: dict) -> RenewableReading:
+    return RenewableReading(
+        _optional_epoch(row['startdate']),
+        _optional_epoch(row['enddate']),
+        _optional_float(row['kwhtotal']),
+        row['validateStatus'],
+    )
+
+
+def decode_accounts(payload: dict) -> list[Account]:
+    return _decode_rows("myServicesCA", _data("myServicesCA", payload), _account)
+
+
+def decode_transactions(payload: dict) -> list[Transaction]:
+    """Bills and payments, in CLP's order; other transaction types are dropped."""
+    rows = _decode_rows("historyBilling", _data("historyBilling", payload, 'transactions'), _transaction)
+    return [row for row in rows if row is not None]
+
+
+def decode_estimation(payload: dict) -> Estimation | None:
+    data = _data("consumption/info", payload)
+    if not data:
+        return None
+    try:
+        return Estimation(data)
+    except _ROW_ERRORS as e:
+        raise CLPDecodeError(f"consumption/info: {e!r}") from e
+
+
+def decode_bill_periods(payload: dict) -> list[BillPeriod]:
+    """Billing periods, newest first as CLP sends them."""
+    data = _data("consumption/history/Bill", payload)
+    if not data:
+        return []
+    return _decode_rows("consumption/history/Bill", _data("consumption/history/Bill", payload, 'results'), _bill_period)
+
+
+def iter_readings(payload: dict, mode: str) -> Iterator[Reading]:
+    """Like decode_readings, one row at a time, so a long history never holds every Reading at once."""
+    endpoint = f"consumption/history/{mode}"
+    data = _data(endpoint, payload)
+    if not data:
+        return
+    rows = _data(endpoint, payload, 'results')
+    if not rows:
+        return
+    if not isinstance(rows, list):
+        raise CLPDecodeError(f"{endpoint}: expected a list of rows, got {type(rows).__name__}")
+    for index, row in enumerate(rows):
+        try:
+            reading = _reading(row)
+        except _ROW_ERRORS as e:
+            raise CLPDecodeError(f"{endpoint}: row {index}: {e!r} in {redact(row)!r}") from e
+        yield reading
+
+
+def decode_readings(payload: dict, mode: str) -> list[Reading]:
+    endpoint = f"consumption/history/{mode}"
+    data = _data(endpoint, payload)
+    if not data:
+        return []
+    return _decode_rows(endpoint, _data(endpoint, payload, 'results'), _reading)
+
+
+def decode_renewable(payload: dict, mode: str) -> list[RenewableReading]:
+    endpoint = f"renew/fit/dashboard/{mode}"
+    return _decode_rows(endpoint, _data(endpoint, payload, 'consumptionData'), _renewable_reading)
@@ -0,0 +1,191 @@
+"""Estimates when CLP publishes each series, from when its rows show up. Independent of Home Assistant."""
+from __future__ import annotations
+
+import datetime
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weight of a new lag sample in the moving estimate
+LAG_ALPHA = 0.25
+# Poll this long after the expected publish time
+MIN_MARGIN = 60
+# A row found on the first poll only bounds the lag from above, so the estimate is probed
+# this much earlier each time until a poll comes back empty
+LAG_PROBE = 120
+# First retry when a row is overdue; doubles on every miss up to the series' fallback interval
+MIN_RETRY_INTERVAL = 300
+
+
+class _Schedule:
+    __slots__ = (
+        'period', 'fallback', 'default_lag', 'lag', 'deviation',
+        'latest_end', 'last_poll', 'next_poll', 'misses', 'polls', 'hits', 'active',
+    )
+
+    def __init__(self, period: int, fallback: int, default_lag: int) -> None:
+        self.period = period
+        self.fallback = fallback
+        self.default_lag = default_lag
+        self.lag = None
+        self.deviation = 0.0
+        self.latest_end = None
+        self.last_poll = None
+        self.next_poll = None
+        self.misses = 0
+        self.polls = 0
+        self.hits = 0
+        self.active = True
+
+
+class PublishLagEstimator:
+    """Learns how long after a period ends CLP publishes its row, and polls just after that.
+
+    A series is due when its next row is expected, then backs off exponentially
+    while that row is late. Until a lag has been learned, each series falls back
+    to a fixed interval.
+    """
+
+    def __init__(self) -> None:
+        self._schedules = {}
+        self._saved = {}
+
+    def register(
+            self,
+            key: str,
+            period: datetime.timedelta,
+            fallback: datetime.timedelta,
+            default_lag: datetime.timedelta,
+    ) -> None:
+        schedule = _Schedule(
+            int(period.total_seconds()),
+            int(fallback.total_seconds()),
+            int(default_lag.total_seconds()),
+        )
+        self._schedules[key] = schedule
+        self._restore(key, schedule)
+
+    def _restore(self, key: str, schedule: _Schedule) -> None:
+        saved = self._saved.get(key)
+        if saved is not None and schedule.lag is None:
+            schedule.lag = saved["lag"]
+            schedule.deviation = saved["deviation"]
+
+    def restore(self, lags: dict) -> None:
+        # Kept around for series registered later, such as newly found accounts
+        self._saved = lags
+        for key, schedule in self._schedules.items():
+            self._restore(key, schedule)
+
+    def lags(self) -> dict:
+        """Learned lags, including those of series not registered in this run."""
+        return {
+            **self._saved,
+            **{
+                key: {"lag": schedule.lag, "deviation": schedule.deviation}
+                for key, schedule in self._schedules.items()
+                if schedule.lag is not None
+            },
+        }
+
+    def due(self, key: str) -> bool:
+        next_poll = self._schedules[key].next_poll
+        return next_poll is None or time.time() >= next_poll
+
+    def set_active(self, key: str, active: bool) -> None:
+        """Whether `key` is still fetched; an inactive series does not decide the next update."""
+        self._schedules[key].active = active
+
+    def next_poll(self) -> float | None:
+        """Earliest time any active series is due, as epoch seconds."""
+        polls = [schedule.next_poll for schedule in self._schedules.values() if schedule.active]
+        if not polls or None in polls:
+            return None
+        return min(polls)
+
+    def newest_available(self, key: str) -> datetime.datetime:
+        """Start of the newest row CLP should have published by now."""
+        schedule = self._schedules[key]
+        lag = schedule.lag if schedule.lag is not None else schedule.default_lag
+        return datetime.datetime.fromtimestamp(time.time() - lag - schedule.period, datetime.timezone.utc)
+
+    def cache_ttl(self, key: str) -> datetime.timedelta:
+        """How long a response stays fresh: until the next row is expected."""
+        schedule = self._schedules[key]
+        if schedule.lag is None or schedule.latest_end is None:
+            return datetime.timedelta(seconds=schedule.fallback)
+        expected = schedule.latest_end + schedule.period + schedule.lag
+        return datetime.timedelta(seconds=max(MIN_RETRY_INTERVAL, expected - time.time()))
+
+    def record(self, key: str, latest_end: int | None) -> bool:
+        """Record a successful poll; `latest_end` is when the newest row seen so far ends.
+
+        Returns whether the lag estimate changed.
+        """
+        schedule = self._schedules[key]
+        now = time.time()
+        schedule.polls += 1
+        learned = False
+
+        if latest_end is not None and (schedule.latest_end is None or latest_end > schedule.latest_end):
+            if schedule.last_poll is not None and schedule.latest_end is not None:
+                if schedule.misses and schedule.last_poll > latest_end:
+                    # The row appeared between the previous (empty) poll and this one
+                    self._learn(schedule, (schedule.last_poll + now) / 2 - latest_end)
+                elif schedule.lag is None:
+                    self._learn(schedule, now - latest_end)
+                else:
+                    self._learn(schedule, min(now - latest_end, schedule.lag) - LAG_PROBE)
+                learned = True
+            schedule.latest_end = latest_end
+            schedule.misses = 0
+            schedule.hits += 1
+        else:
+            schedule.misses += 1
+
+        schedule.last_poll = now
+        schedule.next_poll = self._next_poll(schedule, now)
+        _LOGGER.debug(
+            "[SCHEDULER] %s: lag=%s, misses=%s, next poll in %d seconds",
+            key, schedule.lag, schedule.misses, schedule.next_poll - now,
+        )
+        return learned
+
+    @staticmethod
+    def _learn(schedule: _Schedule, sample: float) -> None:
+        sample = max(0.0, sample)
+        if schedule.lag is None:
+            schedule.lag = sample
+            schedule.deviation = sample / 4
+            return
+        error = sample - schedule.lag
+        schedule.lag += LAG_ALPHA * error
+        schedule.deviation += LAG_ALPHA * (abs(error) - schedule.deviation)
+
+    @staticmethod
+    def _next_poll(schedule: _Schedule, now: float) -> float:
+        if schedule.lag is None or schedule.latest_end is None:
+            return now + schedule.fallback
+
+        expected = schedule.latest_end + schedule.period + schedule.lag + MIN_MARGIN
+        if expected > now:
+            return expected
+
+        # Overdue: CLP is late, so retry sooner than the fallback but back off while nothing shows up
+        retry = MIN_RETRY_INTERVAL * 2 ** max(0, schedule.misses - 1)
+        return now + min(retry, schedule.fallback)
+
+    def stats(self) -> dict:
+        return {
+            key: {
+                "lag": schedule.lag,
+                "deviation": schedule.deviation,
+                "polls": schedule.polls,
+                "hits": schedule.hits,
+                "misses": schedule.misses,
+                "next_poll": schedule.next_poll,
+                "active": schedule.active,
+            }
+            for key, schedule in self._schedules.items()
+        }
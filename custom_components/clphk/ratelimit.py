@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import CONF_DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data[DOMAIN] key of the limits shared by every entry, since they all talk to the same host
+HOST_LIMITS_KEY = 'host_limits'
+
+# Sustained request rate to api.clp.com.hk across all entries, with room for one update cycle's burst
+RATE_LIMIT_PER_SECOND = 0.5
+RATE_LIMIT_BURST = 10
+
+# Consecutive 5xx responses or timeouts before requests stop being sent
+FAILURE_THRESHOLD = 5
+OPEN_DURATION = 300
+# Each failed trial request doubles how long the circuit stays open, up to this
+MAX_OPEN_DURATION = 3600
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """CLP looks down; no request was sent. `retry_after` is in seconds."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"CLP is unavailable, not sending requests for {int(retry_after)} seconds")
+        self.retry_after = retry_after
+
+
+class ExponentialBackoff:
+    def __init__(self, min_delay: int, max_delay: int, factor: float = 2.0):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.delay = min_delay
+        self.tries = 0
+
+    def reset(self):
+        self.delay = self.min_delay
+        self.tries = 0
+
+    def increment(self):
+        self.tries += 1
+        self.delay = min(self.max_delay, self.delay * self.factor)
+        return self.delay
+
+
+class TokenBucket:
+    """Lets requests through at `rate` per second on average, and up to `capacity` at once."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        # Waiters queue on the lock, so they are served in arrival order
+        self._lock = asyncio.Lock()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                self.waits += 1
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class CircuitBreaker:
+    """Stops requests after repeated server failures, then lets one trial request through.
+
+    A successful trial closes the circuit again; a failed one reopens it for twice as long.
+    """
+
+    def __init__(
+            self,
+            threshold: int = FAILURE_THRESHOLD,
+            open_duration: int = OPEN_DURATION,
+            max_open_duration: int = MAX_OPEN_DURATION,
+    ) -> None:
+        self._threshold = threshold
+        self._open_duration = open_duration
+        self._max_open_duration = max_open_duration
+        self._open_for = open_duration
+        self._opened_at = None
+        self._trial_started = None
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened = 0
+
+    def retry_after(self) -> float:
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._open_for - time.monotonic())
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        now = time.monotonic()
+        if self.state == STATE_OPEN:
+            if now < self._opened_at + self._open_for:
+                raise CircuitOpenError(self.retry_after())
+            self.state = STATE_HALF_OPEN
+            self._trial_started = None
+
+        if self.state == STATE_HALF_OPEN:
+            # A trial that never reported back (e.g. cancelled) does not block the circuit forever
+            if self._trial_started is not None and now < self._trial_started + self._open_duration:
+                raise CircuitOpenError(self._trial_started + self._open_duration - now)
+            self._trial_started = now
+
+    def record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("[CIRCUIT] CLP is responding again, resuming requests")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._open_for = self._open_duration
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._open_for = min(self._open_for * 2, self._max_open_duration)
+            self._open()
+        elif self.state == STATE_CLOSED and self.failures >= self._threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._trial_started = None
+        self.opened += 1
+        _LOGGER.warning("[CIRCUIT] %s consecutive CLP failures, pausing requests for %s seconds", self.failures, self._open_for)
+
+
+class HostLimits:
+    """Rate limit and circuit breaker for api.clp.com.hk, shared by every entry."""
+
+    def __init__(self) -> None:
+        self.bucket = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        self.breaker = CircuitBreaker()
+
+
+def get_host_limits(hass: HomeAssistant) -> HostLimits:
+    domain_data = hass.data.setdefault(CONF_DOMAIN, {})
+    if HOST_LIMITS_KEY not in domain_data:
+        domain_data[HOST_LIMITS_KEY] = HostLimits()
+    return domain_data[HOST_LIMITS_KEY]
+
+
+class CoalescedRetry:
+    """Keeps at most one pending retry; failures while one is pending do not add another."""
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            retry: Callable[[], Awaitable[None]],
+            min_delay: int,
+            max_delay: int,
+    ) -> None:
+        self._hass = hass
+        self._retry = retry
+        self._backoff = ExponentialBackoff(min_delay=min_delay, max_delay=max_delay)
+        self._unsub = None
+
+    @property
+    def pending(self) -> bool:
+        return self._unsub is not None
+
+    @callback
+    def schedule(self, min_delay: float = 0) -> float | None:
+        """Schedule a retry unless one is already pending; return its delay if one was added."""
+        if self._unsub is not None:
+            return None
+        delay = max(self._backoff.increment(), min_delay)
+        self._unsub = async_call_later(self._hass, delay, self._async_fire)
+        return delay
+
+    def reset(self) -> None:
+        self._backoff.reset()
+
+    def cancel(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_fire(self, _now) -> None:
+        self._unsub = None
+        self._hass.async_create_task(self._retry())
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CONF_DOMAIN
+from .publish_lag import PublishLagEstimator
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{CONF_DOMAIN}.poll_schedule"
+SAVE_DELAY = 30
+
+
+class PublishLagScheduler(PublishLagEstimator):
+    """PublishLagEstimator whose learned lags are kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant, key: str = STORAGE_KEY) -> None:
+        super().__init__()
+        self._store = Store(hass, STORAGE_VERSION, key)
+        self.loaded = False
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self.restore(data.get("lags", {}))
+        self.loaded = True
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {"lags": self.lags()}
+
+    def record(self, key: str, latest_end: int | None) -> bool:
+        learned = super().record(key, latest_end)
+        if learned:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return learned
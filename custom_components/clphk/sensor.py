@@ -1,24 +1,19 @@
 from __future__ import annotations
 
 import asyncio
-import base64
-import datetime
 import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable
 
-import aiohttp
-import async_timeout
 import homeassistant.helpers.config_validation as cv
-import pytz
 import voluptuous as vol
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-from dateutil import relativedelta
-from dateutil.parser import isoparse
 from homeassistant.components.lock import PLATFORM_SCHEMA
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
@@ -26,20 +21,23 @@ from homeassistant.const import (
     CONF_NAME,
     CONF_TIMEOUT,
     CONF_TYPE,
+    PERCENTAGE,
+    EntityCategory,
     UnitOfEnergy,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import aiohttp_client
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-from homeassistant.util import Throttle
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import verify_otp
 from .const import (
-    CONF_CLP_PUBLIC_KEY,
     CONF_DOMAIN,
     CONF_RETRY_DELAY,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_BACKGROUND_STARTUP,
+    CONF_TOKEN_REFRESH_LEAD,
+    CONF_TOKEN_REFRESH_JITTER,
 
     CONF_GET_ACCT,
     CONF_GET_BILL,
@@ -48,6 +46,16 @@ from .const import (
     CONF_GET_DAILY,
     CONF_GET_HOURLY,
     CONF_GET_HOURLY_DAYS,
+    CONF_GET_COST,
+    CONF_TARIFF_FILE,
+    CONF_IMPORT_STATISTICS,
+    CONF_INCREMENTAL_FETCH,
+    CONF_BACKFILL_DAYS,
+    CONF_METRICS_SENSORS,
+    CONF_TRACE_REQUESTS,
+    CONF_CAPTURE_RESPONSES,
+    CONF_DATASET_SENSORS,
+    CONF_ROLLING_SENSORS,
 
     CONF_RES_ENABLE,
     CONF_RES_NAME,
@@ -57,12 +65,25 @@ from .const import (
     CONF_RES_GET_HOURLY,
     CONF_RES_GET_HOURLY_DAYS,
 )
+from .coordinator import (
+    CLIENT_KEY_YAML,
+    CLPDataUpdateCoordinator,
+    SENSOR_TYPE_MAIN,
+    SENSOR_TYPE_RENEWABLE,
+    SeriesConfig,
+)
+from .backfill import HourlyBackfill
+from .series import TimeSeries
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_TIMEOUT, default=30): cv.positive_int,
     vol.Optional(CONF_RETRY_DELAY, default=300): cv.positive_int,
+    vol.Optional(CONF_MAX_CONCURRENT_REQUESTS, default=1): vol.Clamp(min=1, max=8),
+    vol.Optional(CONF_BACKGROUND_STARTUP, default=True): cv.boolean,
+    vol.Optional(CONF_TOKEN_REFRESH_LEAD, default=300): vol.Clamp(min=60, max=3600),
+    vol.Optional(CONF_TOKEN_REFRESH_JITTER, default=60): vol.Clamp(min=0, max=600),
     vol.Optional(CONF_NAME, default='CLP'): cv.string,
     vol.Optional(CONF_TYPE, default=''): cv.string,
     vol.Optional(CONF_GET_ACCT, default=False): cv.boolean,
@@ -72,6 +93,16 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_GET_DAILY, default=False): cv.boolean,
     vol.Optional(CONF_GET_HOURLY, default=False): cv.boolean,
     vol.Optional(CONF_GET_HOURLY_DAYS, default=1): vol.Clamp(min=1, max=2),
+    vol.Optional(CONF_GET_COST, default=False): cv.boolean,
+    vol.Optional(CONF_TARIFF_FILE, default=''): cv.string,
+    vol.Optional(CONF_IMPORT_STATISTICS, default=True): cv.boolean,
+    vol.Optional(CONF_INCREMENTAL_FETCH, default=True): cv.boolean,
+    vol.Optional(CONF_BACKFILL_DAYS, default=0): vol.Clamp(min=0, max=730),
+    vol.Optional(CONF_METRICS_SENSORS, default=False): cv.boolean,
+    vol.Optional(CONF_TRACE_REQUESTS, default=False): cv.boolean,
+    vol.Optional(CONF_CAPTURE_RESPONSES, default=False): cv.boolean,
+    vol.Optional(CONF_DATASET_SENSORS, default=False): cv.boolean,
+    vol.Optional(CONF_ROLLING_SENSORS, default=False): cv.boolean,
 
     vol.Optional(CONF_RES_ENABLE, default=False): cv.boolean,
     vol.Optional(CONF_RES_NAME, default='CLP Renewable Energy'): cv.string,
@@ -82,14 +113,11 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_RES_GET_HOURLY_DAYS, default=1): vol.Clamp(min=1, max=2),
 })
 
-MIN_TIME_BETWEEN_UPDATES = datetime.timedelta(seconds=300)
-DAILY_TASK_INTERVAL = datetime.timedelta(hours=12)
-HOURLY_TASK_INTERVAL = datetime.timedelta(minutes=30)
-USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
-HTTP_4xx_ERROR_RETRY_LIMIT = 3
-
 DOMAIN = CONF_DOMAIN
 
+# CLP bills in Hong Kong dollars
+CURRENCY = "HKD"
+
 
 async def async_setup_platform(
         hass: HomeAssistant,
@@ -101,61 +129,145 @@ async def async_setup_platform(
     if discovery_info is None:
         return
 
-    session = aiohttp_client.async_get_clientsession(hass)
+    await _async_setup_sensors(hass, discovery_info, async_add_entities)
 
-    # Shared token state in hass.data[DOMAIN]
-    hass.data[DOMAIN]["session"] = session
+
+async def _async_setup_sensors(
+        hass: HomeAssistant,
+        discovery_info: DiscoveryInfoType,
+        async_add_entities: AddEntitiesCallback,
+        entry: ConfigEntry | None = None,
+) -> None:
+    entry_id = entry.entry_id if entry is not None else None
+    # Tokens and their lock belong to one login each
+    client_state = hass.data.setdefault(DOMAIN, {}).setdefault(entry_id or CLIENT_KEY_YAML, {})
     # Set tokens on restart (if not already set)
     for k in ("access_token", "refresh_token", "access_token_expiry_time"):
         if discovery_info.get(k) is not None and discovery_info.get(k) != "":
-            hass.data[DOMAIN][k] = discovery_info.get(k)
-    hass.data[DOMAIN]["token_lock"] = asyncio.Lock()
+            client_state[k] = discovery_info.get(k)
+    client_state["token_lock"] = asyncio.Lock()
+
+    # One coordinator fetches every endpoint once per cycle for all sensors
+    coordinator = CLPDataUpdateCoordinator(hass, discovery_info, entry_id)
+    client_state["coordinator"] = coordinator
+    background_startup = discovery_info.get(CONF_BACKGROUND_STARTUP, True)
+    if not background_startup:
+        await coordinator.async_refresh()
+
+    dataset_sensors = discovery_info.get(CONF_DATASET_SENSORS, False)
+    rolling_sensors = discovery_info.get(CONF_ROLLING_SENSORS, False)
 
-    async_add_entities(
-        [
+    def _sensors(sensor_type: str, name: str) -> list[SensorEntity]:
+        sensors = [
             CLPSensor(
-                hass=hass,
-                sensor_type='main',
-                name=discovery_info.get(CONF_NAME, "CLP"),
-                email=discovery_info.get("email", None),
-                timeout=int(discovery_info.get(CONF_TIMEOUT, 30)),
-                retry_delay=int(discovery_info.get(CONF_RETRY_DELAY, 300)),
-                type=discovery_info.get(CONF_TYPE, ""),
-                get_acct=discovery_info.get(CONF_GET_ACCT, False),
-                get_bill=discovery_info.get(CONF_GET_BILL, False),
-                get_estimation=discovery_info.get(CONF_GET_ESTIMATION, False),
-                get_bimonthly=discovery_info.get(CONF_GET_BIMONTHLY, False),
-                get_daily=discovery_info.get(CONF_GET_DAILY, False),
-                get_hourly=discovery_info.get(CONF_GET_HOURLY, False),
-                get_hourly_days=int(discovery_info.get(CONF_GET_HOURLY_DAYS, 1)),
+                coordinator=coordinator,
+                sensor_type=sensor_type,
+                name=name,
+                dataset_sensors=dataset_sensors,
             ),
-        ],
-        update_before_add=True,
-    )
+        ]
+        if dataset_sensors:
+            descriptions = RENEWABLE_DATASET_SENSORS if sensor_type == SENSOR_TYPE_RENEWABLE else MAIN_DATASET_SENSORS
+            sensors.extend(
+                CLPDatasetSensor(
+                    coordinator=coordinator,
+                    sensor_type=sensor_type,
+                    name=name,
+                    description=description,
+                )
+                for description in descriptions
+                if description.enabled_fn(coordinator.series[sensor_type])
+            )
+        descriptions = () if sensor_type == SENSOR_TYPE_RENEWABLE else COST_SENSORS
+        if rolling_sensors:
+            descriptions += ROLLING_SENSORS if sensor_type == SENSOR_TYPE_RENEWABLE else MAIN_ROLLING_SENSORS
+        sensors.extend(
+            CLPDatasetSensor(
+                coordinator=coordinator,
+                sensor_type=sensor_type,
+                name=name,
+                description=description,
+            )
+            for description in descriptions
+            if description.enabled_fn(coordinator.series[sensor_type])
+        )
+        return sensors
+
+    entities = _sensors(SENSOR_TYPE_MAIN, discovery_info.get(CONF_NAME, "CLP"))
 
     if discovery_info.get(CONF_RES_ENABLE, False):
-        async_add_entities(
-            [
-                CLPSensor(
-                    hass=hass,
-                    sensor_type='renewable_energy',
-                    name=discovery_info.get(CONF_RES_NAME, "CLP Renewable Energy"),
-                    email=discovery_info.get("email", None),
-                    timeout=int(discovery_info.get(CONF_TIMEOUT, 30)),
-                    retry_delay=int(discovery_info.get(CONF_RETRY_DELAY, 300)),
-                    type=discovery_info.get(CONF_RES_TYPE, ""),
-                    get_acct=False,
-                    get_bill=discovery_info.get(CONF_RES_GET_BILL, False),
-                    get_estimation=False,
-                    get_bimonthly=False,
-                    get_daily=discovery_info.get(CONF_RES_GET_DAILY, False),
-                    get_hourly=discovery_info.get(CONF_RES_GET_HOURLY, False),
-                    get_hourly_days=int(discovery_info.get(CONF_RES_GET_HOURLY_DAYS, 1)),
-                ),
-            ],
-            update_before_add=True,
+        entities.extend(_sensors(SENSOR_TYPE_RENEWABLE, discovery_info.get(CONF_RES_NAME, "CLP Renewable Energy")))
+
+    for sensor_type, backfill in coordinator.backfills.items():
+        entities.append(
+            CLPBackfillSensor(
+                coordinator=coordinator,
+                backfill=backfill,
+                sensor_type=sensor_type,
+                name=discovery_info.get(CONF_NAME, "CLP") if sensor_type == SENSOR_TYPE_MAIN else discovery_info.get(CONF_RES_NAME, "CLP Renewable Energy"),
+            ),
         )
 
+    metrics_sensors = discovery_info.get(CONF_METRICS_SENSORS, False)
+    if metrics_sensors:
+        entities.append(
+            CLPRequestMetricsSensor(
+                coordinator=coordinator,
+                name=discovery_info.get(CONF_NAME, "CLP"),
+            ),
+        )
+
+    async_add_entities(entities)
+
+    # Accounts after the first are only known once the account list has been fetched
+    added = {SENSOR_TYPE_MAIN, SENSOR_TYPE_RENEWABLE}
+
+    @callback
+    def _async_add_account_sensors() -> None:
+        new_types = [sensor_type for sensor_type in coordinator.account_sensor_types() if sensor_type not in added]
+        if not new_types:
+            return
+        added.update(new_types)
+        async_add_entities([
+            sensor
+            for sensor_type in new_types
+            for sensor in _sensors(sensor_type, f"{discovery_info.get(CONF_NAME, 'CLP')} {coordinator.account_number(sensor_type)}")
+        ])
+
+    _async_add_account_sensors()
+    listeners = [coordinator.async_add_listener(_async_add_account_sensors)]
+
+    if metrics_sensors:
+        # One sensor per endpoint, added once that endpoint has been called
+        metric_endpoints = set()
+
+        @callback
+        def _async_add_metric_sensors() -> None:
+            new_endpoints = [endpoint for endpoint in coordinator.metrics.endpoints if endpoint not in metric_endpoints]
+            if not new_endpoints:
+                return
+            metric_endpoints.update(new_endpoints)
+            async_add_entities([
+                CLPRequestMetricsSensor(
+                    coordinator=coordinator,
+                    name=discovery_info.get(CONF_NAME, "CLP"),
+                    endpoint=endpoint,
+                )
+                for endpoint in new_endpoints
+            ])
+
+        listeners.append(coordinator.metrics.async_add_listener(_async_add_metric_sensors))
+
+    # A YAML set-up is never unloaded; an entry drops its listeners with the coordinator
+    if entry is not None:
+        for remove_listener in listeners:
+            entry.async_on_unload(remove_listener)
+
+    if background_startup:
+        # Entities start from their restored state; the first fetch (which may wait
+        # for an OTP) must not hold up Home Assistant startup
+        coordinator.async_start_first_refresh()
+
 
 async def async_setup_entry(
         hass: HomeAssistant,
@@ -165,130 +277,269 @@ async def async_setup_entry(
     """Set up the sensor platform from a config entry."""
     # Merge config_entry.data and config_entry.options, options take precedence
     merged = {**config_entry.data, **config_entry.options}
-    await async_setup_platform(
+    await _async_setup_sensors(
         hass,
-        {},
+        merged,
         async_add_entities,
-        discovery_info=merged,
+        entry=config_entry,
     )
 
 
-def get_dates(timezone):
-    return {
-        "yesterday": datetime.datetime.now(timezone) + datetime.timedelta(days=-1),
-        "today": datetime.datetime.now(timezone),
-        "tomorrow": datetime.datetime.now(timezone) + datetime.timedelta(days=1),
-        "one_year_two_months_ago": (datetime.datetime.now(timezone) - relativedelta.relativedelta(years=1, months=2)).replace(day=datetime.datetime.now(timezone).day),
-        "last_month": (datetime.datetime.now(timezone).replace(day=1) + relativedelta.relativedelta(months=-1)),
-        "this_month": datetime.datetime.now(timezone).replace(day=1),
-        "next_month": (datetime.datetime.now(timezone).replace(day=1) + relativedelta.relativedelta(months=1)),
-    }
-
-
-class ExponentialBackoff:
-    def __init__(self, min_delay: int, max_delay: int, factor: float = 2.0):
-        self.min_delay = min_delay
-        self.max_delay = max_delay
-        self.factor = factor
-        self.delay = min_delay
-        self.tries = 0
-
-    def reset(self):
-        self.delay = self.min_delay
-        self.tries = 0
-
-    def increment(self):
-        self.tries += 1
-        self.delay = min(self.max_delay, self.delay * self.factor)
-        return self.delay
-
-
-def handle_errors(func):
-    async def wrapper(self, *args, **kwargs):
-        try:
-            # Reset backoff and error state on successful call
-            if not hasattr(self, '_backoff'):
-                self._backoff = ExponentialBackoff(
-                    min_delay=self._retry_delay,
-                    max_delay=3600  # Max 1 hour between retries
-                )
-            
-            result = await func(self, *args, **kwargs)
-            self._backoff.reset()
-            self._error = None
-            return result
-            
-        except Exception as e:
-            error_msg = str(e)
-            self._error = error_msg
-            _LOGGER.error(f"{self._name} ERROR: {error_msg}", exc_info=True)
-            
-            # Schedule next retry with exponential backoff
-            next_retry_delay = self._backoff.increment()
-            _LOGGER.info(f"{self._name}: Scheduling retry in {next_retry_delay} seconds")
-            async_call_later(self.hass, next_retry_delay, self.async_update)
-            
-            return None
-
-    return wrapper
-
-
-class CLPSensor(SensorEntity):
-    _timezone = pytz.timezone('Asia/Hong_Kong')
+def _records(series: TimeSeries | None, **kwargs) -> list[dict] | None:
+    if not series:
+        return None
+    return series.to_records(**kwargs)
+
+
+def _latest_record(series: TimeSeries | None) -> dict | None:
+    """Newest point of a series as `{'start': datetime, 'end': datetime, 'kwh': float}`."""
+    if not series:
+        return None
+    return series.to_records(start=series.last_timestamp())[0]
+
+
+def _latest_kwh(key: str) -> Callable[[dict], float | None]:
+    def value(result: dict) -> float | None:
+        record = _latest_record(result.get(key))
+        return record['kwh'] if record else None
+    return value
+
+
+def _latest_period(key: str) -> Callable[[dict], dict | None]:
+    def attributes(result: dict) -> dict | None:
+        record = _latest_record(result.get(key))
+        return {name: value for name, value in record.items() if name != 'kwh'} if record else None
+    return attributes
+
+
+def _field(dataset: str, key: str) -> Callable[[dict], Any]:
+    def value(result: dict):
+        data = result.get(dataset)
+        return data.get(key) if data else None
+    return value
+
+
+def _fields(dataset: str, *keys: str) -> Callable[[dict], dict | None]:
+    def attributes(result: dict) -> dict | None:
+        data = result.get(dataset)
+        return {key: data.get(key) for key in keys} if data else None
+    return attributes
+
+
+def _due_date(result: dict):
+    due_date = _field('account', 'due_date')(result)
+    return due_date.date() if due_date else None
+
+
+def _latest_bill(result: dict) -> dict | None:
+    bills = result.get('bills')
+    if not bills or not bills.get('bill'):
+        return None
+    return bills['bill'][0]
+
+
+@dataclass(frozen=True, kw_only=True)
+class CLPDatasetSensorDescription(SensorEntityDescription):
+    """One value taken out of a sensor type's results, and the option that fetches it."""
+
+    value_fn: Callable[[dict], Any]
+    attributes_fn: Callable[[dict], dict | None] = lambda result: None
+    enabled_fn: Callable[[SeriesConfig], bool]
+
+
+def _energy(key: str, name: str, **kwargs) -> CLPDatasetSensorDescription:
+    return CLPDatasetSensorDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        **kwargs,
+    )
+
+
+def _money(key: str, name: str, **kwargs) -> CLPDatasetSensorDescription:
+    return CLPDatasetSensorDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement=CURRENCY,
+        suggested_display_precision=2,
+        **kwargs,
+    )
+
+
+MAIN_DATASET_SENSORS = (
+    _money(
+        "outstanding",
+        "Outstanding Balance",
+        value_fn=_field('account', 'outstanding'),
+        enabled_fn=lambda series: series.get_acct,
+    ),
+    CLPDatasetSensorDescription(
+        key="due_date",
+        name="Due Date",
+        device_class=SensorDeviceClass.DATE,
+        value_fn=_due_date,
+        enabled_fn=lambda series: series.get_acct,
+    ),
+    _energy(
+        "current_consumption",
+        "Current Consumption",
+        value_fn=_field('estimation', 'current_consumption'),
+        attributes_fn=_fields('estimation', 'current_start_date', 'current_end_date'),
+        enabled_fn=lambda series: series.get_estimation,
+    ),
+    _money(
+        "current_cost",
+        "Current Cost",
+        value_fn=_field('estimation', 'current_cost'),
+        attributes_fn=_fields('estimation', 'current_start_date', 'current_end_date'),
+        enabled_fn=lambda series: series.get_estimation,
+    ),
+    _energy(
+        "projected_consumption",
+        "Projected Consumption",
+        value_fn=_field('estimation', 'estimation_consumption'),
+        attributes_fn=_fields('estimation', 'estimation_start_date', 'estimation_end_date', 'deviation_percent'),
+        enabled_fn=lambda series: series.get_estimation,
+    ),
+    _money(
+        "projected_cost",
+        "Projected Cost",
+        value_fn=_field('estimation', 'estimation_cost'),
+        attributes_fn=_fields('estimation', 'estimation_start_date', 'estimation_end_date'),
+        enabled_fn=lambda series: series.get_estimation,
+    ),
+    _energy(
+        "latest_daily",
+        "Latest Daily",
+        value_fn=_latest_kwh('daily'),
+        attributes_fn=_latest_period('daily'),
+        enabled_fn=lambda series: series.get_daily,
+    ),
+    _energy(
+        "latest_hourly",
+        "Latest Hourly",
+        value_fn=_latest_kwh('hourly'),
+        attributes_fn=_latest_period('hourly'),
+        enabled_fn=lambda series: series.get_hourly,
+    ),
+    _money(
+        "latest_bill",
+        "Latest Bill",
+        value_fn=lambda result: (_latest_bill(result) or {}).get('total'),
+        attributes_fn=lambda result: {
+            key: value for key, value in (_latest_bill(result) or {}).items() if key != 'total'
+        } or None,
+        enabled_fn=lambda series: series.get_bill,
+    ),
+)
+
+# Renewable bills are kWh generated per billing period
+RENEWABLE_DATASET_SENSORS = (
+    _energy(
+        "latest_daily",
+        "Latest Daily",
+        value_fn=_latest_kwh('daily'),
+        attributes_fn=_latest_period('daily'),
+        enabled_fn=lambda series: series.get_daily,
+    ),
+    _energy(
+        "latest_hourly",
+        "Latest Hourly",
+        value_fn=_latest_kwh('hourly'),
+        attributes_fn=_latest_period('hourly'),
+        enabled_fn=lambda series: series.get_hourly,
+    ),
+    _energy(
+        "latest_bill",
+        "Latest Bill",
+        value_fn=_latest_kwh('bills'),
+        attributes_fn=_latest_period('bills'),
+        enabled_fn=lambda series: series.get_bill,
+    ),
+)
+
+
+def _entry_value(dataset: str, key: str, field: str) -> Callable[[dict], Any]:
+    def value(result: dict):
+        entry = (result.get(dataset) or {}).get(key)
+        return entry[field] if entry else None
+    return value
+
+
+def _entry_attributes(dataset: str, key: str, field: str) -> Callable[[dict], dict | None]:
+    def attributes(result: dict) -> dict | None:
+        entry = (result.get(dataset) or {}).get(key)
+        return {name: value for name, value in entry.items() if name != field} if entry else None
+    return attributes
+
+
+def _cost(key: str, sensor_key: str, name: str) -> CLPDatasetSensorDescription:
+    return _money(
+        sensor_key,
+        name,
+        value_fn=_entry_value('cost', key, 'cost'),
+        attributes_fn=_entry_attributes('cost', key, 'cost'),
+        enabled_fn=lambda series: series.get_cost,
+    )
+
+
+def _window(key: str, name: str, enabled_fn: Callable[[SeriesConfig], bool]) -> CLPDatasetSensorDescription:
+    return _energy(
+        key,
+        name,
+        value_fn=_entry_value('windows', key, 'kwh'),
+        attributes_fn=_entry_attributes('windows', key, 'kwh'),
+        enabled_fn=enabled_fn,
+    )
+
+
+# Priced locally with the tariff file, from readings already fetched
+COST_SENSORS = (
+    _cost('period', "period_cost", "Period Cost"),
+    _cost('latest_day', "latest_daily_cost", "Latest Daily Cost"),
+    _cost('latest_hour', "latest_hourly_cost", "Latest Hourly Cost"),
+)
+
+# Totals from the prefix sums of the hourly and daily series
+ROLLING_SENSORS = (
+    _window('last_24_hours', "Last 24 Hours", lambda series: series.get_hourly),
+    _window('week_to_date', "Week To Date", lambda series: series.get_daily or series.get_hourly),
+    _window('month_to_date', "Month To Date", lambda series: series.get_daily or series.get_hourly),
+)
+
+MAIN_ROLLING_SENSORS = ROLLING_SENSORS + (
+    _window('period_to_date', "Period To Date", lambda series: series.get_estimation or series.get_bill),
+)
+
+
+class CLPSensor(CoordinatorEntity, RestoreSensor):
+    # These lists are rewritten on every state write; hourly history is kept in long-term statistics instead
+    _unrecorded_attributes = frozenset({"daily", "hourly"})
 
     def __init__(
             self,
-            hass,
+            coordinator: CLPDataUpdateCoordinator,
             sensor_type: str,
             name: str,
-            email: str,
-            timeout: int,
-            retry_delay: int,
-            type: str = None,
-            get_acct: bool = False,
-            get_bill: bool = False,
-            get_estimation: bool = False,
-            get_bimonthly: bool = False,
-            get_daily: bool = False,
-            get_hourly: bool = False,
-            get_hourly_days: int = 1,
+            dataset_sensors: bool = False,
     ) -> None:
-        _LOGGER.debug(f"[SENSOR INIT] type={sensor_type}, name={name}, email={email}, tokens={{'access_token': {getattr(self, '_access_token', None)}, 'expiry': {getattr(self, '_access_token_expiry_time', None)}}}")
-        self.hass = hass
+        super().__init__(coordinator)
+        _LOGGER.debug("[SENSOR INIT] type=%s, name=%s", sensor_type, name)
         self._sensor_type = sensor_type
+        self._series = coordinator.series[sensor_type]
         self._name = name
-        self._email = email
-        self._timeout = timeout
-        self._retry_delay = retry_delay
-        self._type = type
-        self._get_acct = get_acct
-        self._get_bill = get_bill
-        self._get_estimation = get_estimation
-        self._get_bimonthly = get_bimonthly
-        self._get_daily = get_daily
-        self._get_hourly = get_hourly
-        self._get_hourly_days = get_hourly_days
-        self._account_number = None
+        # Datasets with their own sensors are left out of the attributes
+        self._dataset_sensors = dataset_sensors
         self._state_data_type = None
-        self._error = None
         self._attr_device_class = SensorDeviceClass.ENERGY
         self._attr_native_value = None
         self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
         self._attr_state_class = SensorStateClass.TOTAL
         self._attr_name = name
-        self._attr_unique_id = f"clphk_{sensor_type}_{name.replace(' ', '_').lower()}"
-
-        self._account = None
-        self._bills = None
-        self._estimation = None
-        self._bimonthly = None
-        self._daily = None
-        self._hourly = None
-
-        self._single_task_last_fetch_time = None
-        self._hourly_task_last_fetch_time = None
-        self._daily_task_last_fetch_time = None
-        self._4xx_error_retry = 0
+        self._attr_unique_id = f"clphk_{sensor_type}_{name.replace(' ', '_').lower()}{coordinator.instance_suffix}"
+        self._update_from_coordinator()
 
     @property
     def unique_id(self):
@@ -303,658 +554,202 @@ class CLPSensor(SensorEntity):
         return self._attr_native_value
 
     @property
-    def _token_state(self):
-        return self.hass.data[DOMAIN]
-
-    @property
-    def _access_token(self):
-        return self._token_state.get("access_token")
-
-    @property
-    def _refresh_token(self):
-        return self._token_state.get("refresh_token")
-
-    @property
-    def _access_token_expiry_time(self):
-        return self._token_state.get("access_token_expiry_time")
-
-    @_access_token.setter
-    def _access_token(self, value):
-        self._token_state["access_token"] = value
-
-    @_refresh_token.setter
-    def _refresh_token(self, value):
-        self._token_state["refresh_token"] = value
-
-    @_access_token_expiry_time.setter
-    def _access_token_expiry_time(self, value):
-        self._token_state["access_token_expiry_time"] = value
-
-    @property
-    def _session(self):
-        return self._token_state["session"]
+    def _result(self):
+        if not self.coordinator.data:
+            return {}
+        return self.coordinator.data.get(self._sensor_type, {})
 
     @property
     def extra_state_attributes(self) -> dict:
+        result = self._result
         attr = {
             "state_data_type": self._state_data_type,
-            "error": self._error,
+            "error": self.coordinator.error,
         }
 
-        if self._get_acct and hasattr(self, '_account'):
-            attr["account"] = self._account
+        if self._series.get_bimonthly:
+            attr["bimonthly"] = _records(result.get('bimonthly'), key='end')
 
-        if self._get_bill and hasattr(self, '_bills'):
-            attr["bills"] = self._bills
+        if self._dataset_sensors:
+            return attr
 
-        if self._get_estimation and hasattr(self, '_estimation'):
-            attr["estimation"] = self._estimation
+        if self._series.get_acct:
+            attr["account"] = result.get('account')
 
-        if self._get_bimonthly and hasattr(self, '_bimonthly'):
-            attr["bimonthly"] = self._bimonthly
+        if self._series.get_bill:
+            bills = result.get('bills')
+            attr["bills"] = _records(bills) if isinstance(bills, TimeSeries) else bills
 
-        if self._get_daily and hasattr(self, '_daily'):
-            attr["daily"] = self._daily
+        if self._series.get_estimation:
+            attr["estimation"] = result.get('estimation')
 
-        if self._get_hourly and hasattr(self, '_hourly'):
-            attr["hourly"] = self._hourly
+        if self._series.get_daily:
+            attr["daily"] = _records(result.get('daily'), start=result.get('daily_since'))
+
+        if self._series.get_hourly:
+            attr["hourly"] = _records(result.get('hourly'), start=result.get('hourly_since'))
 
         return attr
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
 
-    async def api_request(
-            self,
-            method: str,
-            url: str,
-            headers: dict = None,
-            json: dict = None,
-            params: dict = None
-    ):
-        if not self._access_token and 'eligibilityCheckAndLogin' not in url and 'refresh_token' not in url:
-            raise Exception("Problematic authorization. Please configure again, or change your IP address.")
-
-        if json:
-            _LOGGER.debug(f"REQUEST {method} {headers} {url} {params} {json}")
-
-        async with async_timeout.timeout(self._timeout):
-            response = await self._session.request(
-                method,
-                url,
-                headers=headers,
-                params=params,
-                json=json,
-            )
+        if self._attr_native_value is not None:
+            return
 
-            try:
-                response.raise_for_status()
-            except aiohttp.ClientResponseError as e:
-                error_message = f"{e.status} {e.request_info.url}"
-                
-                try:
-                    # Try to read the response content only once and store it
-                    error_content = await response.text()
-                    try:
-                        error_data = json.loads(error_content)
-                        error_message += f" : {error_data}"
-                    except json.JSONDecodeError:
-                        error_message += f" : {error_content}"
-                except Exception as read_error:
-                    error_message += f" (Failed to read error response: {read_error})"
-                
-                _LOGGER.error(error_message)
-
-                if 400 <= e.status < 500:
-                    self._account_number = None
-                    self._access_token = None
-                    self._refresh_token = None
-                    self._access_token_expiry_time = None
-
-                    _LOGGER.debug(f"[SENSOR UPDATE] Clearing tokens from config entry.")
-                    config_entries = self.hass.config_entries.async_entries(DOMAIN)
-                    if config_entries:
-                        entry = config_entries[0]
-                        data = dict(entry.data)
-                        data["access_token"] = ""
-                        data["refresh_token"] = ""
-                        data["access_token_expiry_time"] = ""
-                        self.hass.config_entries.async_update_entry(entry, data=data)
-
-                    raise Exception('HTTP 4xx error retry limit reached')
-                    
-                raise e
-
-            try:
-                response_data = await response.json()
-
-                if not response_data or 'data' not in response_data:
-                    _LOGGER.error(f"RESPONSE {response.status} {response.url} : {response_data}")
-                    raise ValueError('Invalid response data')
-
-                _LOGGER.debug(f"RESPONSE {response.status} {response.url} : {response_data}")
-
-                return response_data
-            except Exception as _:
-                response_text = await response.text()
-                _LOGGER.error(f"{response.status} {response.url} : {response_text}")
-                raise
-
-
-    @handle_errors
-    async def auth(self):
-        token_lock = self._token_state["token_lock"]
-        async with token_lock:
-            if not self._access_token and self.hass.states.get('sensor.clp_email_otp') is not None:
-                _LOGGER.debug("Requesting OTP")
-
-                state = self.hass.states.get('sensor.clp_email_otp')
-                original_otp = state.state if state else None
-
-                public_key = serialization.load_pem_public_key(CONF_CLP_PUBLIC_KEY.encode())
-                await self.api_request(
-                    method="POST",
-                    url="https://api.clp.com.hk/ts2/ms/profile/register/eligibilityCheckAndLogin",
-                    json={
-                        "email": base64.b64encode(public_key.encrypt(
-                            self._email.encode('utf-8'),
-                            padding.OAEP(
-                                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                                algorithm=hashes.SHA256(),
-                                label=None,
-                            )
-                        )).decode(),
-                        "phone": "",
-                        "type": base64.b64encode(public_key.encrypt(
-                            "email".encode('utf-8'),
-                            padding.OAEP(
-                                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                                algorithm=hashes.SHA256(),
-                                label=None,
-                            )
-                        )).decode(),
-                    },
-                )
+        # Show the last known value until the first background fetch completes
+        last_sensor_data = await self.async_get_last_sensor_data()
+        if last_sensor_data is not None:
+            self._attr_native_value = last_sensor_data.native_value
 
-                await asyncio.sleep(10)
-
-                max_attempts = 15
-                attempt = 0
-                otp = None
-                while attempt < max_attempts:
-                    state = self.hass.states.get('sensor.clp_email_otp')
-                    otp = state.state if state else None
-
-                    if otp and otp != original_otp:
-                        break
-
-                    _LOGGER.debug(f"Waiting for OTP email (attempt {attempt+1}/{max_attempts})...")
-                    await asyncio.sleep(5)
-                    attempt += 1
-                if not otp:
-                    _LOGGER.error("OTP was not received in time. Please check your email/IMAP integration.")
-                    raise Exception("OTP not received from sensor.clp_email_otp")
-
-                try:
-                    token_data = await verify_otp(self._session, self._email, otp)
-                    self._access_token = token_data.get("access_token")
-                    self._refresh_token = token_data.get("refresh_token")
-                    self._access_token_expiry_time = token_data.get("access_token_expiry_time")
-                    _LOGGER.debug(f"Access token obtained: {self._access_token}")
-                except Exception as ex:
-                    _LOGGER.error(f"Failed to verify OTP and obtain access token: {ex}")
-                    raise
-
-            elif self._refresh_token and self._access_token_expiry_time:
-                now_utc = datetime.datetime.now(datetime.timezone.utc)
-                try:
-                    expiry = isoparse(self._access_token_expiry_time)
-                    if expiry.tzinfo is None:
-                        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
-                except Exception as e:
-                    _LOGGER.error(f"Failed to parse access_token_expiry_time: {self._access_token_expiry_time}, error: {e}")
-                    expiry = None
-                _LOGGER.debug(f"[TOKEN DEBUG] now_utc={now_utc.isoformat()}, expiry={expiry}, expiry_raw={self._access_token_expiry_time}")
-                if expiry and now_utc > expiry - datetime.timedelta(minutes=1):
-                    _LOGGER.debug(f"Refreshing access_token and refresh_token")
-
-                    response = await self.api_request(
-                        method="POST",
-                        url="https://api.clp.com.hk/ts2/ms/profile/identity/manage/account/refresh_token",
-                        json={
-                            "refreshToken": self._refresh_token,
-                        },
-                    )
-
-                    _LOGGER.debug(f"access_token: {response['data'].get('accessToken') or response['data'].get('access_token')}")
-                    _LOGGER.debug(f"refresh_token: {response['data'].get('refreshToken') or response['data'].get('refresh_token')}")
-                    _LOGGER.debug(f"access_token_expiry_time: {response['data'].get('accessTokenExpiredAt') or response['data'].get('expires_in')}")
-
-                    self._access_token = response['data'].get('accessToken') or response['data'].get('access_token')
-                    self._refresh_token = response['data'].get('refreshToken') or response['data'].get('refresh_token')
-                    self._access_token_expiry_time = response['data'].get('accessTokenExpiredAt') or response['data'].get('expires_in')
-
-                    _LOGGER.debug(f"[SENSOR UPDATE] Persisting refreshed tokens to config entry.")
-                    config_entries = self.hass.config_entries.async_entries(DOMAIN)
-                    if config_entries:
-                        entry = config_entries[0]
-                        data = dict(entry.data)
-                        data["access_token"] = self._access_token
-                        data["refresh_token"] = self._refresh_token
-                        data["access_token_expiry_time"] = self._access_token_expiry_time
-                        self.hass.config_entries.async_update_entry(entry, data=data)
-
-
-    @handle_errors
-    async def main_get_account_detail(self):
-        response = await self.api_request(
-            method="GET",
-            url="https://api.clp.com.hk/ts1/ms/profile/accountdetails/myServicesCA",
-            headers={
-                "Authorization": self._access_token,
-            },
-        )
-        # Find the first entry with status 'Active'
-        active_data = next((item for item in response['data'] if item.get('status') == 'Active'), None)
-        if not active_data:
-            self._account_number = None
-            self._account = None
-        else:
-            self._account_number = active_data['caNo']
-            self._account = {
-                'number': active_data['caNo'],
-                'outstanding': float(active_data['outstandingAmount']),
-                'due_date': datetime.datetime.strptime(active_data['dueDate'], '%Y%m%d%H%M%S') if (active_data['dueDate'] is not None and active_data['dueDate'] != '') else None,
-            }
-        self._single_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-
-    @handle_errors
-    async def main_get_bill(self):
-        response = await self.api_request(
-            method="POST",
-            url="https://api.clp.com.hk/ts1/ms/billing/transaction/historyBilling",
-            headers={
-                "Authorization": self._access_token,
-            },
-            json={
-                "caList": [
-                    {
-                        "ca": self._account_number,
-                    },
-                ],
-            },
-        )
+        last_state = await self.async_get_last_state()
+        if last_state is not None:
+            self._state_data_type = last_state.attributes.get("state_data_type")
 
-        if response['data']['transactions']:
-            bills = {
-                'bill': [],
-                'payment': [],
-            }
-            for row in response['data']['transactions']:
-                if row['type'] != 'bill' and row['type'] != 'payment':
-                    continue
-
-                record = {
-                    'total': float(row['total']),
-                    'transaction_date': datetime.datetime.strptime(row['tranDate'], '%Y%m%d%H%M%S'),
-                }
-
-                if row['type'] == 'bill':
-                    record['from_date'] = datetime.datetime.strptime(row['fromDate'], '%Y%m%d%H%M%S')
-                    record['to_date'] = datetime.datetime.strptime(row['toDate'], '%Y%m%d%H%M%S')
-
-                bills[row['type']].append(record)
-
-            bills['bill'] = sorted(bills['bill'], key=lambda x: x['transaction_date'], reverse=True)
-            bills['payment'] = sorted(bills['payment'], key=lambda x: x['transaction_date'], reverse=True)
-            self._bills = bills
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-
-    @handle_errors
-    async def main_get_estimation(self):
-        response = await self.api_request(
-            method="GET",
-            url="https://api.clp.com.hk/ts1/ms/consumption/info",
-            headers={
-                "Authorization": self._access_token,
-            },
-            params={
-                "ca": self._account_number,
-            },
-        )
+    def _update_from_coordinator(self) -> None:
+        result = self._result
+        if result.get('state_data_type') is not None:
+            self._state_data_type = result['state_data_type']
+            self._attr_native_value = result['native_value']
+            self._attr_last_reset = result['last_reset']
 
-        if response['data']:
-            self._estimation = {
-                "current_consumption": float(response['data']['currentConsumption']),
-                "current_cost": float(response['data']['currentCost']),
-                "current_end_date": datetime.datetime.strptime(response['data']['currentEndDate'], '%Y%m%d%H%M%S') if (response['data']['currentEndDate'] is not None and response['data']['currentEndDate'] != '') else None,
-                "current_start_date": datetime.datetime.strptime(response['data']['currentStartDate'], '%Y%m%d%H%M%S') if (response['data']['currentStartDate'] is not None and response['data']['currentStartDate'] != '') else None,
-                "deviation_percent": float(response['data']['deviationPercent']),
-                "estimation_consumption": float(response['data']['projectedConsumption']),
-                "estimation_cost": float(response['data']['projectedCost']),
-                "estimation_end_date": datetime.datetime.strptime(response['data']['projectedEndDate'], '%Y%m%d%H%M%S') if (response['data']['projectedEndDate'] is not None and response['data']['projectedEndDate'] != '') else None,
-                "estimation_start_date": datetime.datetime.strptime(response['data']['projectedStartDate'], '%Y%m%d%H%M%S') if (response['data']['projectedStartDate'] is not None and response['data']['projectedStartDate'] != '') else None,
-            }
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-
-    @handle_errors
-    async def main_get_bimonthly(self):
-        dates = get_dates(self._timezone)
-
-        response = await self.api_request(
-            method="POST",
-            url="https://api.clp.com.hk/ts1/ms/consumption/history",
-            headers={
-                "Authorization": self._access_token,
-            },
-            json={
-                "ca": self._account_number,
-                "fromDate": dates["one_year_two_months_ago"].strftime('%Y%m%d000000'),
-                "mode": "Bill",
-                "toDate": dates["today"].strftime('%Y%m%d000000'),
-                "type": "Unit",
-            },
-        )
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._update_from_coordinator()
+        self.async_write_ha_state()
 
-        if response['data']:
-            if self._type == '' or self._type.upper() == 'BIMONTHLY':
-                self._state_data_type = 'BIMONTHLY'
-                self._attr_native_value = response['data']['results'][0]['totKwh']
-                self._attr_last_reset = datetime.datetime.strptime(response['data']['results'][0]['endabrpe'], '%Y%m%d')
-
-            if self._get_bimonthly:
-                bimonthly = []
-                for row in response['data']['results']:
-                    bimonthly.append({
-                        'end': datetime.datetime.strptime(row['endabrpe'], '%Y%m%d'),
-                        'kwh': row['totKwh'],
-                    })
-                self._bimonthly = sorted(bimonthly, key=lambda x: x['end'], reverse=True)
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-
-    @handle_errors
-    async def main_get_daily(self):
-        dates = get_dates(self._timezone)
-
-        response = await self.api_request(
-            method="POST",
-            url="https://api.clp.com.hk/ts1/ms/consumption/history",
-            headers={
-                "Authorization": self._access_token,
-            },
-            json={
-                "ca": self._account_number,
-                "fromDate": dates["this_month"].strftime("%Y%m%d000000"),
-                "mode": "Daily",
-                "toDate": dates["next_month"].strftime("%Y%m%d000000"),
-                "type": "Unit",
-            },
-        )
 
-        if response['data']:
-            if self._type == '' or self._type.upper() == 'DAILY':
-                self._state_data_type = 'DAILY'
-                self._attr_native_value = response['data']['results'][-1]['kwhTotal']
-                self._attr_last_reset = datetime.datetime.strptime(
-                    response['data']['results'][-1]['expireDate'], '%Y%m%d%H%M%S')
-
-            if self._get_daily:
-                daily = []
-                for row in response['data']['results']:
-                    start = None
-                    if row['startDate']:
-                        start = datetime.datetime.strptime(row['startDate'], '%Y%m%d%H%M%S')
-
-                    end = None
-                    if row['expireDate']:
-                        end = datetime.datetime.strptime(row['expireDate'], '%Y%m%d%H%M%S')
-
-                    daily.append({
-                        'start': start,
-                        'end': end,
-                        'kwh': row['kwhTotal'],
-                    })
-                self._daily = sorted(daily, key=lambda x: x['start'], reverse=True)
-
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-
-    @handle_errors
-    async def main_get_hourly(self):
-        hourly = []
-        for i in range(1, self._get_hourly_days + 1):
-            from_date = datetime.datetime.now(self._timezone) + datetime.timedelta(days=-(self._get_hourly_days - i))
-            to_date = datetime.datetime.now(self._timezone) + datetime.timedelta(days=-(self._get_hourly_days - i - 1))
-
-            if datetime.time(0, 0) <= datetime.datetime.now(self._timezone).time() < datetime.time(4, 0):
-                from_date = from_date + datetime.timedelta(days=-1)
-                to_date = to_date + datetime.timedelta(days=-1)
-
-            response = await self.api_request(
-                method="POST",
-                url="https://api.clp.com.hk/ts1/ms/consumption/history",
-                headers={
-                    "Authorization": self._access_token,
-                },
-                json={
-                    "ca": self._account_number,
-                    "fromDate": from_date.strftime("%Y%m%d000000"),
-                    "mode": "Hourly",
-                    "toDate": to_date.strftime("%Y%m%d000000"),
-                    "type": "Unit",
-                },
-            )
+class CLPDatasetSensor(CoordinatorEntity, RestoreSensor):
+    """One dataset of a sensor type, written only when its own value or attributes change."""
 
-            if response['data']['results']:
-                if i == self._get_hourly_days and (self._type == '' or self._type.upper() == 'HOURLY'):
-                    self._state_data_type = 'HOURLY'
-                    self._attr_native_value = response['data']['results'][-1]['kwhTotal']
-                    self._attr_last_reset = datetime.datetime.strptime(
-                        response['data']['results'][-1]['expireDate'], '%Y%m%d%H%M%S')
-
-                if self._get_hourly:
-                    for row in response['data']['results']:
-                        hourly.append({
-                            'start': datetime.datetime.strptime(row['startDate'], '%Y%m%d%H%M%S'),
-                            'kwh': row['kwhTotal'],
-                        })
-
-                self._hourly_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-        if self._get_hourly:
-            self._hourly = sorted(hourly, key=lambda x: x['start'], reverse=True)
-
-
-    @handle_errors
-    async def renewable_get_bimonthly(self):
-        dates = get_dates(self._timezone)
-
-        response = await self.api_request(
-            method="POST",
-            url="https://api.clp.com.hk/ts1/ms/renew/fit/dashboard",
-            headers={
-                "Authorization": self._access_token,
-            },
-            json={
-                "caNo": self._account_number,
-                "mode": "B",
-                "startDate": dates["today"].strftime("%m/%d/%Y"),
-            },
-        )
+    entity_description: CLPDatasetSensorDescription
 
-        if response['data']['consumptionData']:
-            if self._type == '' or self._type.upper() == 'BIMONTHLY':
-                self._state_data_type = 'BIMONTHLY'
-                self._attr_native_value = float(response['data']['consumptionData'][-1]['kwhtotal'])
-                self._attr_last_reset = datetime.datetime.strptime(response['data']['consumptionData'][-1]['enddate'], '%Y%m%d%H%M%S')
-
-            if self._get_bill:
-                bills = []
-                for row in response['data']['consumptionData']:
-                    bills.append({
-                        'start': datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S'),
-                        'end': datetime.datetime.strptime(row['enddate'], '%Y%m%d%H%M%S'),
-                        'kwh': float(row['kwhtotal']),
-                    })
-                self._bills = sorted(bills, key=lambda x: x['start'], reverse=True)
-
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-
-    @handle_errors
-    async def renewable_get_daily(self):
-        dates = get_dates(self._timezone)
-
-        response = await self.api_request(
-            method="POST",
-            url="https://api.clp.com.hk/ts1/ms/renew/fit/dashboard",
-            headers={
-                "Authorization": self._access_token,
-            },
-            json={
-                "caNo": self._account_number,
-                "mode": "D",
-                "startDate": dates["today"].strftime("%m/%d/%Y"),
-            },
-        )
+    def __init__(
+            self,
+            coordinator: CLPDataUpdateCoordinator,
+            sensor_type: str,
+            name: str,
+            description: CLPDatasetSensorDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._sensor_type = sensor_type
+        self._attr_name = f"{name} {description.name}"
+        self._attr_unique_id = f"clphk_{sensor_type}_{name.replace(' ', '_').lower()}_{description.key}{coordinator.instance_suffix}"
+        self._attr_native_value = None
+        self._attr_extra_state_attributes = None
+        self._update_from_coordinator()
+
+    def _update_from_coordinator(self) -> bool:
+        """Take the value from the latest results; return whether it changed."""
+        result = self.coordinator.data.get(self._sensor_type) if self.coordinator.data else None
+        value = self.entity_description.value_fn(result) if result else None
+        # Not fetched yet, or not in this response: the last value stays
+        if value is None:
+            return False
+        attributes = self.entity_description.attributes_fn(result)
+        if value == self._attr_native_value and attributes == self._attr_extra_state_attributes:
+            return False
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+
+        if self._attr_native_value is not None:
+            return
+
+        last_sensor_data = await self.async_get_last_sensor_data()
+        if last_sensor_data is not None:
+            self._attr_native_value = last_sensor_data.native_value
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self._update_from_coordinator():
+            self.async_write_ha_state()
 
-        if response['data']['consumptionData']:
-            if self._type == '' or self._type.upper() == 'DAILY':
-                for row in sorted(response['data']['consumptionData'], key=lambda x: x['startdate'], reverse=True):
-                    if row['validateStatus'] == 'Y':
-                        self._state_data_type = 'DAILY'
-                        self._attr_native_value = float(row['kwhtotal'])
-                        self._attr_last_reset = datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S')
-                        break
-
-            if self._get_daily:
-                daily = []
-
-                for row in response['data']['consumptionData']:
-                    start = None
-                    if row['startdate']:
-                        start = datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S')
-
-                    daily.append({
-                        'start': start,
-                        'kwh': float(row['kwhtotal']),
-                    })
-
-                self._daily = sorted(daily, key=lambda x: x['start'], reverse=True)
-
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
-
-
-    @handle_errors
-    async def renewable_get_hourly(self):
-        hourly = []
-        for i in range(1, self._get_hourly_days + 1):
-            start_date = datetime.datetime.now(self._timezone) + datetime.timedelta(days=-(self._get_hourly_days - i))
-
-            if datetime.time(0, 0) <= datetime.datetime.now(self._timezone).time() < datetime.time(4, 0):
-                start_date = start_date + datetime.timedelta(days=-1)
-
-            response = await self.api_request(
-                method="POST",
-                url="https://api.clp.com.hk/ts1/ms/renew/fit/dashboard",
-                headers={
-                    "Authorization": self._access_token,
-                },
-                json={
-                    "caNo": self._account_number,
-                    "mode": "H",
-                    "startDate": start_date.strftime("%m/%d/%Y"),
-                },
-            )
 
-            if response['data']['consumptionData']:
-                if i == 1 and (self._type == '' or self._type.upper() == 'HOURLY'):
-                    for row in sorted(response['data']['consumptionData'], key=lambda x: x['startdate'], reverse=True):
-                        if row['validateStatus'] == 'Y':
-                            self._state_data_type = 'HOURLY'
-                            self._attr_native_value = float(row['kwhtotal'])
-                            self._attr_last_reset = datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S')
-                            break
+class CLPBackfillSensor(SensorEntity):
+    """Progress of the hourly history backfill."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_should_poll = False
+
+    def __init__(
+            self,
+            coordinator: CLPDataUpdateCoordinator,
+            backfill: HourlyBackfill,
+            sensor_type: str,
+            name: str,
+    ) -> None:
+        self._backfill = backfill
+        self._attr_name = f"{name} Backfill"
+        self._attr_unique_id = f"clphk_{sensor_type}_{name.replace(' ', '_').lower()}_backfill{coordinator.instance_suffix}"
 
-                if self._get_hourly:
-                    for row in response['data']['consumptionData']:
-                        if row['validateStatus'] == 'N':
-                            continue
+    @property
+    def native_value(self) -> float:
+        return self._backfill.progress
 
-                        hourly.append({
-                            'start': datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S'),
-                            'kwh': float(row['kwhtotal']),
-                        })
+    @property
+    def extra_state_attributes(self) -> dict:
+        backfill = self._backfill
+        return {
+            "status": backfill.status,
+            "days_done": backfill.days_done,
+            "days": backfill.days,
+            "next_day": backfill.next_day.isoformat() if backfill.next_day else None,
+            "rows": backfill.rows,
+            "rows_per_minute": backfill.rows_per_minute,
+            "last_error": backfill.last_error,
+        }
 
-                self._hourly_task_last_fetch_time = datetime.datetime.now(self._timezone)
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._backfill.async_add_listener(self.async_write_ha_state))
 
-        if self._get_hourly:
-            self._hourly = sorted(hourly, key=lambda x: x['start'], reverse=True)
 
+class CLPRequestMetricsSensor(SensorEntity):
+    """p95 latency of one CLP endpoint or, without an endpoint, the duration of the last update."""
 
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    async def async_update(self) -> None:
-        _LOGGER.debug(f"[SENSOR UPDATE] Starting update for {self._sensor_type}, access_token_expiry_time={self._access_token_expiry_time}")
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_should_poll = False
 
-        if self._4xx_error_retry > HTTP_4xx_ERROR_RETRY_LIMIT:
-            _LOGGER.debug(f"[SENSOR UPDATE] 4xx error retry limit reached, skipping update.")
-            return
+    def __init__(
+            self,
+            coordinator: CLPDataUpdateCoordinator,
+            name: str,
+            endpoint: str | None = None,
+    ) -> None:
+        self._metrics = coordinator.metrics
+        self._endpoint = endpoint
+        prefix = f"clphk_{name.replace(' ', '_').lower()}"
+        if endpoint is None:
+            self._attr_name = f"{name} Update Time"
+            self._attr_unique_id = f"{prefix}_update_time{coordinator.instance_suffix}"
+        else:
+            slug = re.sub(r'[^a-z0-9]+', '_', endpoint.lower()).strip('_')
+            self._attr_name = f"{name} {endpoint} Latency"
+            self._attr_unique_id = f"{prefix}_request_{slug}{coordinator.instance_suffix}"
 
-        await self.auth()
+    @property
+    def native_value(self) -> int | float | None:
+        if self._endpoint is None:
+            elapsed = self._metrics.last_update_time
+            return round(elapsed * 1000) if elapsed is not None else None
+        return self._metrics.endpoint(self._endpoint).as_dict()["p95_ms"]
 
-        if not self._access_token:
-            _LOGGER.debug(f"[SENSOR UPDATE] No access token, skipping data fetch.")
-            return
+    @property
+    def extra_state_attributes(self) -> dict:
+        if self._endpoint is None:
+            return {"updates": self._metrics.updates}
+        return self._metrics.endpoint(self._endpoint).as_dict()
 
-        if self._sensor_type == 'main':
-            if not self._single_task_last_fetch_time:
-                if not self._account_number or self._get_acct:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching account detail.")
-                    await self.main_get_account_detail()
-
-            if not self._daily_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._daily_task_last_fetch_time + DAILY_TASK_INTERVAL:
-                if self._get_bill:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching bill.")
-                    await self.main_get_bill()
-
-                if self._get_estimation:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching estimation.")
-                    await self.main_get_estimation()
-
-                if self._get_bimonthly or self._type == '' or self._type.upper() == 'BIMONTHLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching bimonthly.")
-                    await self.main_get_bimonthly()
-
-                if self._get_daily or self._type == '' or self._type.upper() == 'DAILY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching daily.")
-                    await self.main_get_daily()
-
-            if not self._hourly_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._hourly_task_last_fetch_time + HOURLY_TASK_INTERVAL:
-                if self._get_hourly or self._type == '' or self._type.upper() == 'HOURLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching hourly.")
-                    await self.main_get_hourly()
-
-        elif self._sensor_type == 'renewable_energy':
-            if not self._single_task_last_fetch_time:
-                if not self._account_number:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable account detail.")
-                    await self.main_get_account_detail()
-
-            if not self._daily_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._daily_task_last_fetch_time + DAILY_TASK_INTERVAL:
-                if self._get_bill or self._type == '' or self._type.upper() == 'BIMONTHLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable bimonthly.")
-                    await self.renewable_get_bimonthly()
-
-                if self._get_daily or self._type == '' or self._type.upper() == 'DAILY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable daily.")
-                    await self.renewable_get_daily()
-
-            if not self._hourly_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._hourly_task_last_fetch_time + HOURLY_TASK_INTERVAL:
-                if self._get_hourly or self._type == '' or self._type.upper() == 'HOURLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable hourly.")
-                    await self.renewable_get_hourly()
-
-        if self._type == '' and self._state_data_type is not None:
-            self._type = self._state_data_type
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._metrics.async_add_listener(self.async_write_ha_state))
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Iterator
+
+from .timestamps import HK_TZ
+
+
+def to_epoch(value: datetime.datetime) -> int:
+    return int(value.timestamp())
+
+
+def from_epoch(value: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(value, HK_TZ)
+
+
+def from_optional_epoch(value: int | None) -> datetime.datetime | None:
+    return from_epoch(value) if value is not None else None
+
+
+class TimeSeries:
+    """kWh readings kept sorted by epoch-second timestamp in contiguous arrays.
+
+    Each point costs 24 bytes (32 with an end time) instead of a dict holding
+    datetime and float objects. Rows from CLP arrive in time order, so an insert
+    is normally an append and the series never needs re-sorting.
+
+    Running totals are kept next to the values, so the sum over any range is a
+    subtraction once its bounds are found. They are brought up to date lazily
+    from the oldest point changed since the last sum, which for appended rows is
+    just the new tail.
+    """
+
+    __slots__ = ('_timestamps', '_values', '_ends', '_sums', '_sums_base', '_sums_valid')
+
+    def __init__(self, with_end: bool = False) -> None:
+        self._timestamps = array('q')
+        self._values = array('d')
+        self._ends = array('q') if with_end else None
+        # _sums[i] is the total of every point up to and including i, plus the total of trimmed points
+        self._sums = array('d')
+        self._sums_base = 0.0
+        self._sums_valid = 0
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __bool__(self) -> bool:
+        return len(self._timestamps) > 0
+
+    def upsert(self, timestamp: int, value: float, end: int | None = None) -> bool:
+        """Insert or replace the point at `timestamp`; return whether the series changed."""
+        timestamps = self._timestamps
+        if not timestamps or timestamp > timestamps[-1]:
+            timestamps.append(timestamp)
+            self._values.append(value)
+            if self._ends is not None:
+                self._ends.append(end if end is not None else timestamp)
+            return True
+
+        i = bisect_left(timestamps, timestamp)
+        if timestamps[i] == timestamp:
+            if self._values[i] == value and (self._ends is None or end is None or self._ends[i] == end):
+                return False
+            if self._values[i] != value:
+                self._sums_valid = min(self._sums_valid, i)
+            self._values[i] = value
+            if self._ends is not None and end is not None:
+                self._ends[i] = end
+            return True
+
+        timestamps.insert(i, timestamp)
+        self._values.insert(i, value)
+        self._sums_valid = min(self._sums_valid, i)
+        if self._ends is not None:
+            self._ends.insert(i, end if end is not None else timestamp)
+        return True
+
+    def _bounds(self, start: int | None, end: int | None) -> tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self._timestamps, start)
+        hi = len(self._timestamps) if end is None else bisect_left(self._timestamps, end)
+        return lo, max(lo, hi)
+
+    def get(self, timestamp: int) -> float | None:
+        i = bisect_left(self._timestamps, timestamp)
+        if i < len(self._timestamps) and self._timestamps[i] == timestamp:
+            return self._values[i]
+        return None
+
+    def slice(self, start: int | None = None, end: int | None = None) -> TimeSeries:
+        """Points with start <= timestamp < end, as a new series."""
+        lo, hi = self._bounds(start, end)
+        result = TimeSeries(with_end=self._ends is not None)
+        result._timestamps = self._timestamps[lo:hi]
+        result._values = self._values[lo:hi]
+        if self._ends is not None:
+            result._ends = self._ends[lo:hi]
+        return result
+
+    def _prefix_sums(self) -> array:
+        sums = self._sums
+        valid = self._sums_valid
+        if valid < len(self._values):
+            del sums[valid:]
+            sums.extend(accumulate(self._values[valid:], initial=sums[-1] if sums else self._sums_base))
+            # accumulate() repeats the initial total first
+            del sums[valid]
+            self._sums_valid = len(self._values)
+        return sums
+
+    def sum(self, start: int | None = None, end: int | None = None) -> float:
+        """Total of points with start <= timestamp < end: two bisections and one subtraction."""
+        lo, hi = self._bounds(start, end)
+        if lo == hi:
+            return 0.0
+        sums = self._prefix_sums()
+        return sums[hi - 1] - (sums[lo - 1] if lo else self._sums_base)
+
+    def count(self, start: int | None = None, end: int | None = None) -> int:
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+
+    def trim_before(self, timestamp: int) -> None:
+        lo, _ = self._bounds(timestamp, None)
+        if lo:
+            # Trimmed points stay in the running totals through the base
+            sums = self._prefix_sums()
+            self._sums_base = sums[lo - 1]
+            del sums[:lo]
+            self._sums_valid -= lo
+            del self._timestamps[:lo]
+            del self._values[:lo]
+            if self._ends is not None:
+                del self._ends[:lo]
+
+    def first_timestamp(self) -> int | None:
+        return self._timestamps[0] if self._timestamps else None
+
+    def last_timestamp(self) -> int | None:
+        return self._timestamps[-1] if self._timestamps else None
+
+    def items(self) -> Iterator[tuple[int, float]]:
+        return zip(self._timestamps, self._values)
+
+    def to_records(self, key: str = 'start', start: int | None = None, newest_first: bool = True) -> list[dict]:
+        """Materialize points as attribute dicts, e.g. `{'start': datetime, 'kwh': 1.2}`."""
+        lo, hi = self._bounds(start, None)
+        indices = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+        records = []
+        for i in indices:
+            record = {key: from_epoch(self._timestamps[i])}
+            if self._ends is not None:
+                record['end'] = from_epoch(self._ends[i])
+            record['kwh'] = self._values[i]
+            records.append(record)
+        return records
+
+
+def hourly_from(daily: TimeSeries, since: int) -> int:
+    """Where hourly readings take over from daily ones: the end of the newest daily reading."""
+    newest = daily.last_timestamp()
+    return max(since, newest + 86400) if newest is not None else since
+
+
+def window_sum(daily: TimeSeries, hourly: TimeSeries, start: int, end: int | None = None) -> float:
+    """kWh from `start` on, from daily readings and hourly ones for the days not in daily yet."""
+    cut = hourly_from(daily, start)
+    if end is not None and cut > end:
+        cut = end
+    return daily.sum(start, cut) + hourly.sum(cut, end)
+
+
+def window_covered(daily: TimeSeries, hourly: TimeSeries, start: int) -> bool:
+    """Whether the readings reach back to `start`, so window_sum is the whole window and not just its end.
+
+    Readings only live in memory, so after a restart they may start well after
+    the beginning of a week or month.
+    """
+    cut = hourly_from(daily, start)
+    if cut > start and daily.first_timestamp() > start:
+        return False
+    # Hourly readings must pick up where daily ones stop, or the days in between are missing
+    return not hourly.count(cut) or hourly.first_timestamp() <= cut
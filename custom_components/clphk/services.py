@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+
+from .const import CONF_DOMAIN
+from .coordinator import SENSOR_TYPE_MAIN, SENSOR_TYPE_RENEWABLE
+from .timestamps import HK_TZ
+
+SERVICE_SUM_CONSUMPTION = 'sum_consumption'
+
+ATTR_START = 'start'
+ATTR_END = 'end'
+ATTR_RESOLUTION = 'resolution'
+ATTR_RENEWABLE = 'renewable'
+ATTR_ACCOUNT = 'account'
+ATTR_ENTRY_ID = 'entry_id'
+
+SUM_CONSUMPTION_SCHEMA = vol.Schema({
+    vol.Required(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_RESOLUTION, default='hourly'): vol.In(('hourly', 'daily')),
+    vol.Optional(ATTR_RENEWABLE, default=False): cv.boolean,
+    vol.Optional(ATTR_ACCOUNT): cv.string,
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+})
+
+
+def _local(value):
+    # Times without a zone are Hong Kong time, like CLP's own
+    return value.replace(tzinfo=HK_TZ) if value is not None and value.tzinfo is None else value
+
+
+def _coordinator(hass: HomeAssistant, entry_id: str | None):
+    clients = hass.data.get(CONF_DOMAIN, {})
+    if entry_id is not None:
+        coordinator = clients.get(entry_id, {}).get("coordinator")
+        if coordinator is None:
+            raise ServiceValidationError(f"No CLP login with entry_id {entry_id}")
+        return coordinator
+    for client_state in clients.values():
+        if isinstance(client_state, dict) and client_state.get("coordinator") is not None:
+            return client_state["coordinator"]
+    raise ServiceValidationError("No CLP login is set up")
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    async def sum_consumption(call: ServiceCall) -> ServiceResponse:
+        """Total kWh between two times, from the readings already fetched."""
+        coordinator = _coordinator(hass, call.data.get(ATTR_ENTRY_ID))
+
+        if call.data[ATTR_RENEWABLE]:
+            if SENSOR_TYPE_RENEWABLE not in coordinator.series:
+                raise ServiceValidationError("The renewable energy sensor is not enabled")
+            sensor_type = SENSOR_TYPE_RENEWABLE
+        elif ATTR_ACCOUNT in call.data:
+            sensor_type = next(
+                (
+                    sensor_type for sensor_type in coordinator.account_sensor_types()
+                    if coordinator.account_number(sensor_type) == call.data[ATTR_ACCOUNT]
+                ),
+                None,
+            )
+            if sensor_type is None:
+                raise ServiceValidationError(f"No contract account {call.data[ATTR_ACCOUNT]}")
+        else:
+            sensor_type = SENSOR_TYPE_MAIN
+
+        result = coordinator.consumption_sum(
+            sensor_type,
+            call.data[ATTR_RESOLUTION],
+            _local(call.data[ATTR_START]),
+            _local(call.data.get(ATTR_END)),
+        )
+        return {
+            **result,
+            'first': result['first'].isoformat() if result['first'] else None,
+            'last': result['last'].isoformat() if result['last'] else None,
+        }
+
+    hass.services.async_register(
+        CONF_DOMAIN,
+        SERVICE_SUM_CONSUMPTION,
+        sum_consumption,
+        schema=SUM_CONSUMPTION_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterable
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_DOMAIN
+from .series import TimeSeries, from_epoch
+
+_LOGGER = logging.getLogger(__name__)
+
+# How far back to look for the sum an import is rebased on
+SUM_LOOKBACK = 31 * 86400
+
+
+def _epoch(start) -> int:
+    # Older recorder versions return a datetime instead of a timestamp
+    return int(start if isinstance(start, (int, float)) else start.timestamp())
+
+
+class HourlyStatisticsImporter:
+    """Pushes hourly kWh into long-term statistics.
+
+    The last `revision` seconds are imported again on every call, because CLP
+    still corrects them; sums are rebased on the statistic just before them.
+    """
+
+    def __init__(self, hass: HomeAssistant, object_id: str, name: str, revision: int = 0) -> None:
+        self._hass = hass
+        self.statistic_id = f"{CONF_DOMAIN}:{object_id}"
+        self._metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=name,
+            source=CONF_DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        self._revision = revision
+        # The backfill and the regular update both write; sums must be computed one at a time
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self.last_start = None
+        self._last_sum = 0.0
+        # kWh last imported for the hours still inside the revision window
+        self._recent = {}
+
+    async def _async_load_last(self) -> None:
+        last_stat = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics, self._hass, 1, self.statistic_id, True, {"sum"}
+        )
+        if last_stat and last_stat.get(self.statistic_id):
+            row = last_stat[self.statistic_id][0]
+            self.last_start = _epoch(row["start"])
+            self._last_sum = row.get("sum") or 0.0
+        self._loaded = True
+
+    async def _async_period(self, start: int, end: int | None, types: set[str]) -> list[dict]:
+        stats = await get_instance(self._hass).async_add_executor_job(
+            statistics_during_period,
+            self._hass,
+            from_epoch(start),
+            from_epoch(end) if end is not None else None,
+            {self.statistic_id},
+            "hour",
+            None,
+            types,
+        )
+        return stats.get(self.statistic_id, [])
+
+    async def _async_sum_before(self, start: int) -> float:
+        rows = await self._async_period(start - SUM_LOOKBACK, start, {"sum"})
+        return (rows[-1].get("sum") or 0.0) if rows else 0.0
+
+    def _write(self, hours: list[tuple[int, float]], total: float) -> float:
+        statistics = []
+        for start, kwh in hours:
+            total += kwh
+            statistics.append(StatisticData(start=from_epoch(start), state=kwh, sum=total))
+        async_add_external_statistics(self._hass, self._metadata, statistics)
+
+        last_start, _ = hours[-1]
+        if self.last_start is None or last_start >= self.last_start:
+            self.last_start = last_start
+            self._last_sum = total
+        return total
+
+    async def async_import(self, hourly: TimeSeries, until: int | None = None) -> int:
+        """Import hours before `until`, re-importing revised ones; return how many were written."""
+        async with self._lock:
+            if not self._loaded:
+                await self._async_load_last()
+
+            since = self.last_start - self._revision if self.last_start is not None else None
+            hours = list(hourly.slice(start=since, end=until).items())
+            # Only what follows the last import can be rewritten without shifting later sums
+            if not hours or (self.last_start is not None and hours[-1][0] < self.last_start):
+                return 0
+
+            self._recent = {start: kwh for start, kwh in self._recent.items() if since is None or start >= since}
+            if all(self._recent.get(start) == kwh for start, kwh in hours):
+                return 0
+
+            first_start = hours[0][0]
+            if self.last_start is None or first_start > self.last_start:
+                total = self._last_sum
+            else:
+                total = await self._async_sum_before(first_start)
+
+            self._write(hours, total)
+            self._recent.update(hours)
+        _LOGGER.debug("[STATISTICS] Imported %s hours into %s", len(hours), self.statistic_id)
+        return len(hours)
+
+    async def async_import_history(self, months: AsyncIterable[dict[int, float]]) -> int:
+        """Merge in hours older than the last import, oldest month first, carrying the sum along.
+
+        Hours imported before, after the last month, are rebased once at the end,
+        so each row is written once however many months are merged.
+        """
+        count = 0
+        async with self._lock:
+            if not self._loaded:
+                await self._async_load_last()
+
+            total = None
+            end = None
+            async for hours in months:
+                if not hours:
+                    continue
+                first = min(hours)
+                if total is None:
+                    total = await self._async_sum_before(first)
+                merged = dict(hours)
+                # Hours already imported are the newer readings of the same hour, so they win;
+                # reading from the end of the previous month also keeps rows between months in order
+                for row in await self._async_period(first if end is None else end, max(hours) + 3600, {"state"}):
+                    merged[_epoch(row["start"])] = row.get("state") or 0.0
+                hours = sorted(merged.items())
+                total = self._write(hours, total)
+                end = hours[-1][0] + 3600
+                count += len(hours)
+
+            if end is None:
+                return 0
+            newer = [
+                (_epoch(row["start"]), row.get("state") or 0.0)
+                for row in await self._async_period(end, None, {"state"})
+            ]
+            if newer:
+                self._write(newer, total)
+                count += len(newer)
+        _LOGGER.debug("[STATISTICS] Merged %s hours into %s", count, self.statistic_id)
+        return count
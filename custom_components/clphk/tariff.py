@@ -0,0 +1,120 @@
+"""Residential tariff model for pricing consumption locally. Independent of Home Assistant.
+
+The energy charge is tiered on the kWh used in a billing period, so the price of
+a reading depends on everything consumed before it in the same period. The fuel
+cost adjustment is a flat rate on every kWh.
+"""
+from __future__ import annotations
+
+import json
+import pathlib
+from typing import Iterable, Iterator
+
+# Shipped with the integration; a copy can be edited and set as `tariff_file`
+DEFAULT_TARIFF_FILE = pathlib.Path(__file__).with_name("tariff.json")
+
+
+class TariffError(ValueError):
+    """A tariff file is missing a field or has tiers out of order."""
+
+
+class Tariff:
+    """Tiered energy charge plus fuel cost adjustment, in HKD per kWh.
+
+    Tier bounds are kWh per `period_days` billing period. A shorter or longer
+    period scales every bound, as CLP does on bills.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            tiers: list[tuple[float | None, float]],
+            fuel_cost_adjustment: float,
+            period_days: int = 60,
+    ) -> None:
+        self.name = name
+        self.tiers = tiers
+        self.fuel_cost_adjustment = fuel_cost_adjustment
+        self.period_days = period_days
+
+    def energy_charge(self, kwh: float, days: int | None = None) -> float:
+        scale = days / self.period_days if days else 1.0
+        charge = 0.0
+        lower = 0.0
+        for upper, rate in self.tiers:
+            if upper is None or kwh <= upper * scale:
+                return charge + (kwh - lower) * rate
+            charge += (upper * scale - lower) * rate
+            lower = upper * scale
+        return charge
+
+    def cost(self, kwh: float, days: int | None = None) -> float:
+        """Cost of `kwh` used over a whole billing period of `days`."""
+        if kwh <= 0:
+            return 0.0
+        return self.energy_charge(kwh, days) + kwh * self.fuel_cost_adjustment
+
+    def marginal_costs(
+            self,
+            readings: Iterable[tuple[int, float]],
+            consumed: float = 0.0,
+            days: int | None = None,
+    ) -> Iterator[tuple[int, float, float]]:
+        """(timestamp, kWh, cost) of each reading, priced on top of what the period used before it.
+
+        Readings must be in time order; each one costs O(tiers), so a period is priced in one pass.
+        """
+        before = self.cost(consumed, days)
+        for timestamp, kwh in readings:
+            consumed += kwh
+            after = self.cost(consumed, days)
+            yield timestamp, kwh, after - before
+            before = after
+
+
+def _tiers(data: list) -> list[tuple[float | None, float]]:
+    if not data:
+        raise TariffError("tariff has no tiers")
+    tiers = []
+    lower = 0.0
+    for i, tier in enumerate(data):
+        upper = tier.get('up_to')
+        rate = float(tier['rate'])
+        if rate < 0:
+            raise TariffError(f"tier {i}: negative rate {rate}")
+        if upper is None:
+            if i != len(data) - 1:
+                raise TariffError(f"tier {i}: only the last tier may be unbounded")
+        else:
+            upper = float(upper)
+            if upper <= lower:
+                raise TariffError(f"tier {i}: up_to {upper} is not above the previous tier")
+            lower = upper
+        tiers.append((upper, rate))
+    if tiers[-1][0] is not None:
+        raise TariffError("the last tier must have no up_to")
+    return tiers
+
+
+def parse_tariff(data: dict) -> Tariff:
+    try:
+        return Tariff(
+            name=str(data.get('name', 'CLP residential')),
+            tiers=_tiers(data['tiers']),
+            fuel_cost_adjustment=float(data['fuel_cost_adjustment']),
+            period_days=int(data.get('period_days', 60)),
+        )
+    except TariffError:
+        raise
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise TariffError(f"invalid tariff: {e!r}") from e
+
+
+def load_tariff(path: str | pathlib.Path | None = None) -> Tariff:
+    """Read a tariff file; blocking, so call it from an executor."""
+    path = pathlib.Path(path) if path else DEFAULT_TARIFF_FILE
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise TariffError(f"cannot read tariff file {path}: {e}") from e
+    return parse_tariff(data)
@@ -0,0 +1,46 @@
+"""Fast parsers for the fixed-width CLP timestamps (`YYYYMMDDHHMMSS` and `YYYYMMDD`)."""
+from __future__ import annotations
+
+import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+HK_TZ = ZoneInfo('Asia/Hong_Kong')
+# Hong Kong has not observed daylight saving time since 1979, so local time is always UTC+8
+HK_UTC_OFFSET = 8 * 3600
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+# History responses repeat the same day for every hourly row, so the date part is memoized
+@lru_cache(maxsize=4096)
+def _parse_date_prefix(value: str) -> tuple[int, int, int]:
+    if len(value) != 8 or not value.isdigit():
+        raise ValueError(f"Invalid CLP date: {value!r}")
+    return int(value[0:4]), int(value[4:6]), int(value[6:8])
+
+
+@lru_cache(maxsize=4096)
+def _midnight_epoch(value: str) -> int:
+    year, month, day = _parse_date_prefix(value)
+    return (datetime.date(year, month, day).toordinal() - EPOCH_ORDINAL) * 86400 - HK_UTC_OFFSET
+
+
+# Rows fall on the hour, so only a handful of distinct times of day ever come up
+@lru_cache(maxsize=4096)
+def _seconds_of_day(value: str) -> int:
+    if not value.isdigit():
+        raise ValueError(f"Invalid CLP time: {value!r}")
+    return int(value[0:2]) * 3600 + int(value[2:4]) * 60 + int(value[4:6])
+
+
+def parse_epoch(value: str) -> int:
+    """Parse `YYYYMMDDHHMMSS` Hong Kong time straight into epoch seconds, without a datetime."""
+    if len(value) != 14:
+        raise ValueError(f"Invalid CLP timestamp: {value!r}")
+    return _midnight_epoch(value[:8]) + _seconds_of_day(value[8:])
+
+
+def parse_date_epoch(value: str) -> int:
+    """Parse `YYYYMMDD` into the epoch seconds of midnight Hong Kong time."""
+    return _midnight_epoch(value)
+
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import datetime
+import logging
+import random
+from typing import Awaitable, Callable
+
+from dateutil.parser import isoparse
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Never fire sooner than this, so an already-expired token does not spin the timer
+MIN_REFRESH_DELAY = datetime.timedelta(seconds=5)
+
+
+def parse_expiry(expiry_raw) -> datetime.datetime | None:
+    if not expiry_raw:
+        return None
+    try:
+        expiry = isoparse(expiry_raw)
+    except Exception as e:
+        _LOGGER.error("Failed to parse access_token_expiry_time: %s, error: %s", expiry_raw, e)
+        return None
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+    return expiry
+
+
+class TokenRefreshScheduler:
+    """Arms a timer to refresh the access token shortly before it expires."""
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            refresh: Callable[[], Awaitable[None]],
+            lead: datetime.timedelta,
+            jitter: datetime.timedelta,
+    ) -> None:
+        self._hass = hass
+        self._refresh = refresh
+        self._lead = lead
+        self._jitter = jitter
+        self._expiry_raw = None
+        self.expiry = None
+        self.next_refresh = None
+        self._unsub = None
+
+    def arm(self, expiry_raw) -> None:
+        """Schedule the next refresh from the token's expiry, parsing it only when it changes."""
+        if expiry_raw != self._expiry_raw:
+            self._expiry_raw = expiry_raw
+            self.expiry = parse_expiry(expiry_raw)
+
+        self.cancel()
+        if self.expiry is None:
+            return
+
+        now_utc = datetime.datetime.now(datetime.timezone.utc)
+        jitter = datetime.timedelta(seconds=random.uniform(0, self._jitter.total_seconds()))
+        self.next_refresh = max(self.expiry - self._lead - jitter, now_utc + MIN_REFRESH_DELAY)
+        _LOGGER.debug("[TOKEN] expiry=%s, refresh scheduled at %s", self.expiry, self.next_refresh)
+        self._unsub = async_track_point_in_utc_time(self._hass, self._async_fire, self.next_refresh)
+
+    def cancel(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self.next_refresh = None
+
+    def expires_within(self, margin: datetime.timedelta) -> bool:
+        if self.expiry is None:
+            return False
+        return datetime.datetime.now(datetime.timezone.utc) > self.expiry - margin
+
+    @callback
+    def _async_fire(self, _now) -> None:
+        self._unsub = None
+        self.next_refresh = None
+        self._hass.async_create_task(self._refresh())
@@ -0,0 +1,112 @@
+"""Per-phase timings of CLP requests, from aiohttp's tracing hooks. Independent of Home Assistant."""
+from __future__ import annotations
+
+import time
+from collections import deque
+
+import aiohttp
+
+# Most recent requests kept in memory
+TRACE_BUFFER_SIZE = 100
+
+PHASES = ('queued_ms', 'dns_ms', 'connect_ms', 'server_ms', 'body_ms', 'total_ms')
+
+
+def _ms(start: float | None, end: float | None) -> int | None:
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000)
+
+
+class RequestTracer:
+    """Keeps a bounded buffer of per-request timings.
+
+    `connect_ms` covers the TCP connect and the TLS handshake, which aiohttp does
+    not report apart. `server_ms` is from sending the request to receiving the
+    response headers; `body_ms` is reading the body after that.
+    """
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE) -> None:
+        self.traces = deque(maxlen=size)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(self._on_request_start)
+        config.on_connection_queued_start.append(self._mark('queued_start'))
+        config.on_connection_queued_end.append(self._mark('queued_end'))
+        config.on_connection_create_start.append(self._mark('create_start'))
+        config.on_connection_create_end.append(self._mark('create_end'))
+        config.on_connection_reuseconn.append(self._mark('reused'))
+        config.on_dns_resolvehost_start.append(self._mark('dns_start'))
+        config.on_dns_resolvehost_end.append(self._mark('dns_end'))
+        config.on_dns_cache_hit.append(self._mark('dns_cache_hit'))
+        config.on_request_headers_sent.append(self._mark('headers_sent'))
+        config.on_request_end.append(self._on_request_end)
+        config.on_request_exception.append(self._on_request_exception)
+        config.on_response_chunk_received.append(self._on_response_chunk_received)
+        return config
+
+    @staticmethod
+    def _mark(name: str):
+        async def handler(session, context, params) -> None:
+            context.marks[name] = time.monotonic()
+        return handler
+
+    async def _on_request_start(self, session, context, params) -> None:
+        context.marks = {'start': time.monotonic()}
+        context.record = None
+        request_context = context.trace_request_ctx or {}
+        context.endpoint = request_context.get('endpoint') or params.url.path
+
+    def _add_record(self, context, end: float, status: int | None = None, error: str | None = None) -> dict:
+        marks = context.marks
+        dns = _ms(marks.get('dns_start'), marks.get('dns_end'))
+        create = _ms(marks.get('create_start'), marks.get('create_end'))
+        record = {
+            'endpoint': context.endpoint,
+            'time': time.time(),
+            'status': status,
+            'reused': 'reused' in marks,
+            'dns_cache_hit': 'dns_cache_hit' in marks,
+            'queued_ms': _ms(marks.get('queued_start'), marks.get('queued_end')),
+            'dns_ms': dns,
+            # DNS is resolved inside connection creation, so it is taken out here
+            'connect_ms': create - (dns or 0) if create is not None else None,
+            'server_ms': _ms(marks.get('headers_sent'), end),
+            'body_ms': None,
+            'total_ms': _ms(marks['start'], end),
+            'error': error,
+        }
+        self.traces.append(record)
+        context.record = record
+        return record
+
+    async def _on_request_end(self, session, context, params) -> None:
+        context.marks['end'] = time.monotonic()
+        self._add_record(context, context.marks['end'], status=params.response.status)
+
+    async def _on_request_exception(self, session, context, params) -> None:
+        self._add_record(context, time.monotonic(), error=repr(params.exception))
+
+    async def _on_response_chunk_received(self, session, context, params) -> None:
+        # The record is already in the buffer; the body phase grows with every chunk
+        record = getattr(context, 'record', None)
+        if record is None:
+            return
+        now = time.monotonic()
+        record['body_ms'] = _ms(context.marks['end'], now)
+        record['total_ms'] = _ms(context.marks['start'], now)
+
+    def summary(self) -> dict:
+        """Connection reuse and average phase timings over the buffered requests."""
+        traces = list(self.traces)
+        averages = {}
+        for phase in PHASES:
+            values = [trace[phase] for trace in traces if trace[phase] is not None]
+            averages[phase] = round(sum(values) / len(values)) if values else None
+        return {
+            'requests': len(traces),
+            'reused': sum(1 for trace in traces if trace['reused']),
+            'errors': sum(1 for trace in traces if trace['error'] is not None),
+            'average': averages,
+        }
@@ -0,0 +1,5 @@
+"""Tests import the clphk modules that do not depend on Home Assistant, like the benchmarks do."""
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "benchmarks"))
@@ -0,0 +1,69 @@
+import json
+
+from _loader import load
+
+capture = load("capture")
+
+ACCOUNT = "0123456789"
+BODY = json.dumps({
+    "data": {
+        "transactions": [
+            {"ca": ACCOUNT, "type": "bill", "total": "812.40", "tranDate": "20250601000000"},
+        ],
+        "accounts": [
+            {"caNo": ACCOUNT, "status": "Active", "email": "someone@example.com"},
+        ],
+        "note": "Sent to someone@example.com",
+        "accessToken": "secret-token",
+    },
+}).encode()
+
+
+def captured_body(body: bytes = BODY) -> str:
+    responses = capture.ResponseCapture()
+    responses.add("historyBilling", 200, body)
+    (record,) = responses.as_dict()["historyBilling"]
+    return record["body"]
+
+
+def test_account_numbers_are_redacted():
+    body = captured_body()
+    assert ACCOUNT not in body
+    data = json.loads(body)["data"]
+    assert data["transactions"][0]["ca"] == capture.REDACTED
+    assert data["accounts"][0]["caNo"] == capture.REDACTED
+
+
+def test_tokens_and_emails_are_redacted():
+    body = captured_body()
+    assert "secret-token" not in body
+    assert "someone@example.com" not in body
+
+
+def test_other_fields_are_kept():
+    data = json.loads(captured_body())["data"]
+    assert data["transactions"][0]["total"] == "812.40"
+    assert data["accounts"][0]["status"] == "Active"
+
+
+def test_non_json_body_keeps_text():
+    assert captured_body(b"Bad gateway, mail admin@example.com") == f"Bad gateway, mail {capture.REDACTED}"
+
+
+def test_error_excerpts_are_redacted():
+    api = load("api")
+    excerpt = api._excerpt(BODY)
+    assert ACCOUNT not in excerpt
+    assert "secret-token" not in excerpt
+    assert len(api._excerpt(b"x" * 2000)) == api.ERROR_BODY_CHARS
+
+
+def test_decode_errors_do_not_show_account_numbers():
+    models = load("models")
+    payload = {"data": [{"caNo": ACCOUNT, "status": "Active", "outstandingAmount": "not a number", "dueDate": ""}]}
+    try:
+        models.decode_accounts(payload)
+    except models.CLPDecodeError as e:
+        assert ACCOUNT not in str(e)
+    else:
+        raise AssertionError("expected a CLPDecodeError")
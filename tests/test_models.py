@@ -0,0 +1,66 @@
+import pytest
+
+from _loader import load
+
+models = load("models")
+timestamps = load("timestamps")
+
+
+def history(rows):
+    return {"data": {"results": rows}}
+
+
+def test_readings_keep_placeholder_rows():
+    payload = history([
+        {"startDate": "20250701000000", "expireDate": "20250701010000", "kwhTotal": "1.25"},
+        {"startDate": "", "expireDate": None, "kwhTotal": ""},
+    ])
+    reading, placeholder = models.decode_readings(payload, "Hourly")
+    assert reading.start == timestamps.parse_epoch("20250701000000")
+    assert reading.end == reading.start + 3600
+    assert reading.kwh == 1.25
+    assert (placeholder.start, placeholder.end, placeholder.kwh) == (None, None, None)
+    assert [row.kwh for row in models.iter_readings(payload, "Hourly")] == [1.25, None]
+
+
+def test_empty_history_decodes_to_nothing():
+    for payload in ({"data": None}, {"data": {"results": []}}):
+        assert models.decode_readings(payload, "Daily") == []
+        assert list(models.iter_readings(payload, "Daily")) == []
+
+
+def test_transactions_keep_bills_and_payments_only():
+    payload = {"data": {"transactions": [
+        {"ca": "1", "type": "bill", "total": "812.40", "tranDate": "20250601000000",
+         "fromDate": "20250401000000", "toDate": "20250531000000"},
+        {"caNo": "1", "type": "payment", "total": "812.40", "tranDate": "20250615000000"},
+        {"type": "adjustment"},
+    ]}}
+    bill, payment = models.decode_transactions(payload)
+    assert (bill.type, bill.account, bill.total) == ("bill", "1", 812.40)
+    assert bill.from_date == timestamps.parse_epoch("20250401000000")
+    assert (payment.type, payment.from_date, payment.to_date) == ("payment", None, None)
+
+
+def test_renewable_readings_are_valid_once_validated():
+    payload = {"data": {"consumptionData": [
+        {"startdate": "20250701000000", "enddate": "20250701010000", "kwhtotal": "0.5", "validateStatus": "Y"},
+        {"startdate": "20250701010000", "enddate": "20250701020000", "kwhtotal": "0.7", "validateStatus": "N"},
+    ]}}
+    validated, pending = models.decode_renewable(payload, "H")
+    assert validated.valid and validated.kwh == 0.5
+    assert not pending.valid
+
+
+def test_malformed_payloads_raise_decode_errors():
+    with pytest.raises(models.CLPDecodeError, match="has no data.results"):
+        models.decode_readings({"data": {"other": []}}, "Daily")
+    with pytest.raises(models.CLPDecodeError, match="expected a list of rows"):
+        models.decode_readings(history({"startDate": "x"}), "Daily")
+    with pytest.raises(models.CLPDecodeError, match="row 1"):
+        models.decode_readings(history([
+            {"startDate": "20250701000000", "expireDate": "20250702000000", "kwhTotal": "1"},
+            {"startDate": "20250702000000", "expireDate": "20250703000000", "kwhTotal": "n/a"},
+        ]), "Daily")
+    with pytest.raises(models.CLPDecodeError, match="row 0"):
+        list(models.iter_readings(history([{"startDate": "bad"}]), "Daily"))
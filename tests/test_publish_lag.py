@@ -0,0 +1,86 @@
+import datetime
+import types
+
+import pytest
+
+from _loader import load
+
+publish_lag = load("publish_lag")
+
+HOUR = datetime.timedelta(hours=1)
+DAY = datetime.timedelta(days=1)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1_750_000_000.0)
+    monkeypatch.setattr(publish_lag, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def estimator() -> publish_lag.PublishLagEstimator:
+    estimator = publish_lag.PublishLagEstimator()
+    estimator.register("main.hourly", period=HOUR, fallback=datetime.timedelta(minutes=30), default_lag=HOUR)
+    estimator.register("main.daily", period=DAY, fallback=datetime.timedelta(hours=12), default_lag=DAY)
+    return estimator
+
+
+def test_never_polled_key_does_not_block_next_poll(clock):
+    schedules = estimator()
+    schedules.set_active("main.daily", False)
+    schedules.record("main.hourly", None)
+    assert schedules.next_poll() == clock.now + 30 * 60
+
+
+def test_active_key_without_poll_keeps_regular_interval(clock):
+    schedules = estimator()
+    schedules.record("main.hourly", None)
+    assert schedules.next_poll() is None
+
+
+def test_stale_key_is_ignored_once_inactive(clock):
+    schedules = estimator()
+    schedules.record("main.daily", None)
+    clock.now += 10 * 60
+    schedules.record("main.hourly", None)
+    # The daily series stops being fetched, so its poll time goes stale
+    clock.now += 13 * 3600
+    schedules.set_active("main.daily", False)
+    schedules.record("main.hourly", None)
+    assert schedules.next_poll() == clock.now + 30 * 60
+
+
+def test_lag_is_learned_from_when_rows_show_up(clock):
+    schedules = estimator()
+    hour_end = int(clock.now) // 3600 * 3600
+    assert not schedules.record("main.hourly", hour_end)
+
+    # The next hour's row shows up 20 minutes after the hour ends
+    clock.now = hour_end + 3600 + 20 * 60
+    assert schedules.record("main.hourly", hour_end + 3600)
+    stats = schedules.stats()["main.hourly"]
+    assert stats["lag"] == pytest.approx(20 * 60)
+    assert stats["next_poll"] == hour_end + 2 * 3600 + 20 * 60 + publish_lag.MIN_MARGIN
+
+
+def test_overdue_row_backs_off(clock):
+    schedules = estimator()
+    hour_end = int(clock.now) // 3600 * 3600
+    schedules.record("main.hourly", hour_end)
+    clock.now = hour_end + 3600 + 600
+    schedules.record("main.hourly", hour_end + 3600)
+
+    clock.now = hour_end + 3 * 3600
+    schedules.record("main.hourly", hour_end + 3600)
+    first = schedules.stats()["main.hourly"]["next_poll"] - clock.now
+    schedules.record("main.hourly", hour_end + 3600)
+    second = schedules.stats()["main.hourly"]["next_poll"] - clock.now
+    assert first == publish_lag.MIN_RETRY_INTERVAL
+    assert second == min(2 * publish_lag.MIN_RETRY_INTERVAL, 30 * 60)
+
+
+def test_saved_lags_are_restored_and_kept():
+    schedules = estimator()
+    schedules.restore({"main.hourly": {"lag": 900.0, "deviation": 60.0}, "other.hourly": {"lag": 1.0, "deviation": 0.0}})
+    assert schedules.stats()["main.hourly"]["lag"] == 900.0
+    assert set(schedules.lags()) == {"main.hourly", "other.hourly"}
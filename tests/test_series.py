@@ -0,0 +1,103 @@
+import datetime
+
+from _loader import load
+
+series = load("series")
+timestamps = load("timestamps")
+
+HOUR = 3600
+DAY = 86400
+# Midnight Hong Kong time on Monday 2025-06-30, the week that runs into July
+WEEK_START = int(datetime.datetime(2025, 6, 30, tzinfo=timestamps.HK_TZ).timestamp())
+MONTH_START = int(datetime.datetime(2025, 7, 1, tzinfo=timestamps.HK_TZ).timestamp())
+
+
+def readings(start: int, count: int, step: int, kwh: float = 1.0) -> series.TimeSeries:
+    result = series.TimeSeries()
+    for i in range(count):
+        result.upsert(start + i * step, kwh)
+    return result
+
+
+def test_month_to_date_from_hourly_only_after_restart_is_not_covered():
+    # Only yesterday and today were fetched, on the 10th of the month
+    hourly = readings(MONTH_START + 8 * DAY, 48, HOUR)
+    assert not series.window_covered(series.TimeSeries(), hourly, MONTH_START)
+
+
+def test_week_across_month_boundary_with_daily_from_this_month_is_not_covered():
+    daily = readings(MONTH_START, 3, DAY, kwh=10.0)
+    hourly = readings(MONTH_START + 3 * DAY, 12, HOUR)
+    assert not series.window_covered(daily, hourly, WEEK_START)
+    # The month itself is fully there
+    assert series.window_covered(daily, hourly, MONTH_START)
+    assert series.window_sum(daily, hourly, MONTH_START) == 42.0
+
+
+def test_gap_between_daily_and_hourly_is_not_covered():
+    daily = readings(MONTH_START, 3, DAY, kwh=10.0)
+    # The 4th is in neither series
+    hourly = readings(MONTH_START + 4 * DAY, 12, HOUR)
+    assert not series.window_covered(daily, hourly, MONTH_START)
+
+
+def test_covered_window_sums_daily_then_hourly():
+    daily = readings(WEEK_START - DAY, 5, DAY, kwh=10.0)
+    hourly = readings(WEEK_START + 3 * DAY, 54, HOUR)
+    assert series.window_covered(daily, hourly, WEEK_START)
+    # Four days of daily readings, then the hourly ones after the newest daily day
+    assert series.window_sum(daily, hourly, WEEK_START) == 40.0 + 30.0
+
+
+def test_upsert_keeps_order_and_reports_changes():
+    values = series.TimeSeries()
+    assert values.upsert(2 * HOUR, 2.0)
+    assert values.upsert(0, 0.5)
+    assert values.upsert(HOUR, 1.0)
+    assert not values.upsert(HOUR, 1.0)
+    assert values.upsert(HOUR, 1.5)
+    assert list(values.items()) == [(0, 0.5), (HOUR, 1.5), (2 * HOUR, 2.0)]
+    assert values.get(HOUR) == 1.5
+    assert values.get(3 * HOUR) is None
+
+
+def test_sums_follow_inserts_and_replacements():
+    values = readings(0, 10, HOUR)
+    assert values.sum() == 10.0
+    assert values.sum(2 * HOUR, 5 * HOUR) == 3.0
+    assert values.sum(20 * HOUR) == 0.0
+    # A change in the middle invalidates the running totals from that point on
+    values.upsert(3 * HOUR, 4.0)
+    values.upsert(HOUR // 2, 2.0)
+    assert values.sum() == 15.0
+    assert values.sum(3 * HOUR, 4 * HOUR) == 4.0
+    assert values.count(HOUR, 4 * HOUR) == 3
+
+
+def test_trim_before_keeps_sums_of_what_is_left():
+    values = readings(0, 10, HOUR)
+    values.sum()
+    values.trim_before(4 * HOUR)
+    assert len(values) == 6
+    assert values.first_timestamp() == 4 * HOUR
+    assert values.sum() == 6.0
+    assert values.sum(5 * HOUR, 7 * HOUR) == 2.0
+    # Totals built after the trim start from the trimmed base too
+    values.upsert(10 * HOUR, 3.0)
+    values.upsert(4 * HOUR, 2.0)
+    assert values.sum() == 10.0
+    assert values.sum(10 * HOUR) == 3.0
+
+
+def test_slice_copies_points_and_ends():
+    values = series.TimeSeries(with_end=True)
+    for i in range(4):
+        values.upsert(i * HOUR, float(i), end=(i + 1) * HOUR)
+    part = values.slice(HOUR, 3 * HOUR)
+    assert list(part.items()) == [(HOUR, 1.0), (2 * HOUR, 2.0)]
+    assert part.sum() == 3.0
+    assert [record["end"] for record in part.to_records(newest_first=False)] == [
+        series.from_epoch(2 * HOUR), series.from_epoch(3 * HOUR),
+    ]
+    part.upsert(HOUR, 5.0)
+    assert values.get(HOUR) == 1.0
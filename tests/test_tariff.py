@@ -0,0 +1,63 @@
+import pytest
+
+from _loader import load
+
+tariff = load("tariff")
+
+TARIFF = {
+    "tiers": [
+        {"up_to": 100, "rate": 1.0},
+        {"up_to": 300, "rate": 2.0},
+        {"rate": 3.0},
+    ],
+    "fuel_cost_adjustment": 0.5,
+}
+
+
+def test_energy_charge_fills_tiers_in_order():
+    prices = tariff.parse_tariff(TARIFF)
+    assert prices.energy_charge(50) == 50.0
+    assert prices.energy_charge(100) == 100.0
+    assert prices.energy_charge(350) == 100.0 + 400.0 + 150.0
+    assert prices.cost(350) == 650.0 + 175.0
+    assert prices.cost(0) == 0.0
+
+
+def test_tier_bounds_scale_with_the_period_length():
+    prices = tariff.parse_tariff(TARIFF)
+    # A 30-day period halves every bound
+    assert prices.energy_charge(100, days=30) == 50.0 + 100.0
+
+
+def test_marginal_costs_add_up_to_the_period_cost():
+    prices = tariff.parse_tariff(TARIFF)
+    readings = [(i, 30.0) for i in range(5)]
+    costs = list(prices.marginal_costs(readings, consumed=200.0))
+    assert [cost for _, _, cost in costs][:3] == [75.0, 75.0, 75.0]
+    assert costs[-1][2] == 105.0
+    assert sum(cost for _, _, cost in costs) == pytest.approx(prices.cost(350.0) - prices.cost(200.0))
+
+
+@pytest.mark.parametrize("tiers", [
+    [],
+    [{"up_to": 100, "rate": 1.0}],
+    [{"rate": 1.0}, {"rate": 2.0}],
+    [{"up_to": 100, "rate": 1.0}, {"up_to": 50, "rate": 2.0}, {"rate": 3.0}],
+    [{"up_to": 100, "rate": -1.0}, {"rate": 3.0}],
+])
+def test_invalid_tiers_are_rejected(tiers):
+    with pytest.raises(tariff.TariffError):
+        tariff.parse_tariff({**TARIFF, "tiers": tiers})
+
+
+def test_missing_fields_are_rejected():
+    with pytest.raises(tariff.TariffError):
+        tariff.parse_tariff({"tiers": TARIFF["tiers"]})
+    with pytest.raises(tariff.TariffError):
+        tariff.parse_tariff({**TARIFF, "tiers": [{"up_to": 100}, {"rate": 1.0}]})
+
+
+def test_shipped_tariff_file_loads():
+    prices = tariff.load_tariff()
+    assert prices.tiers[-1][0] is None
+    assert prices.cost(500) > prices.cost(100) > 0
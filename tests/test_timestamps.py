@@ -0,0 +1,30 @@
+import datetime
+
+import pytest
+
+from _loader import load
+
+timestamps = load("timestamps")
+
+
+def test_parse_epoch_is_hong_kong_time():
+    expected = datetime.datetime(2025, 7, 1, 13, 30, 15, tzinfo=timestamps.HK_TZ).timestamp()
+    assert timestamps.parse_epoch("20250701133015") == expected
+
+
+def test_parse_date_epoch_is_midnight_hong_kong_time():
+    expected = datetime.datetime(2024, 2, 29, tzinfo=timestamps.HK_TZ).timestamp()
+    assert timestamps.parse_date_epoch("20240229") == expected
+    assert timestamps.parse_epoch("20240229000000") == expected
+
+
+@pytest.mark.parametrize("value", ["2025070113301", "202507011330155", "2025-07-01 13:30", "20250701ab3015", "20251301000000"])
+def test_parse_epoch_rejects_malformed_timestamps(value):
+    with pytest.raises(ValueError):
+        timestamps.parse_epoch(value)
+
+
+@pytest.mark.parametrize("value", ["2025071", "2025-7-1", "20250230"])
+def test_parse_date_epoch_rejects_malformed_dates(value):
+    with pytest.raises(ValueError):
+        timestamps.parse_date_epoch(value)